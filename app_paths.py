@@ -0,0 +1,15 @@
+import os
+import sys
+
+
+def get_user_data_path(*parts):
+    """
+    Returns a path inside the per-user writable SignSynth folder
+    (%LOCALAPPDATA%\\SignSynth on Windows, ~/.signsynth elsewhere), creating the folder.
+    """
+    if sys.platform == 'win32':
+        root = os.path.join(os.environ.get('LOCALAPPDATA', os.path.expanduser('~')), 'SignSynth')
+    else:
+        root = os.path.join(os.path.expanduser('~'), '.signsynth')
+    os.makedirs(root, exist_ok=True)
+    return os.path.join(root, *parts)
@@ -0,0 +1,219 @@
+"""
+Audio input device discovery for the settings menu. The device list is
+probed on a background thread after the window opens and cached for
+signsynth-device-cache-ttl seconds. A watcher thread notices devices being
+plugged in or removed, using a cheap OS-level check that doesn't touch
+PortAudio. PortAudio only lists the devices that existed when it was
+initialized, so on a change the watcher pauses recognition, re-initializes
+PortAudio and reports the new list to the render thread.
+"""
+import os
+import queue
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from panda3d.core import ConfigVariableDouble, ConfigVariableString
+
+from lazy_import import lazy_module
+
+sd = lazy_module("sounddevice")
+
+device_cache_ttl_config = ConfigVariableDouble(
+    "signsynth-device-cache-ttl", 30.0,
+    "Seconds a probed audio device list is reused before it is queried again.")
+device_watch_interval_config = ConfigVariableDouble(
+    "signsynth-device-watch-interval", 2.0,
+    "Seconds between checks for audio devices being plugged in or removed (0 = off).")
+
+audio_host_api_config = ConfigVariableString(
+    "signsynth-audio-host-api", "auto",
+    "Host API whose input devices are listed (e.g. WASAPI, MME, ALSA); auto prefers WASAPI on Windows, all lists every one.")
+
+# Host APIs tried in order by "auto"; the first one present is used. Elsewhere every host API is listed.
+PREFERRED_HOST_APIS = {'win32': ("WASAPI", "MME")}
+
+# hostapi is None for the "Default Device" placeholder.
+InputDevice = namedtuple("InputDevice", "name index hostapi")
+DEFAULT_DEVICE = InputDevice("Default Device", None, None)
+
+
+def select_host_api(host_apis, preference=None):
+    """Index of the host API to list devices from, or None for all of them."""
+    preference = preference or audio_host_api_config.getValue()
+    if preference.lower() == "all":
+        return None
+    wanted = PREFERRED_HOST_APIS.get(sys.platform, ()) if preference.lower() == "auto" else (preference,)
+    for name in wanted:
+        for i, api in enumerate(host_apis):
+            if name.lower() in api['name'].lower():
+                return i
+    return None
+
+
+def query_input_devices():
+    """
+    Input devices PortAudio currently knows, from one host API (see
+    signsynth-audio-host-api) so each device is listed once. Devices are
+    captured at their native rate, so low-latency host APIs such as WASAPI work.
+    """
+    devices = sd.query_devices()
+    valid_api_index = select_host_api(sd.query_hostapis())
+
+    return [InputDevice(dev['name'], i, dev['hostapi']) for i, dev in enumerate(devices)
+            if dev['max_input_channels'] > 0 and valid_api_index in (None, dev['hostapi'])]
+
+
+def rescan_portaudio():
+    """Re-initialize PortAudio so it lists devices plugged in since startup. Closes every open stream."""
+    sd._terminate()
+    sd._initialize()
+
+
+def os_device_fingerprint():
+    """
+    Cheap signature of the capture devices the OS knows, without touching
+    PortAudio; None if unsupported. Output-only devices are left out, so
+    plugging in headphones or a speaker doesn't trigger a rescan.
+    """
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class WAVEINCAPSW(ctypes.Structure):
+            _fields_ = [("wMid", wintypes.WORD), ("wPid", wintypes.WORD), ("vDriverVersion", wintypes.UINT),
+                        ("szPname", wintypes.WCHAR * 32), ("dwFormats", wintypes.DWORD),
+                        ("wChannels", wintypes.WORD), ("wReserved1", wintypes.WORD)]
+
+        winmm = ctypes.windll.winmm
+        devices = []
+        for i in range(winmm.waveInGetNumDevs()):
+            caps = WAVEINCAPSW()
+            if winmm.waveInGetDevCapsW(i, ctypes.byref(caps), ctypes.sizeof(caps)) == 0:
+                devices.append((caps.szPname, caps.wMid, caps.wPid))
+        return tuple(devices)
+    if sys.platform.startswith('linux'):
+        try:
+            # Capture PCM nodes are named pcmC<card>D<device>c.
+            nodes = sorted(n for n in os.listdir("/dev/snd") if n.startswith("pcmC") and n.endswith("c"))
+        except OSError:
+            return None
+        devices = []
+        for node in nodes:
+            card = node[len("pcmC"):].split("D", 1)[0]
+            try:
+                with open(f"/proc/asound/card{card}/id") as f:
+                    devices.append((node, f.read().strip()))
+            except OSError:
+                devices.append((node, ""))
+        return tuple(devices)
+    return None
+
+
+class DeviceCache:
+    """
+    The last probed device list, reused for `ttl` seconds. Thread-safe. Only
+    the watcher thread probes; the render thread reads the list with peek().
+    """
+
+    def __init__(self, ttl=None, probe=query_input_devices):
+        self.ttl = device_cache_ttl_config.getValue() if ttl is None else ttl
+        self.probe = probe
+        self.lock = threading.Lock()
+        self.devices = None
+        self.probed_at = 0.0
+
+    def get(self):
+        with self.lock:
+            if self.devices is None or time.monotonic() - self.probed_at > self.ttl:
+                self.devices = self.probe()
+                self.probed_at = time.monotonic()
+            return self.devices
+
+    def refresh(self, rescan=None):
+        """Probes again now. `rescan` runs first under the same lock, so no probe overlaps it."""
+        with self.lock:
+            if rescan:
+                rescan()
+            self.devices = self.probe()
+            self.probed_at = time.monotonic()
+            return self.devices
+
+    def peek(self):
+        """The cached list, possibly stale, or None before the first probe. Never probes."""
+        return self.devices
+
+    @property
+    def fresh(self):
+        return self.devices is not None and time.monotonic() - self.probed_at <= self.ttl
+
+
+class DeviceWatcher:
+    """
+    Probes the device list once in the background, then checks the OS device
+    fingerprint every `interval` seconds. After a change has settled, it
+    calls `pause_audio()` (which closes any open input stream and returns
+    whether one was open), re-initializes PortAudio and re-probes. The
+    list is also re-probed here whenever the cache's TTL has run out, so the
+    render thread never probes. Results are put on `results` for the render thread:
+    ("devices", [InputDevice], resume) or ("error", message, resume).
+    """
+
+    def __init__(self, cache, interval=None, pause_audio=None, fingerprint=os_device_fingerprint,
+                 rescan=rescan_portaudio, settle=0.5):
+        self.cache = cache
+        self.interval = device_watch_interval_config.getValue() if interval is None else interval
+        self.pause_audio = pause_audio
+        self.fingerprint = fingerprint
+        self.rescan = rescan
+        self.settle = settle
+        self.results = queue.Queue()
+        self.stopping = threading.Event()
+        self.rescans = 0
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="AudioDeviceWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+
+    def _report(self, probe, resume=False):
+        try:
+            self.results.put(("devices", probe(), resume))
+        except Exception as e:
+            self.results.put(("error", str(e), resume))
+
+    def run(self):
+        self._report(self.cache.get)
+        last = None
+        if self.interval > 0:
+            try:
+                last = self.fingerprint()
+            except Exception:
+                last = None
+        # Without a usable fingerprint, only wake up to keep the cache fresh.
+        wait = self.interval if last is not None else self.cache.ttl
+        if wait <= 0:
+            return
+
+        while not self.stopping.wait(wait):
+            current = self.fingerprint() if last is not None else None
+            if current == last:
+                if not self.cache.fresh:
+                    self._report(self.cache.get)
+                continue
+            # Plugging in a device can show up as several changes; wait until it stops changing.
+            while not self.stopping.wait(self.settle):
+                again = self.fingerprint()
+                if again == current:
+                    break
+                current = again
+            last = current
+
+            resume = self.pause_audio() if self.pause_audio else False
+            self.rescans += 1
+
+            self._report(lambda: self.cache.refresh(self.rescan), resume)
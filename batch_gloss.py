@@ -0,0 +1,202 @@
+"""
+Converts text to gloss, pose sequences and estimated signing time in bulk,
+without the GUI. Reads text files (or stdin with "-") line by line and writes
+one JSON object per non-empty line:
+
+    {"source": "catalog.txt", "line": 12, "text": "...", "gloss": "...",
+     "poses": [...], "signed": 3, "fingerspelled": 1, "unknown": ["KEYBOARD"],
+     "duration": 6.0}
+
+"poses" is the sequence expandPoseSequence would play, and "duration" is
+len(poses) * --sign-delay. Lines are converted in chunks on a pool of worker
+processes, each with its own gloss converter. Only a bounded number of chunks
+are in flight, so memory use does not grow with the input. Output keeps input
+order. Throughput and gloss coverage are printed to stderr.
+
+Usage:
+    python batch_gloss.py catalog.txt more.txt --output catalog.jsonl [--workers 8]
+    some_command | python batch_gloss.py - > out.jsonl
+    python batch_gloss.py glosses.txt --input-is-gloss   # skip NLTK, measure pose coverage only
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pose_compiler import expand_gloss, load_pose_file
+
+BASE_PATH = os.path.abspath(os.path.dirname(__file__))
+POSE_FILE = os.path.join(BASE_PATH, "sign_poses.json")
+
+# Set in each worker process by _init_worker.
+_converter = None
+_gesture_data = None
+
+
+def read_chunks(paths, chunk_size):
+    """Yields lists of (source, line number, text) for the non-empty lines of `paths`."""
+    chunk = []
+    for path in paths:
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8", errors="replace")
+        try:
+            for number, line in enumerate(stream, 1):
+                text = line.strip()
+                if not text:
+                    continue
+                chunk.append((path, number, text))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+    if chunk:
+        yield chunk
+
+
+def _init_worker(pose_file, input_is_gloss):
+    global _converter, _gesture_data
+    _gesture_data = load_pose_file(pose_file)
+    if not input_is_gloss:
+        from speech_gloss import SpeechGloss
+        _converter = SpeechGloss(record_dir="")
+
+
+def convert_line(source, number, text, sign_delay):
+    gloss = _converter.convert_to_sign_gloss(text) if _converter else " ".join(text.upper().split())
+    words = gloss.split()
+    poses, signed, fingerspelled = expand_gloss(words, _gesture_data)
+    return {
+        "source": source, "line": number, "text": text, "gloss": gloss, "poses": poses,
+        "signed": signed, "fingerspelled": fingerspelled,
+        "unknown": [word for word in words if word.lower() not in _gesture_data],
+        "duration": round(len(poses) * sign_delay, 3),
+    }
+
+
+def check_converter(pose_file, input_is_gloss):
+    """
+    Builds the converter in this process and converts one line, so that a
+    missing pose file, NLTK or NLTK data is reported once, before any worker
+    starts, rather than as a broken process pool.
+    """
+    _init_worker(pose_file, input_is_gloss)
+    convert_line("-", 0, "hello", 0.0)
+
+
+def convert_chunk(chunk, sign_delay):
+    return [convert_line(source, number, text, sign_delay) for source, number, text in chunk]
+
+
+def convert_all(chunks, workers, sign_delay, pose_file, input_is_gloss, in_flight_per_worker=4):
+    """Yields the records of every chunk in input order, with at most workers * in_flight_per_worker chunks queued."""
+    if workers <= 1:
+        if _gesture_data is None:
+            _init_worker(pose_file, input_is_gloss)
+        for chunk in chunks:
+            yield from convert_chunk(chunk, sign_delay)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(pose_file, input_is_gloss)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(convert_chunk, chunk, sign_delay))
+            if len(pending) >= workers * in_flight_per_worker:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+class BatchStats:
+    def __init__(self, top=20):
+        self.top = top
+        self.started = time.perf_counter()
+        self.lines = 0
+        self.words = 0
+        self.signed = 0
+        self.fingerspelled = 0
+        self.poses = 0
+        self.duration = 0.0
+        self.unknown = Counter()
+
+    def add(self, record):
+        self.lines += 1
+        self.words += len(record["text"].split())
+        self.signed += record["signed"]
+        self.fingerspelled += record["fingerspelled"]
+        self.poses += len(record["poses"])
+        self.duration += record["duration"]
+        self.unknown.update(record["unknown"])
+
+    def progress(self):
+        elapsed = time.perf_counter() - self.started
+        return f"{self.lines} lines, {self.lines / elapsed if elapsed else 0:.0f} lines/s"
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        tokens = self.signed + self.fingerspelled
+        lines = [
+            f"{self.lines} lines ({self.words} words) in {elapsed:.2f}s: "
+            f"{self.lines / elapsed if elapsed else 0:.0f} lines/s, {self.words / elapsed if elapsed else 0:.0f} words/s",
+            f"gloss coverage: {self.signed}/{tokens} tokens signed "
+            f"({100 * self.signed / tokens if tokens else 0:.1f}%), {self.fingerspelled} fingerspelled",
+            f"{self.poses} poses, {self.duration / 3600:.2f} h of estimated signing",
+        ]
+        if self.unknown:
+            lines.append("most fingerspelled: " + ", ".join(
+                f"{word} ({count})" for word, count in self.unknown.most_common(self.top)))
+        return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch text to gloss / pose timeline converter (JSONL).")
+    parser.add_argument("inputs", nargs="+", help="Text files, one utterance per line ('-' for stdin).")
+    parser.add_argument("--output", help="JSONL output file (default: stdout).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (1 = convert in this process).")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Lines sent to a worker at a time.")
+    parser.add_argument("--sign-delay", type=float, default=1.5, help="Seconds per pose for the duration estimate.")
+    parser.add_argument("--input-is-gloss", action="store_true",
+                        help="Lines are already gloss; skip NLTK and only expand them to poses.")
+    parser.add_argument("--pose-file", default=POSE_FILE)
+    parser.add_argument("--progress", type=float, default=5.0,
+                        help="Seconds between progress lines on stderr (0 = off).")
+    args = parser.parse_args(argv)
+
+    try:
+        check_converter(args.pose_file, args.input_is_gloss)
+    except Exception as e:
+        print(f"Cannot load the gloss converter: {e}", file=sys.stderr)
+        return 1
+
+    stats = BatchStats()
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    next_progress = time.perf_counter() + args.progress
+    try:
+        records = convert_all(read_chunks(args.inputs, args.chunk_size), args.workers, args.sign_delay,
+                              args.pose_file, args.input_is_gloss)
+        for record in records:
+            output.write(json.dumps(record) + "\n")
+            stats.add(record)
+            if args.progress and time.perf_counter() >= next_progress:
+                print(stats.progress(), file=sys.stderr)
+                next_progress = time.perf_counter() + args.progress
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        return 130
+    except BrokenProcessPool as e:
+        print(f"A worker process failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        print(stats.report(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
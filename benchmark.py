@@ -0,0 +1,345 @@
+"""
+Benchmarks for the gloss, pose and animation hot paths, run headless
+(window-type none). Results are written as JSON; `compare` flags cases whose
+median got slower than a threshold between two result files.
+
+Usage:
+    python benchmark.py run [--output bench.json] [--repeat 50] [--only gloss] [--clips benchmark_clips]
+    python benchmark.py compare base.json new.json [--threshold 0.10]
+"""
+import argparse
+import array
+import gc
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import wave
+from datetime import datetime
+
+BASE_PATH = os.path.abspath(os.path.dirname(__file__))
+POSE_FILE = os.path.join(BASE_PATH, "sign_poses.json")
+
+GLOSS_CORPUS = (
+    "hello how are you today",
+    "I am going to the store because we need milk",
+    "she doesn't want to talk about it",
+    "where are you going after work",
+    "they were coached for years and learned many skills",
+    "what do you think about this idea",
+    "we had no time to learn the new habits",
+    "who is there with you right now",
+    "millions of people try to speak a second language",
+    "he won't go there because it is too far",
+    "don't overthink it just try again",
+    "why did you buy that book",
+)
+
+# Words that are in the pose library, and words that have to be fingerspelled.
+EXPAND_HITS = ("HI", "ME", "YOU", "GO", "STORE", "MILK", "WHY", "NOT", "LEARN", "SPEAK", "WHERE", "WHAT")
+EXPAND_MISSES = ("KEYBOARD", "JUPITER", "QUANTUM", "BICYCLE", "ZEPHYR", "OXYGEN", "VELVET", "WIZARD")
+
+COLD_LOAD_SNIPPET = (
+    "import time; t = time.perf_counter(); "
+    "from pose_compiler import PoseCompiler, load_pose_file; "
+    "c = PoseCompiler(load_pose_file({path!r})); c.compile_all(); "
+    "print(time.perf_counter() - t)"
+)
+
+
+# Length of the generated clip used when no WAV clips are available.
+SYNTHETIC_CLIP_SECONDS = 10
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+def summarize(samples, unit="ms", scale=1000.0):
+    values = sorted(v * scale for v in samples)
+    return {
+        "unit": unit,
+        "samples": len(values),
+        "min": round(values[0], 4),
+        "median": round(statistics.median(values), 4),
+        "mean": round(statistics.fmean(values), 4),
+        "p95": round(values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))], 4),
+    }
+
+
+def time_calls(func, repeat):
+    """Calls func `repeat` times (after one untimed call) and returns the durations in seconds."""
+    func()
+    gc.collect()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+class BenchmarkContext:
+    """Lazily creates the headless app and gloss converter shared by several cases."""
+
+    def __init__(self, clips_dir):
+        self.clips_dir = clips_dir
+        self._app = None
+        self._app_error = None
+        self._converter = None
+
+    @property
+    def app(self):
+        if self._app_error:
+            raise SkipBenchmark(self._app_error)
+        if self._app is None:
+            from panda3d.core import Filename, loadPrcFileData
+            loadPrcFileData("", f"model-path {Filename.fromOsSpecific(BASE_PATH).getFullpath()}")
+            loadPrcFileData("", "window-type none")
+            loadPrcFileData("", "audio-library-name null")
+            from sign_language_app import SignLanguageApp
+            try:
+                self._app = SignLanguageApp(version="benchmark", start_speech=False)
+            except Exception as e:
+                self._app_error = f"could not create the app headless: {e}"
+                raise SkipBenchmark(self._app_error)
+        return self._app
+
+    @property
+    def converter(self):
+        if self._converter is None:
+            try:
+                from speech_gloss import SpeechGloss
+                # No gloss cache: the corpus repeats, and every sample should be a real conversion.
+                self._converter = SpeechGloss(record_dir="", gloss_cache_size=0)
+            except ImportError as e:
+                raise SkipBenchmark(f"gloss converter unavailable: {e}")
+        return self._converter
+
+
+def bench_poses_load_cold(ctx, repeat):
+    samples = []
+    for _ in range(max(3, repeat // 10)):
+        proc = subprocess.run([sys.executable, "-c", COLD_LOAD_SNIPPET.format(path=POSE_FILE)],
+                              cwd=BASE_PATH, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise SkipBenchmark(proc.stderr.strip().splitlines()[-1])
+        samples.append(float(proc.stdout.strip().splitlines()[-1]))
+    return summarize(samples)
+
+
+def bench_poses_load_warm(ctx, repeat):
+    from pose_compiler import PoseCompiler, load_pose_file
+
+    def load():
+        PoseCompiler(load_pose_file(POSE_FILE)).compile_all()
+
+    return summarize(time_calls(load, repeat))
+
+
+def bench_gloss_convert(ctx, repeat):
+    converter = ctx.converter
+    samples = []
+    converter.convert_to_sign_gloss(GLOSS_CORPUS[0])
+    for _ in range(max(1, repeat // len(GLOSS_CORPUS))):
+        for sentence in GLOSS_CORPUS:
+            started = time.perf_counter()
+            converter.convert_to_sign_gloss(sentence)
+            samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def bench_expand_hits(ctx, repeat):
+    app = ctx.app
+    return summarize(time_calls(lambda: app.expandPoseSequence(EXPAND_HITS), repeat))
+
+
+def bench_expand_misses(ctx, repeat):
+    app = ctx.app
+    return summarize(time_calls(lambda: app.expandPoseSequence(EXPAND_MISSES), repeat))
+
+
+def bench_transition_intervals(ctx, repeat):
+    """One animateNextPose step: compute the transition, build its blend intervals and start them."""
+    app = ctx.app
+    sequence = app.expandPoseSequence(EXPAND_HITS + EXPAND_MISSES[:2])
+    samples = []
+    for _ in range(max(1, repeat // len(sequence))):
+        for pose_name in sequence:
+            started = time.perf_counter()
+            app.playTransition(pose_name)
+            samples.append(time.perf_counter() - started)
+    app.interruptTransition(finish=True)
+    app.loadSignPoses("default")
+    return summarize(samples)
+
+
+def synthetic_speech(seconds=SYNTHETIC_CLIP_SECONDS, rate=16000, seed=0):
+    """
+    Deterministic speech-like 16-bit mono PCM of exactly `seconds`: voiced
+    syllables (a gliding 100-180 Hz pitch with harmonics and a syllable
+    envelope) separated by short pauses, over a low noise floor.
+    """
+    rng = random.Random(seed)
+    samples = array.array("h")
+    phase = 0.0
+    while len(samples) < seconds * rate:
+        syllable = int(rng.uniform(0.12, 0.3) * rate)
+        pitch_from, pitch_to = rng.uniform(100, 180), rng.uniform(100, 180)
+        harmonics = [rng.uniform(0.2, 1.0) / h for h in range(1, 9)]
+        for n in range(syllable):
+            t = n / syllable
+            phase += 2 * math.pi * (pitch_from + (pitch_to - pitch_from) * t) / rate
+            voiced = sum(a * math.sin(h * phase) for h, a in enumerate(harmonics, 1))
+            samples.append(int(6000 * math.sin(math.pi * t) * voiced / 2 + rng.gauss(0, 60)))
+        pause = int(rng.choice((0.03, 0.05, 0.08, 0.4)) * rate)
+        samples.extend(int(rng.gauss(0, 60)) for _ in range(pause))
+    del samples[seconds * rate:]
+    return samples.tobytes()
+
+
+def load_clips(clips_dir):
+    """[(name, rate, frames)] for the 16-bit mono WAV clips in `clips_dir`, or one synthetic clip if there are none."""
+    names = sorted(f for f in os.listdir(clips_dir) if f.endswith(".wav")) if os.path.isdir(clips_dir) else []
+    clips = []
+    for name in names:
+        with wave.open(os.path.join(clips_dir, name), "rb") as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                print(f"Skipping {name}: needs 16-bit mono audio")
+                continue
+            clips.append((name, wav.getframerate(), wav.readframes(wav.getnframes())))
+    if not names:
+        clips.append((f"synthetic-{SYNTHETIC_CLIP_SECONDS}s", 16000, synthetic_speech()))
+    return clips
+
+
+def bench_vosk_rtf(ctx, repeat):
+    """
+    Decoding time divided by audio duration for each 16 kHz mono WAV clip in
+    the clips folder, or for a generated speech-like clip when there are none.
+    """
+    try:
+        from speech_gloss import load_vosk_model, vosk
+        model = load_vosk_model()
+    except Exception as e:
+        raise SkipBenchmark(f"VOSK unavailable: {e}")
+
+    ratios = []
+    for name, rate, frames in load_clips(ctx.clips_dir):
+        duration = len(frames) / 2 / rate
+
+        recognizer = vosk.KaldiRecognizer(model, rate)
+        started = time.perf_counter()
+        for offset in range(0, len(frames), 16000):
+            recognizer.AcceptWaveform(frames[offset:offset + 16000])
+        recognizer.FinalResult()
+        ratios.append((time.perf_counter() - started) / duration)
+    if not ratios:
+        raise SkipBenchmark("no usable clips")
+    return summarize(ratios, unit="x realtime", scale=1.0)
+
+
+BENCHMARKS = (
+    ("poses.load_cold", bench_poses_load_cold),
+    ("poses.load_warm", bench_poses_load_warm),
+    ("gloss.convert", bench_gloss_convert),
+    ("expand.vocabulary_hits", bench_expand_hits),
+    ("expand.fingerspelling_misses", bench_expand_misses),
+    ("animation.transition_intervals", bench_transition_intervals),
+    ("vosk.real_time_factor", bench_vosk_rtf),
+)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_PATH,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(args):
+    ctx = BenchmarkContext(args.clips)
+    results, skipped = {}, {}
+    for name, func in BENCHMARKS:
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        try:
+            results[name] = func(ctx, args.repeat)
+        except SkipBenchmark as e:
+            skipped[name] = str(e)
+            print(f"{name:<32} skipped: {e}")
+            continue
+        r = results[name]
+        print(f"{name:<32} median {r['median']:10.4f} {r['unit']:<10} p95 {r['p95']:10.4f}  (n={r['samples']})")
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+        "skipped": skipped,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)["results"]
+    with open(args.new) as f:
+        new = json.load(f)["results"]
+
+    regressions = []
+    print(f"{'benchmark':<32} {'base':>10} {'new':>10} {'change':>8}")
+    for name in sorted(set(base) | set(new)):
+        if name not in base or name not in new:
+            print(f"{name:<32} {'only in ' + ('base' if name in base else 'new'):>30}")
+            continue
+        old_median, new_median = base[name]["median"], new[name]["median"]
+        change = (new_median - old_median) / old_median if old_median else 0.0
+        flag = ""
+        if change > args.threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<32} {old_median:10.4f} {new_median:10.4f} {change * 100:+7.1f}%{flag}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        return 1
+    print("No regressions")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SignSynth hot path benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Run the benchmarks.")
+    run_parser.add_argument("--output", help="Write the results to this JSON file.")
+    run_parser.add_argument("--repeat", type=int, default=50, help="Timed calls per benchmark.")
+    run_parser.add_argument("--only", action="append", help="Only run benchmarks whose name contains this.")
+    run_parser.add_argument("--clips", default=os.path.join(BASE_PATH, "benchmark_clips"),
+                            help="Folder of 16-bit mono WAV clips for the VOSK benchmark (default: a generated clip).")
+
+    compare_parser = sub.add_parser("compare", help="Compare two result files.")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="Relative slowdown of the median that counts as a regression.")
+
+    args = parser.parse_args(argv)
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+"""
+Local control API: lets other programs (e.g. a caption system) make the avatar
+sign without going through the microphone.
+
+HTTP (signsynth-control-port), JSON bodies:
+    POST /text        {"text": "...", "interrupt": false}  gloss it, then sign it
+    POST /gloss       {"gloss": "HI ME", "interrupt": false} sign a gloss as is
+    GET  /state       animation, queue and settings
+    POST /cancel      drop the queue and stop signing
+    POST /sign_delay  {"seconds": 1.0}
+
+WebSocket (signsynth-control-ws-port): one JSON message per request, e.g.
+{"op": "text", "text": "...", "id": 7}; each reply is the HTTP body plus
+"status" and the request's "id".
+
+Both servers run on one asyncio thread. Gloss conversion runs on its own
+worker thread, and changes to the app are queued and applied by a task at the
+start of the next frame, so the render loop never waits on a client. A
+submission made while the avatar is signing is queued behind it (up to
+signsynth-control-queue entries) unless it asks to interrupt.
+
+Load test:
+    python control_api.py loadtest [--url http://127.0.0.1:8770] [--clients 50] [--requests 20] [--op state]
+"""
+import argparse
+import http.client
+import json
+import queue
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from panda3d.core import ConfigVariableInt, ConfigVariableString
+
+from lazy_import import lazy_module
+
+# main.py imports this module for its config variables; asyncio is only needed once the API starts.
+asyncio = lazy_module("asyncio")
+
+control_port_config = ConfigVariableInt(
+    "signsynth-control-port", 0,
+    "Serve the HTTP control API on this local port (0 = disabled).")
+control_ws_port_config = ConfigVariableInt(
+    "signsynth-control-ws-port", 0,
+    "Serve the WebSocket control API on this local port (0 = disabled).")
+control_bind_config = ConfigVariableString(
+    "signsynth-control-bind", "127.0.0.1",
+    "Address the control API listens on.")
+control_queue_config = ConfigVariableInt(
+    "signsynth-control-queue", 32,
+    "Submissions that may wait behind the current one before new ones are refused.")
+
+MAX_BODY = 64 * 1024
+ROUTES = {
+    ("POST", "/text"): "text",
+    ("POST", "/gloss"): "gloss",
+    ("GET", "/state"): "state",
+    ("POST", "/cancel"): "cancel",
+    ("POST", "/sign_delay"): "sign_delay",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ControlApi:
+    """
+    Routes control requests to the app. Reads are answered from a state
+    snapshot taken every frame; changes go through a command queue drained by
+    "ControlApiTask" on the render thread.
+    """
+
+    def __init__(self, app, host=None, port=None, ws_port=None, queue_size=None, timeout=5.0):
+        self.app = app
+        self.host = host or control_bind_config.getValue()
+        self.port = control_port_config.getValue() if port is None else port
+        self.ws_port = control_ws_port_config.getValue() if ws_port is None else ws_port
+        self.queue_size = queue_size or control_queue_config.getValue()
+        self.timeout = timeout
+        self.commands = queue.Queue()
+        self.pending = deque()
+        self.state = {}
+        self.converter = None
+        self.gloss_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ControlGloss")
+        self.loop = None
+        self.http_server = None
+        self.ws_server = None
+        self.ready = threading.Event()
+        self.error = None
+
+    # -- lifecycle --
+
+    def start(self):
+        threading.Thread(target=self._run_loop, name="ControlApi", daemon=True).start()
+        self.ready.wait()
+        if self.error:
+            raise self.error
+        self.update_state()
+        self.app.taskMgr.add(self.control_task, "ControlApiTask", sort=-80)
+        if self.port:
+            print(f"Control API available at http://{self.host}:{self.port}/")
+        if self.ws_port:
+            print(f"Control API WebSocket at ws://{self.host}:{self.ws_port}/")
+        return self
+
+    def _run_loop(self):
+        async def listen():
+            if self.port:
+                self.http_server = await asyncio.start_server(
+                    self._http_connection, self.host, self.port, backlog=128)
+                self.port = self.http_server.sockets[0].getsockname()[1]
+            if self.ws_port:
+                from websockets.asyncio.server import serve
+
+                self.ws_server = await serve(self._ws_connection, self.host, self.ws_port)
+                self.ws_port = self.ws_server.sockets[0].getsockname()[1]
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(listen())
+        except OSError as e:
+            self.error = e
+            return
+        finally:
+            self.ready.set()
+        self.loop.run_forever()
+
+    def stop(self):
+        self.app.taskMgr.remove("ControlApiTask")
+        if self.loop:
+            for server in (self.http_server, self.ws_server):
+                if server:
+                    self.loop.call_soon_threadsafe(server.close)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.gloss_executor.shutdown(wait=False)
+
+    # -- asyncio thread --
+
+    async def call(self, func, *args):
+        """Run func(*args) on the render thread at the next frame and return its result."""
+        future = self.loop.create_future()
+        self.commands.put((func, args, future))
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise ApiError(504, "the render loop did not respond")
+
+    async def convert(self, text):
+        """
+        Gloss for `text` on the gloss worker thread (NLTK is loaded on first use).
+        The live speech processor is reused for its gloss cache; conversions
+        themselves are serialized with the recognizer's inside convert_to_sign_gloss.
+        """
+        def run():
+            if self.converter is None:
+                from speech_gloss import SpeechGloss
+                processor = self.app.speech_processor
+                self.converter = processor if processor is not None else SpeechGloss(record_dir="")
+            return self.converter.convert_to_sign_gloss(text)
+
+        try:
+            return await self.loop.run_in_executor(self.gloss_executor, run)
+        except (ImportError, LookupError) as e:
+            raise ApiError(503, f"gloss conversion unavailable: {e}")
+
+    async def handle(self, op, payload):
+        """Returns (HTTP status, JSON-able body) for one request."""
+        try:
+            if op == "state":
+                return 200, self.state
+            if op == "cancel":
+                return 200, {"cancelled": await self.call(self._cancel)}
+            if op == "sign_delay":
+                seconds = payload.get("seconds")
+                if not isinstance(seconds, (int, float)):
+                    raise ApiError(400, "'seconds' must be a number")
+                return 200, {"sign_delay": await self.call(self._set_sign_delay, float(seconds))}
+            if op in ("text", "gloss"):
+                value = payload.get(op)
+                if not isinstance(value, str) or not value.strip():
+                    raise ApiError(400, f"'{op}' must be a non-empty string")
+                text, gloss = (value, await self.convert(value)) if op == "text" else (None, value.strip())
+                if not gloss:
+                    raise ApiError(422, "nothing to sign")
+                position = await self.call(self._submit, text, gloss, bool(payload.get("interrupt")))
+                if position is None:
+                    raise ApiError(429, "queue is full")
+                return 202, {"gloss": gloss, "position": position}
+            raise ApiError(404, f"unknown operation {op!r}")
+        except ApiError as e:
+            return e.status, {"error": str(e)}
+
+    # -- render thread --
+
+    def control_task(self, task):
+        replies = []
+        while True:
+            try:
+                func, args, future = self.commands.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                replies.append((future, func(*args), None))
+            except Exception as e:
+                replies.append((future, None, ApiError(500, str(e))))
+        if self.pending and not self.app.is_animating:
+            self._start_next()
+        # Snapshot first, so a client that reads /state after its reply sees its own change.
+        self.update_state()
+        for reply in replies:
+            self.loop.call_soon_threadsafe(self._resolve, *reply)
+        return task.cont
+
+    @staticmethod
+    def _resolve(future, result, error):
+        if future.done():
+            return
+        if error:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def update_state(self):
+        app = self.app
+        animating = app.is_animating
+        self.state = {
+            "animating": animating,
+            "text": getattr(app, "current_text", "") if animating else "",
+            "pose": app.current_pose if animating and app.pose_index else None,
+            "pose_index": app.pose_index if animating else 0,
+            "poses": len(app.expanded_sequence) if animating else 0,
+            "queue": [gloss for _, gloss in self.pending],
+            "sign_delay": app.sign_delay,
+            "listening": app.speech_recognition_active,
+        }
+
+    def _submit(self, text, gloss, interrupt):
+        """Queue an utterance; returns its place in line (0 = signing now) or None if the queue is full."""
+        if interrupt:
+            self.pending.clear()
+            self.app.stopAnimation()
+        elif len(self.pending) >= self.queue_size:
+            return None
+        self.pending.append((text, gloss))
+        self.app.idle_throttle.wake()
+        if self.app.is_animating:
+            return len(self.pending)
+        self._start_next()
+        return 0
+
+    def _start_next(self):
+        # Not through handle_speech_result: that charges the recognizer's last conversion to the latency log.
+        text, gloss = self.pending.popleft()
+        self.app.recognized_text_node.setText(gloss if text is None else text)
+        if text is not None:
+            self.app.gloss_text_node.setText(gloss)
+        self.app.start_animation(gloss)
+
+    def _cancel(self):
+        cancelled = len(self.pending) + (1 if self.app.is_animating else 0)
+        self.pending.clear()
+        self.app.reset_app()
+        return cancelled
+
+    def _set_sign_delay(self, seconds):
+        self.app.set_sign_delay(seconds)
+        return self.app.sign_delay
+
+    # -- transports --
+
+    async def _http_connection(self, reader, writer):
+        """Minimal HTTP/1.1 with keep-alive; every request and response body is JSON."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                length = int(headers.get("content-length") or 0)
+                if "transfer-encoding" in headers:
+                    status, body, keep_alive = 411, {"error": "send a Content-Length"}, False
+                elif length > MAX_BODY:
+                    status, body, keep_alive = 413, {"error": "request body too large"}, False
+                else:
+                    data = await reader.readexactly(length) if length else b""
+                    status, body = await self.http_request(method, urlsplit(target).path, data)
+
+                payload = json.dumps(body).encode()
+                head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                        f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n")
+                if not keep_alive:
+                    head += "Connection: close\r\n"
+                writer.write(head.encode("latin-1") + b"\r\n" + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def http_request(self, method, path, data):
+        path = path.rstrip("/")
+        op = ROUTES.get((method, path))
+        if op is None:
+            known = any(route_path == path for _, route_path in ROUTES)
+            return (405 if known else 404), {"error": f"{method} {path} not supported"}
+        try:
+            payload = json.loads(data) if data else {}
+            if not isinstance(payload, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            return 400, {"error": f"invalid JSON: {e}"}
+        return await self.handle(op, payload)
+
+    async def _ws_connection(self, connection):
+        from websockets.exceptions import ConnectionClosed
+
+        try:
+            async for message in connection:
+                request_id = None
+                try:
+                    payload = json.loads(message)
+                    if not isinstance(payload, dict):
+                        raise ValueError("expected a JSON object")
+                    request_id = payload.get("id")
+                    status, body = await self.handle(payload.get("op"), payload)
+                except ValueError as e:
+                    status, body = 400, {"error": f"invalid JSON: {e}"}
+                await connection.send(json.dumps(dict(body, status=status, id=request_id)))
+        except ConnectionClosed:
+            pass
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def load_test(args):
+    """Many concurrent keep-alive clients; prints latency percentiles and throughput."""
+    parts = urlsplit(args.url)
+    body = {"state": None, "gloss": {"gloss": "HI"}, "text": {"text": "hello"}}[args.op]
+    method, path = ("GET", "/state") if args.op == "state" else ("POST", f"/{args.op}")
+    latencies, statuses, lock = [], {}, threading.Lock()
+    start_barrier = threading.Barrier(args.clients)
+
+    def client():
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        data = json.dumps(body).encode() if body else None
+        headers = {"Content-Type": "application/json"} if data else {}
+        start_barrier.wait()
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=data, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                connection.close()
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+        connection.close()
+
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"{len(latencies)} requests ({args.op}) from {args.clients} clients in {wall:.2f}s "
+          f"= {len(latencies) / wall:.0f} req/s")
+    print(f"latency ms: p50 {percentile(latencies, 0.5) * 1000:.1f}  p95 {percentile(latencies, 0.95) * 1000:.1f}  "
+          f"max {latencies[-1] * 1000:.1f}  mean {statistics.fmean(latencies) * 1000:.1f}")
+    print("status:", ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items(), key=str)))
+    return 0 if all(isinstance(s, int) and s < 500 for s in statuses) else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SignSynth control API tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    load_parser = sub.add_parser("loadtest", help="Hammer a running control API with concurrent clients.")
+    load_parser.add_argument("--url", default="http://127.0.0.1:8770")
+    load_parser.add_argument("--clients", type=int, default=50)
+    load_parser.add_argument("--requests", type=int, default=20, help="Requests per client.")
+    load_parser.add_argument("--op", choices=("state", "gloss", "text"), default="state")
+    args = parser.parse_args(argv)
+    return load_test(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
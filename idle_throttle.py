@@ -0,0 +1,99 @@
+from direct.interval.IntervalManager import ivalMgr
+from direct.task import Task
+from panda3d.core import ClockObject, ConfigVariableDouble
+
+idle_fps_config = ConfigVariableDouble(
+    "signsynth-idle-fps", 10.0,
+    "Frame rate cap while the avatar is idle.")
+idle_hold_config = ConfigVariableDouble(
+    "signsynth-idle-hold", 1.0,
+    "Seconds to stay at full frame rate after the last activity.")
+
+
+class IdleThrottle:
+    """
+    Caps the frame rate while nothing on screen is moving (no signing, no
+    running intervals, no recent input or speech) and returns to full rate as
+    soon as something happens. Keeps track of the time spent in each mode.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.clock = ClockObject.getGlobalClock()
+        self.idle_fps = max(1.0, idle_fps_config.getValue())
+        self.hold = idle_hold_config.getValue()
+        self.active_mode = self.clock.getMode()
+        self.mode = "active"
+        self.mode_time = {"active": 0.0, "idle": 0.0}
+        self.mode_switches = 0
+        self.wake_until = 0.0
+        self.wake_requested = True
+        self.last_mouse = None
+        self.last_time = None
+
+    def start(self):
+        """Start throttling; call once the window (and its button thrower) exists."""
+        if self.app.buttonThrowers:
+            self.app.buttonThrowers[0].node().setButtonDownEvent("idle-throttle-button")
+            self.app.accept("idle-throttle-button", lambda button: self.wake())
+        self.last_time = self.clock.getRealTime()
+        self.app.taskMgr.add(self.throttle_task, "IdleThrottleTask", sort=60)
+
+    def stop(self):
+        self.app.taskMgr.remove("IdleThrottleTask")
+        self.app.ignore("idle-throttle-button")
+        self.set_mode("active")
+
+    def wake(self):
+        """Request full frame rate. Safe to call from any thread; it only sets a flag."""
+        self.wake_requested = True
+
+    def _mouse_moved(self):
+        watcher = self.app.mouseWatcherNode
+        if not watcher or not watcher.hasMouse():
+            return False
+        mouse = (watcher.getMouseX(), watcher.getMouseY())
+        moved = mouse != self.last_mouse
+        self.last_mouse = mouse
+        return moved
+
+    def is_active(self, now):
+        app = self.app
+        if getattr(app, "is_animating", False) or not getattr(app, "signing_complete", True):
+            return True
+        if ivalMgr.getNumIntervals() > 0:
+            return True
+        if self._mouse_moved():
+            self.wake_until = now + self.hold
+        return now < self.wake_until
+
+    def set_mode(self, mode):
+        if mode == self.mode:
+            return
+        if mode == "idle":
+            self.clock.setMode(ClockObject.MLimited)
+            self.clock.setFrameRate(self.idle_fps)
+        else:
+            self.clock.setMode(self.active_mode)
+        self.mode = mode
+        self.mode_switches += 1
+
+    def throttle_task(self, task):
+        now = self.clock.getRealTime()
+        self.mode_time[self.mode] += now - self.last_time
+        self.last_time = now
+
+        if self.wake_requested:
+            self.wake_requested = False
+            self.wake_until = now + self.hold
+
+        self.set_mode("active" if self.is_active(now) else "idle")
+        return Task.cont
+
+    def report(self):
+        total = sum(self.mode_time.values()) or 1.0
+        return (f"Frame rate modes: active {self.mode_time['active']:.1f}s "
+                f"({100 * self.mode_time['active'] / total:.0f}%), "
+                f"idle {self.mode_time['idle']:.1f}s "
+                f"({100 * self.mode_time['idle'] / total:.0f}%), "
+                f"{self.mode_switches} switches")
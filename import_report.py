@@ -0,0 +1,115 @@
+"""
+Import-time report and budget check for the startup path.
+
+Imports a module in a fresh interpreter with `python -X importtime`, prints the
+slowest imports, and exits with status 1 if the module's cumulative import
+time exceeds the budget or if it pulls in a module that should be deferred.
+
+Usage:
+    python import_report.py [--module main] [--budget-ms 400] [--top 15] [--report report.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BASE_PATH = os.path.abspath(os.path.dirname(__file__))
+
+# Cumulative time `import main` may take before the loading screen can appear.
+IMPORT_BUDGET_MS = 400.0
+
+# Heavy modules that must only be imported after the loading screen is shown.
+DEFERRED_MODULES = (
+    "asyncio",
+    "direct.showbase",
+    "direct.gui",
+    "nltk",
+    "numpy",
+    "requests",
+    "sounddevice",
+    "vosk",
+    "win32com",
+)
+
+
+def measure_imports(module, python=sys.executable, runs=1):
+    """
+    Returns {module name: (self_us, cumulative_us)} for every module imported
+    by `import <module>` in a fresh interpreter. With several runs, the
+    fastest time per module is kept to reduce noise.
+    """
+    best = {}
+    for _ in range(max(1, runs)):
+        proc = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=BASE_PATH, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip()}")
+
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            fields = line[len("import time:"):].split("|")
+            if len(fields) != 3:
+                continue
+            name = fields[2].strip()
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+            if name not in best or cumulative_us < best[name][1]:
+                best[name] = (self_us, cumulative_us)
+    return best
+
+
+def deferred_violations(imports, deferred=DEFERRED_MODULES):
+    """The entries of `deferred` that were imported, directly or through one of their submodules."""
+    return [d for d in deferred
+            if any(name == d or name.startswith(d + ".") for name in imports)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report and check the import time of the SignSynth entry module.")
+    parser.add_argument("--module", default="main", help="Module to import (default: main).")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help=f"Maximum cumulative import time in milliseconds (default: {IMPORT_BUDGET_MS:.0f}).")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to measure; the fastest wins.")
+    parser.add_argument("--report", help="Also write the measurements to this JSON file.")
+    args = parser.parse_args(argv)
+
+    imports = measure_imports(args.module, runs=args.runs)
+    if args.module not in imports:
+        print(f"{args.module} was not imported (already cached by the interpreter?)")
+        return 1
+
+    total_ms = imports[args.module][1] / 1000.0
+    slowest = sorted(imports.items(), key=lambda item: -item[1][1])[:args.top]
+
+    print(f"{'module':<40} {'self ms':>9} {'cumul ms':>9}")
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"{name:<40} {self_us / 1000.0:9.1f} {cumulative_us / 1000.0:9.1f}")
+
+    violations = deferred_violations(imports)
+    print(f"\nimport {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms), "
+          f"{len(imports)} modules")
+    if violations:
+        print(f"Imported at startup but should be deferred: {', '.join(violations)}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({
+                "module": args.module,
+                "total_ms": round(total_ms, 1),
+                "budget_ms": args.budget_ms,
+                "deferred_violations": violations,
+                "imports": {name: {"self_ms": round(s / 1000.0, 2), "cumulative_ms": round(c / 1000.0, 2)}
+                            for name, (s, c) in imports.items()},
+            }, f, indent=2)
+
+    if total_ms > args.budget_ms or violations:
+        print("FAILED")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import importlib
+import threading
+import time
+import types
+
+# Seconds spent importing each lazy module, filled in as they are first used.
+load_times = {}
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stands in for a module that is only imported when one of its attributes is
+    first accessed. Safe to touch from several threads at once.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._lazy_lock = threading.Lock()
+        self._lazy_module = None
+
+    def _load(self):
+        module = self._lazy_module
+        if module is None:
+            with self._lazy_lock:
+                module = self._lazy_module
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    load_times[self.__name__] = time.perf_counter() - started
+                    self._lazy_module = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    @property
+    def is_loaded(self):
+        return self._lazy_module is not None
+
+
+def lazy_module(name):
+    """Returns a LazyModule for `name`; `import name` happens on first attribute access."""
+    return LazyModule(name)
+
+
+def load_report():
+    """One line per lazy module that has been imported, slowest first."""
+    return "\n".join(f"  {name:<24} {seconds * 1000:8.1f} ms"
+                     for name, seconds in sorted(load_times.items(), key=lambda item: -item[1]))
@@ -1,19 +1,31 @@
 import sys, os
-import requests
-import webbrowser
-import subprocess
-import tempfile
 import time
-import queue
-import threading
-from panda3d.core import loadPrcFileData, Filename
 
+IMPORT_STARTED = time.perf_counter()
+
+from panda3d.core import loadPrcFileData, Filename, Loader, NodePath
+
+# Only what the loading screen needs is imported here. The engine, NLTK, numpy and the
+# speech stack are imported by the startup stages that use them, after the screen is up
+# (see import_report.py for the budget check).
+import lazy_import
+from app_paths import get_user_data_path
 from loading_screen import LoadingScreen
-from sign_language_app import SignLanguageApp
+from control_api import ControlApi, control_port_config, control_ws_port_config
+from metrics import metrics_port_config
+from startup import StartupGraph
+from updater import UpdateChecker
 
 APP_VERSION = "v1.0.0"
 GITHUB_REPO = "Suja2004/ASR"
 
+MODEL_FILES = (
+    "character/body.bam",
+    "character/RArm.bam",
+    "character/LArm.bam",
+    "skybox/skybox.bam",
+)
+
 if getattr(sys, 'frozen', False):
     base_path = sys._MEIPASS
 
@@ -45,263 +57,161 @@ if getattr(sys, 'frozen', False) and sys.platform == 'win32':
     except Exception:
         pass
 
-def check_for_updates(loader):
+def load_models_async(paths):
     """
-    Checks GitHub for the latest release and prompts user to update.
-    Returns True to continue loading, False to quit.
+    Loads models on Panda3D's asynchronous loader threads.
+    Returns {relative path: NodePath or None}, preferring up-to-date optimized copies.
     """
-    loader.update_progress("Checking for updates...", "Connecting to GitHub...")
-    loader.update()
-    try:
-        api_url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
-        response = requests.get(api_url, timeout=10)
-        response.raise_for_status()
-        latest_release = response.json()
-        latest_version = latest_release.get("tag_name", "")
-
-        def version_tuple(v):
-            try:
-                return tuple(map(int, v.lstrip('v').split('.')))
-            except:
-                return (0, 0, 0)
-
-        current_ver = version_tuple(APP_VERSION)
-        latest_ver = version_tuple(latest_version)
-        update_available = latest_ver > current_ver
-
-        if update_available:
-            print(f"Update found: {latest_version} (current: {APP_VERSION})")
-            installer_url = None
-            for asset in latest_release.get("assets", []):
-                if asset.get("name", "").endswith(".exe"):
-                    installer_url = asset.get("browser_download_url")
-                    break
-
-            if not installer_url:
-                print("Update found, but no .exe installer available.")
-                loader.update_progress("Update available", "No installer found, continuing...")
-                loader.update()
-                time.sleep(1)
-                return True
-
-            download_queue = queue.Queue()
-            continue_loading = {'value': True}
-
-            def do_download(url, path):
-                """Runs in a separate thread to download the file"""
-                try:
-                    with requests.get(url, stream=True, timeout=30) as r:
-                        r.raise_for_status()
-                        total_size = int(r.headers.get('content-length', 0))
-                        downloaded_size = 0
-
-                        with open(path, 'wb') as f:
-                            for chunk in r.iter_content(chunk_size=8192):
-                                if chunk:
-                                    f.write(chunk)
-                                    downloaded_size += len(chunk)
-                                    download_queue.put(
-                                        ("progress", downloaded_size, total_size)
-                                    )
-                    download_queue.put(("done", path))
-                except Exception as e:
-                    download_queue.put(("error", e, url))
-
-            def check_download_progress():
-                """
-                Runs in the main thread to update the UI.
-                This is now optimized to only process the *last* progress message.
-                """
-                try:
-                    last_progress_msg = None
-                    final_msg = None
-
-                    while not download_queue.empty():
-                        msg = download_queue.get_nowait()
-                        msg_type = msg[0]
-
-                        if msg_type == "progress":
-                            last_progress_msg = msg
-                        elif msg_type == "done" or msg_type == "error":
-                            final_msg = msg
-                            break
-
-                    if last_progress_msg:
-                        msg_type, *data = last_progress_msg
-                        downloaded_size, total_size = data
-                        progress_mb = f"{(downloaded_size / (1024 * 1024)):.1f} MB"
-                        if total_size > 0:
-                            progress_mb += f" / {(total_size / (1024 * 1024)):.1f} MB"
-                            progress_pct = int((downloaded_size / total_size) * 100)
-                            loader.set_progress(progress_pct)
-
-                        loader.update_status_text("Downloading update...", progress_mb)
-
-                    if final_msg:
-                        msg_type, *data = final_msg
-
-                        if msg_type == "done":
-                            installer_path = data[0]
-
-                            loader.update_status_text("Update downloaded", "Launching installer...")
-                            loader.update()
-                            time.sleep(1)
-
-                            if sys.platform == 'win32':
-                                import ctypes
-                                try:
-                                    ctypes.windll.shell32.ShellExecuteW(None, "runas",
-                                                                        installer_path, '/SILENT',
-                                                                        None,
-                                                                        1)
-                                except Exception as e:
-                                    print(f"Failed to launch installer as admin: {e}")
-                                    webbrowser.open(installer_url)
-                            else:
-                                subprocess.Popen([installer_path])
-
-                            continue_loading['value'] = False
-                            loader.root.quit()
-                            return
-
-                        elif msg_type == "error":
-                            e, url = data
-                            print(f"Failed to download or run updater: {e}")
-                            loader.hide_update_prompt()
-
-                            loader.update_status_text("Download failed",
-                                                      "Opening browser instead...")
-                            loader.update()
-                            import tkinter.messagebox as messagebox
-                            messagebox.showwarning("Update Failed",
-                                                   f"Could not download update.\n\nError: {str(e)}\n\nOpening browser instead.")
-                            webbrowser.open(url)
-
-                            continue_loading['value'] = False
-                            loader.root.quit()
-                            return
-
-                except queue.Empty:
-                    pass
-
-                if not loader.is_destroyed:
-                    loader.root.after(100, check_download_progress)
-
-            def on_yes():
-
-                loader.set_progress(0)
-
-                loader.update_progress("Downloading update...", "Starting download...")
-
-                temp_dir = tempfile.gettempdir()
-                installer_name = os.path.basename(installer_url)
-                installer_path = os.path.join(temp_dir, installer_name)
-
-                threading.Thread(
-                    target=do_download,
-                    args=(installer_url, installer_path),
-                    daemon=True
-                ).start()
-
-                loader.root.after(100, check_download_progress)
-
-            def on_no():
-                continue_loading['value'] = True
-                loader.root.quit()
-
-            loader.show_update_prompt(
-                f"A new version ({latest_version}) is available!",
-                on_yes,
-                on_no
-            )
-            loader.mainloop()
-
-            if continue_loading['value'] == True:
-
-                loader.hide_update_prompt()
-                loader.update_progress("Continuing with current version...", "")
-                loader.update()
-                time.sleep(0.5)
-                return True
-            else:
-
-                return False
-
-        else:
-            print(f"App is up-to-date (version {APP_VERSION})")
-            loader.update_progress("Application is up-to-date", "")
-            loader.update()
-            time.sleep(0.5)
-            return True
-
-    except requests.exceptions.Timeout:
-        print("Update check timed out")
-        loader.update_progress("Update check timed out", "Continuing offline...")
-        loader.update()
-        time.sleep(1)
-        return True
-
-    except requests.exceptions.RequestException as e:
-        print(f"Could not check for updates: {e}")
-        loader.update_progress("Could not check for updates", "Continuing offline...")
-        loader.update()
-        time.sleep(1)
-        return True
-
-    except Exception as e:
-        print(f"Unexpected error during update check: {e}")
-        import traceback
-        traceback.print_exc()
-        loader.update_progress("Update check failed", "Continuing...")
-        loader.update()
-        time.sleep(1)
-        return True
+    from prepare_models import preferred_model_path
+
+    loader = Loader.getGlobalPtr()
+    pending = {}
+    for path in paths:
+        # A frozen build bundles the models it was built with, and extraction doesn't keep their mtimes.
+        path_to_load = preferred_model_path(base_path, path, check_stale=not getattr(sys, 'frozen', False))
+        request = loader.makeAsyncRequest(Filename(path_to_load))
+        loader.loadAsync(request)
+        pending[path] = request
+
+    models = {}
+    for path, request in pending.items():
+        while not request.done():
+            time.sleep(0.005)
+        node = request.getModel()
+        models[path] = NodePath(node) if node else None
+    return models
+
+
+def load_pose_library():
+    from pose_compiler import PoseCompiler, load_pose_file
+
+    pose_compiler = PoseCompiler(load_pose_file(os.path.join(base_path, "sign_poses.json")))
+    pose_compiler.compile_all()
+    return pose_compiler
+
+
+def load_speech_model(results):
+    from speech_gloss import load_vosk_model
+
+    return load_vosk_model()
+
+
+def prepare_language_tools(results):
+    from speech_gloss import preload_nltk
+
+    return preload_nltk()
+
+
+def create_gloss_converter(results):
+    from speech_gloss import SpeechGloss
+
+    converter = SpeechGloss()
+    converter.warm_up()
+    return converter
+
+
+def warm_up_engine(results):
+    from speech_gloss import WARMUP_UTTERANCE
+
+    app = results["engine"]
+    if app is None:
+        return None
+    converter = results["gloss"]
+    gloss = converter.convert_to_sign_gloss(WARMUP_UTTERANCE) if converter else WARMUP_UTTERANCE
+    return app.warm_up(gloss)
+
+
+def create_engine(results):
+    from sign_language_app import SignLanguageApp
+
+    return SignLanguageApp(
+        version=APP_VERSION,
+        pose_compiler=results["poses"],
+        models=results["models"],
+        start_speech=False
+    )
+
+
+def start_speech(results):
+    app = results["engine"]
+    if app is None:
+        return None
+    app.speech_model = results["vosk"]
+    converter = results["gloss"]
+    if converter is not None:
+        converter.model = app.speech_model
+        converter.callback = app.handle_speech_result
+        app.speech_processor = converter
+    app.start_speech_recognition()
+    return app.speech_recognition_active
+
+
+def build_startup_graph():
+    """
+    Startup stages. Everything that does not need the main thread runs
+    concurrently; the Panda3D engine itself has to be created on the main thread.
+    """
+    graph = StartupGraph()
+    graph.add("poses", lambda results: load_pose_library(), label="Loading sign poses")
+    graph.add("models", lambda results: load_models_async(MODEL_FILES), label="Loading 3D models")
+    graph.add("vosk", load_speech_model, label="Loading speech model")
+    graph.add("nltk", prepare_language_tools, label="Preparing language tools")
+    graph.add("engine", create_engine, deps=("poses", "models"), label="Initializing 3D engine",
+              main_thread=True)
+    graph.add("gloss", create_gloss_converter, deps=("nltk",), label="Warming up gloss converter")
+    graph.add("warmup", warm_up_engine, deps=("engine", "gloss"), label="Warming up animator",
+              main_thread=True)
+    graph.add("speech", start_speech, deps=("warmup", "vosk"),
+              label="Starting speech recognition", main_thread=True)
+    return graph
 
 
 if __name__ == "__main__":
     loading = LoadingScreen(version=APP_VERSION)
 
-    loading.set_steps([
-        "Checking for updates",
-        "Initializing 3D engine",
-        "Loading 3D models",
-        "Initializing audio",
-        "Finalizing UI"
-    ])
-
     loading.center()
     loading.show()
     loading.update()
+    loading_screen_shown = time.perf_counter() - IMPORT_STARTED
+    print(f"Loading screen shown after {loading_screen_shown * 1000:.0f} ms")
 
-    should_continue = check_for_updates(loading)
+    loadPrcFileData("", "window-type none")
 
-    if not should_continue:
-        loading.close()
-        sys.exit()
+    # Runs in the background for the whole startup; the app shows the prompt when it's done.
+    update_checker = UpdateChecker(GITHUB_REPO, APP_VERSION, get_user_data_path("update_cache.json")).start()
 
-    loadPrcFileData("", "window-type none")
+    graph = build_startup_graph()
+    loading.set_steps([task.label for task in graph.tasks.values()])
 
-    loading.update_progress("Initializing 3D engine...", "Starting Panda3D...")
-    loading.update()
+    def on_stage_finished(task, completed, total):
+        detail = f"{completed}/{total} stages ready"
+        if task.name in graph.errors:
+            detail += " (failed)"
+        loading.update_progress(task.label, detail)
 
-    try:
-        panda_app = SignLanguageApp(version=APP_VERSION)
-    except Exception as e:
+    graph.run(on_progress=on_stage_finished, pump=loading.update)
+    graph.write_report(get_user_data_path("startup_timings.jsonl"), {
+        "version": APP_VERSION,
+        "loading_screen_shown": round(loading_screen_shown, 4),
+        "lazy_imports": {name: round(seconds, 4) for name, seconds in lazy_import.load_times.items()},
+    })
+
+    panda_app = graph.results.get("engine")
+    if panda_app is None:
         loading.close()
         import tkinter.messagebox as messagebox
 
-        messagebox.showerror("Fatal Error", f"Failed to initialize Panda3D: {e}")
+        messagebox.showerror("Fatal Error", f"Failed to initialize Panda3D: {graph.errors.get('engine')}")
         sys.exit(1)
 
-    loading.update_progress("Loading 3D models...", "Character, arms, and skybox")
-    loading.update()
-
-    loading.update_progress("Initializing audio...", "Starting Vosk speech engine")
-    loading.update()
-
-    loading.update_progress("Finalizing UI...", "Preparing user interface")
-    loading.update()
-
+    panda_app.setup_update_check(update_checker)
+    if metrics_port_config.getValue():
+        panda_app.setup_metrics()
+    if control_port_config.getValue() or control_ws_port_config.getValue():
+        try:
+            ControlApi(panda_app).start()
+        except OSError as e:
+            print(f"Could not start control API: {e}")
 
     def on_loading_finished():
         print("Loading complete. Starting Panda3D event loop.")
@@ -312,4 +222,4 @@ if __name__ == "__main__":
     loading.finished_connect(on_loading_finished)
     loading.complete()
 
-    loading.mainloop()
\ No newline at end of file
+    loading.mainloop()
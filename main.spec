@@ -93,6 +93,8 @@ a = Analysis(
         'vosk',
         'nltk',
         'requests',
+        'urllib3',
+        'sounddevice',
         'packaging',
         'packaging.version',
         'packaging.utils',
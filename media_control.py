@@ -0,0 +1,164 @@
+import sys
+import time
+
+from panda3d.core import ConfigVariableString
+
+media_backend_config = ConfigVariableString(
+    "signsynth-media-backend", "auto",
+    "How media is paused and resumed: auto, win32, pyautogui, none or record.")
+
+
+class MediaBackend:
+    """Presses the media player's play/pause key. Created once and reused for every press."""
+
+    name = "none"
+
+    def press_play_pause(self):
+        pass
+
+
+class Win32MediaBackend(MediaBackend):
+    name = "win32"
+
+    def __init__(self):
+        import win32com.client
+        self.shell = win32com.client.Dispatch("WScript.Shell")
+
+    def press_play_pause(self):
+        self.shell.SendKeys(" ", 0)
+
+
+class PyAutoGuiMediaBackend(MediaBackend):
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def press_play_pause(self):
+        self.pyautogui.press('space')
+
+
+class RecordingMediaBackend(MediaBackend):
+    """Sends nothing; keeps the time of every press, for testing without a media player."""
+
+    name = "record"
+
+    def __init__(self):
+        self.presses = []
+
+    def press_play_pause(self):
+        self.presses.append(time.perf_counter())
+
+
+BACKENDS = {
+    "win32": Win32MediaBackend,
+    "pyautogui": PyAutoGuiMediaBackend,
+    "none": MediaBackend,
+    "record": RecordingMediaBackend,
+}
+
+
+def create_media_backend(name=None):
+    """Backend named by `name` (default: signsynth-media-backend); falls back to no-op if it can't be loaded."""
+    name = (name or media_backend_config.getValue()).lower()
+    if name == "auto":
+        name = "win32" if sys.platform == 'win32' else "pyautogui"
+    factory = BACKENDS.get(name)
+    if factory is None:
+        print(f"Unknown media backend {name!r} - media control disabled")
+        return MediaBackend()
+    try:
+        return factory()
+    except Exception as e:
+        print(f"Could not load the {name} media backend ({e}) - media control may not work properly")
+        return MediaBackend()
+
+
+class MediaController:
+    """
+    Plays media in windows between signing. After enable() the media starts
+    playing `start_delay` seconds later (time to switch to the media tab).
+    Each play window is paused after `play_interval` seconds, and signing
+    pauses it early. When signing finishes, the media resumes. State changes
+    come from one-shot doMethodLater timers and the app's signing calls, so
+    nothing runs per frame. A timer that comes due while the avatar is signing
+    takes effect when signing finishes.
+    """
+
+    TIMER = "MediaControlTimer"
+
+    def __init__(self, app, backend=None, start_delay=3.0, play_interval=5.0):
+        self.app = app
+        self._backend = backend
+        self.start_delay = start_delay
+        self.play_interval = play_interval
+        self.active = False
+        self.state = "paused"
+        self.timer_due = False
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = create_media_backend()
+        return self._backend
+
+    def _arm(self, delay):
+        self.app.taskMgr.remove(self.TIMER)
+        self.timer_due = False
+        self.app.taskMgr.doMethodLater(delay, self._timer_task, self.TIMER)
+
+    def _disarm(self):
+        self.app.taskMgr.remove(self.TIMER)
+        self.timer_due = False
+
+    def _timer_task(self, task):
+        self._timer_fired()
+        return task.done
+
+    def _timer_fired(self):
+        if not self.app.signing_complete:
+            self.timer_due = True
+            return
+        if self.state == "starting":
+            self.state = "playing"
+            self.app.gloss_text_node.setText("Media playing")
+            self._arm(self.play_interval)
+        elif self.state == "playing":
+            self.pause()
+
+    def enable(self):
+        if self._backend is None:
+            self._backend = create_media_backend()
+        self.active = True
+        self.state = "starting"
+        self._arm(self.start_delay)
+
+    def disable(self):
+        self._disarm()
+        self.active = False
+        self.state = "paused"
+
+    def pause(self):
+        self._disarm()
+        self.backend.press_play_pause()
+        self.state = "paused"
+        self.app.gloss_text_node.setText("Media paused")
+
+    def resume(self):
+        self.backend.press_play_pause()
+        self.state = "playing"
+        self.app.gloss_text_node.setText("Media playing")
+        self._arm(self.play_interval)
+
+    def signing_started(self):
+        if self.active and self.state == "playing":
+            self.pause()
+
+    def signing_finished(self):
+        if not self.active:
+            return
+        if self.state == "paused":
+            self.resume()
+        elif self.timer_due:
+            self._timer_fired()
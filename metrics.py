@@ -0,0 +1,172 @@
+import os
+import sys
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from panda3d.core import ConfigVariableInt, ConfigVariableString
+
+metrics_port_config = ConfigVariableInt(
+    "signsynth-metrics-port", 0,
+    "Serve Prometheus metrics on this local port (0 = disabled).")
+metrics_bind_config = ConfigVariableString(
+    "signsynth-metrics-bind", "127.0.0.1",
+    "Address the metrics endpoint listens on.")
+
+FRAME_TIME_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def current_rss_bytes():
+    """Resident set size of this process, or None if it can't be determined."""
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + \
+                       [(name, ctypes.c_size_t) for name in (
+                           "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                           "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                           "PagefileUsage", "PeakPagefileUsage")]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Metrics:
+    """
+    Pipeline counters and gauges, rendered in the Prometheus text format.
+    Every update is a flag check and returns immediately while disabled.
+    """
+
+    COUNTERS = {
+        "utterances_recognized_total": "Final recognition results with text.",
+        "utterances_dropped_total": "Recognized utterances ignored because the avatar was still signing.",
+        "audio_overflows_total": "Audio input overflows reported by the sound device.",
+        "gloss_cache_hits_total": "convert_to_sign_gloss calls answered from the gloss cache.",
+        "gloss_cache_misses_total": "convert_to_sign_gloss calls that had to run NLTK.",
+        "tokens_signed_total": "Gloss tokens that have their own sign.",
+        "tokens_fingerspelled_total": "Gloss tokens that had to be fingerspelled.",
+    }
+
+    def __init__(self, frame_window=600):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.values = dict.fromkeys(self.COUNTERS, 0)
+        self.gauges = {}
+        self.frame_times = deque(maxlen=frame_window)
+        self.recognizer_rtf = None
+        self.server = None
+
+    def inc(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.values[name] += amount
+
+    def observe_decode(self, decode_seconds, audio_seconds, smoothing=0.1):
+        """Feed one decoded block; keeps an exponential moving average of the real-time factor."""
+        if not self.enabled or audio_seconds <= 0:
+            return
+        rtf = decode_seconds / audio_seconds
+        with self.lock:
+            if self.recognizer_rtf is None:
+                self.recognizer_rtf = rtf
+            else:
+                self.recognizer_rtf += smoothing * (rtf - self.recognizer_rtf)
+
+    def observe_frame(self, dt):
+        if self.enabled:
+            self.frame_times.append(dt)
+
+    def gauge(self, name, help_text, func):
+        """Register a gauge whose value is read from func() at scrape time (None = not reported)."""
+        self.gauges[name] = (help_text, func)
+
+    def render(self):
+        lines = []
+        with self.lock:
+            values = dict(self.values)
+            rtf = self.recognizer_rtf
+        for name, help_text in self.COUNTERS.items():
+            lines += [f"# HELP signsynth_{name} {help_text}", f"# TYPE signsynth_{name} counter",
+                      f"signsynth_{name} {values[name]}"]
+
+        lookups = values["gloss_cache_hits_total"] + values["gloss_cache_misses_total"]
+        tokens = values["tokens_signed_total"] + values["tokens_fingerspelled_total"]
+        derived = {
+            "gloss_cache_hit_ratio": ("Share of gloss conversions served from the cache.",
+                                      values["gloss_cache_hits_total"] / lookups if lookups else None),
+            "fingerspelled_token_ratio": ("Fingerspelled tokens per signed token.",
+                                          values["tokens_fingerspelled_total"] / values["tokens_signed_total"]
+                                          if values["tokens_signed_total"] else (0.0 if tokens else None)),
+            "recognizer_real_time_factor": ("Decode time per second of audio (moving average).", rtf),
+            "resident_memory_bytes": ("Resident set size of the process.", current_rss_bytes()),
+        }
+        for name, (help_text, func) in self.gauges.items():
+            try:
+                derived[name] = (help_text, func())
+            except Exception:
+                derived[name] = (help_text, None)
+        for name, (help_text, value) in derived.items():
+            if value is None:
+                continue
+            lines += [f"# HELP signsynth_{name} {help_text}", f"# TYPE signsynth_{name} gauge",
+                      f"signsynth_{name} {value!r}"]
+
+        frame_times = sorted(self.frame_times)
+        if frame_times:
+            lines += ["# HELP signsynth_frame_time_seconds Frame time over the last frames.",
+                      "# TYPE signsynth_frame_time_seconds summary"]
+            for q in FRAME_TIME_QUANTILES:
+                value = frame_times[min(len(frame_times) - 1, int(q * len(frame_times)))]
+                lines.append(f'signsynth_frame_time_seconds{{quantile="{q}"}} {value!r}')
+            lines += [f"signsynth_frame_time_seconds_sum {sum(frame_times)!r}",
+                      f"signsynth_frame_time_seconds_count {len(frame_times)}"]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=None, host=None):
+        """Enable collection and serve /metrics on a daemon thread. Returns the bound port."""
+        port = metrics_port_config.getValue() if port is None else port
+        host = host or metrics_bind_config.getValue()
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.enabled = True
+        threading.Thread(target=self.server.serve_forever, name="Metrics", daemon=True).start()
+        print(f"Metrics available at http://{host}:{self.server.server_port}/metrics")
+        return self.server.server_port
+
+    def shutdown(self):
+        if self.server:
+            self.server.shutdown()
+            self.server = None
+        self.enabled = False
+
+
+metrics = Metrics()
@@ -0,0 +1,300 @@
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+FINGER_SEGMENTS = (
+    ("thumb", 2),
+    ("index", 3),
+    ("middle", 3),
+    ("ring", 3),
+    ("pinky", 3),
+)
+
+HANDS = (
+    ("leftHand", "l"),
+    ("rightHand", "r"),
+)
+
+
+def _hand_joint_names(prefix):
+    names = [f"{prefix}arm"]
+    for finger, segments in FINGER_SEGMENTS:
+        names.extend(f"{prefix}{finger}{i}" for i in range(1, segments + 1))
+    return names
+
+
+# Joint names match the NodePath attributes created in SignLanguageApp.setup_arm_details.
+JOINT_NAMES = tuple(_hand_joint_names("l") + _hand_joint_names("r"))
+
+
+def load_pose_file(pose_file):
+    """Read the sign pose library (sign_poses.json)."""
+    try:
+        with open(pose_file, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"Error: Could not find sign_poses.json at {pose_file}")
+        raise
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON in sign_poses.json: {e}")
+        raise
+
+
+def expand_gloss(words, gesture_data):
+    """
+    Pose names for a list of gloss words: a word with its own sign maps to it,
+    anything else is fingerspelled letter by letter. Returns (poses, signed,
+    fingerspelled) where the last two count words.
+    """
+    poses = []
+    signed = fingerspelled = 0
+    for word in words:
+        word = word.lower()
+        if word in gesture_data:
+            poses.append(word)
+            signed += 1
+        else:
+            poses.extend(letter for letter in word if letter in gesture_data)
+            fingerspelled += 1
+    return poses, signed, fingerspelled
+
+
+def hpr_to_quat(hpr):
+    """
+    Convert an (N, 3) array of Panda3D heading/pitch/roll degrees into an
+    (N, 4) array of (w, x, y, z) quaternions, matching LQuaternion.setHpr.
+    """
+    h, p, r = (np.radians(np.asarray(hpr, dtype=np.float64).reshape(-1, 3)) * 0.5).T
+    ch, sh = np.cos(h), np.sin(h)
+    cp, sp = np.cos(p), np.sin(p)
+    cr, sr = np.cos(r), np.sin(r)
+
+    # heading about Z, then pitch about X, then roll about Y
+    w, x, y, z = ch * cp, ch * sp, sh * sp, sh * cp
+    return np.stack([
+        w * cr - y * sr,
+        x * cr - z * sr,
+        w * sr + y * cr,
+        z * cr + x * sr,
+    ], axis=-1)
+
+
+def quat_angle(q0, q1):
+    """Rotation angle in degrees between matching rows of two quaternion arrays."""
+    dot = np.abs(np.sum(np.asarray(q0) * np.asarray(q1), axis=-1))
+    return np.degrees(2.0 * np.arccos(np.clip(dot, 0.0, 1.0)))
+
+
+def slerp(q0, q1, t):
+    """
+    Batched shortest-path spherical interpolation between two (N, 4)
+    quaternion arrays. `t` is a scalar or an (N,) array.
+    """
+    return QuatBlend(q0, q1).sample(t)
+
+
+class QuatBlend:
+    """
+    Precomputes the per-row terms of a batched slerp so that sampling a frame
+    only costs a couple of vectorized sin evaluations.
+    """
+
+    def __init__(self, q0, q1):
+        q0 = np.asarray(q0, dtype=np.float64)
+        q1 = np.asarray(q1, dtype=np.float64)
+        dot = np.sum(q0 * q1, axis=-1)
+
+        # q and -q are the same rotation; flip so we always take the short way round
+        q1 = np.where(dot[:, None] < 0.0, -q1, q1)
+        dot = np.clip(np.abs(dot), 0.0, 1.0)
+
+        self.q0 = q0
+        self.q1 = q1
+        self.theta = np.arccos(dot)
+        self.sin_theta = np.sin(self.theta)
+        self.linear = self.sin_theta < 1e-6
+
+    def sample(self, t):
+        t = np.asarray(t, dtype=np.float64)
+        safe_sin = np.where(self.linear, 1.0, self.sin_theta)
+        s0 = np.where(self.linear, 1.0 - t, np.sin((1.0 - t) * self.theta) / safe_sin)
+        s1 = np.where(self.linear, t, np.sin(t * self.theta) / safe_sin)
+        q = s0[:, None] * self.q0 + s1[:, None] * self.q1
+        return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+class KeyframeDelta:
+    """The joints a single keyframe transition has to drive, with their end pos/quat arrays."""
+
+    __slots__ = ("joints", "pos", "quat")
+
+    def __init__(self, joints, pos, quat):
+        self.joints = joints
+        self.pos = pos
+        self.quat = quat
+
+    def __len__(self):
+        return len(self.joints)
+
+
+class PoseBlend:
+    """
+    Blends a set of joints from their sampled start transforms to the end of a
+    KeyframeDelta: positions are lerped and rotations slerped over arrays.
+    """
+
+    def __init__(self, delta, start_pos, start_quat):
+        self.start_pos = np.asarray(start_pos, dtype=np.float64)
+        self.offset = delta.pos - self.start_pos
+        self.rotation = QuatBlend(start_quat, delta.quat)
+
+    def sample(self, t):
+        return self.start_pos + self.offset * t, self.rotation.sample(t)
+
+
+class PoseCompiler:
+    """
+    Compiles sign_poses.json entries into flat per-joint keyframes with
+    precomputed quaternions, and computes pose transitions as deltas against
+    the current rig state, so that joints which do not change are not driven.
+    """
+
+    def __init__(self, gesture_data, tolerance=1e-3, cache_size=512):
+        self.gesture_data = gesture_data
+        self.tolerance = tolerance
+        self.cache_size = cache_size
+        self.keyframe_cache = {}
+        self.delta_cache = OrderedDict()
+
+        self.transitions = 0
+        self.joints_driven = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _pose_list(self, name):
+        poses = self.gesture_data.get(name)
+        if not poses:
+            return []
+        return poses if isinstance(poses, list) else [poses]
+
+    def _collect_joints(self, pose):
+        for hand_key, prefix in HANDS:
+            hand = pose.get(hand_key)
+            if not hand:
+                continue
+            yield f"{prefix}arm", hand["pos"], hand["hpr"]
+
+            fingers = hand.get("fingers", {})
+            for finger, segments in FINGER_SEGMENTS:
+                for i, part in enumerate(fingers.get(finger, [])[:segments]):
+                    yield f"{prefix}{finger}{i + 1}", part["pos"], part["hpr"]
+
+    def compile_all(self):
+        """
+        Precompute keyframes for every pose in the library, converting all
+        rotations to quaternions in a single batch.
+        """
+        entries = []
+        for name in self.gesture_data:
+            for k, pose in enumerate(self._pose_list(name)):
+                for joint, pos, hpr in self._collect_joints(pose):
+                    entries.append((name, k, joint, pos, hpr))
+        if not entries:
+            return
+
+        quats = hpr_to_quat([hpr for *_, hpr in entries])
+        compiled = {name: [{} for _ in self._pose_list(name)] for name in self.gesture_data}
+        for (name, k, joint, pos, _), quat in zip(entries, quats):
+            compiled[name][k][joint] = (tuple(float(v) for v in pos), tuple(quat.tolist()))
+        self.keyframe_cache.update(compiled)
+
+    def compile_keyframe(self, pose):
+        """Flatten one pose keyframe into {joint_name: (pos, quat)} for the joints it defines."""
+        joints = list(self._collect_joints(pose))
+        if not joints:
+            return {}
+        quats = hpr_to_quat([hpr for *_, hpr in joints])
+        return {joint: (tuple(float(v) for v in pos), tuple(quat.tolist()))
+                for (joint, pos, _), quat in zip(joints, quats)}
+
+    def keyframes(self, name):
+        """Return the compiled keyframe list for a pose name (empty if unknown)."""
+        compiled = self.keyframe_cache.get(name)
+        if compiled is None:
+            compiled = [self.compile_keyframe(pose) for pose in self._pose_list(name)]
+            self.keyframe_cache[name] = compiled
+        return compiled
+
+    def _changed(self, current, target):
+        pos_delta = max(abs(a - b) for a, b in zip(current[0], target[0]))
+        if pos_delta > self.tolerance:
+            return True
+        return quat_angle(current[1], target[1]) > self.tolerance
+
+    def diff_keyframe(self, state, keyframe):
+        """Return the names of joints in `keyframe` that differ from `state` beyond tolerance."""
+        changed = []
+        for joint in JOINT_NAMES:
+            target = keyframe.get(joint)
+            if target is None:
+                continue
+            current = state.get(joint)
+            if current is None or self._changed(current, target):
+                changed.append(joint)
+        return changed
+
+    def _compute_transition(self, state, name):
+        deltas = []
+        state = dict(state)
+        for keyframe in self.keyframes(name):
+            joints = tuple(self.diff_keyframe(state, keyframe))
+            state.update(keyframe)
+            deltas.append(KeyframeDelta(
+                joints,
+                np.array([state[j][0] for j in joints], dtype=np.float64).reshape(-1, 3),
+                np.array([state[j][1] for j in joints], dtype=np.float64).reshape(-1, 4),
+            ))
+        return deltas, state
+
+    def transition(self, state, name, from_name=None):
+        """
+        Compute the deltas needed to move the rig from `state` through every
+        keyframe of pose `name`. Returns (deltas, end_state) where deltas holds
+        one KeyframeDelta per keyframe.
+
+        When `from_name` is given, the result is cached per (from_name, name)
+        pair and reused as long as the rig is in the same state again.
+        """
+        key = (from_name, name) if from_name else None
+        cached = self.delta_cache.get(key) if key else None
+
+        if cached is not None and cached[0] == state:
+            self.delta_cache.move_to_end(key)
+            self.cache_hits += 1
+            deltas, end_state = cached[1], cached[2]
+        else:
+            deltas, end_state = self._compute_transition(state, name)
+            if key:
+                self.cache_misses += 1
+                self.delta_cache[key] = (dict(state), deltas, end_state)
+                self.delta_cache.move_to_end(key)
+                if len(self.delta_cache) > self.cache_size:
+                    self.delta_cache.popitem(last=False)
+
+        for delta in deltas:
+            self.transitions += 1
+            self.joints_driven += len(delta)
+
+        return deltas, dict(end_state)
+
+    def average_joints_driven(self):
+        """Average number of joints driven per keyframe transition so far."""
+        if not self.transitions:
+            return 0.0
+        return self.joints_driven / self.transitions
+
+    def stats_report(self):
+        return (f"{self.average_joints_driven():.1f}/{len(JOINT_NAMES)} joints driven per transition "
+                f"over {self.transitions} transitions "
+                f"(delta cache: {self.cache_hits} hits, {self.cache_misses} misses)")
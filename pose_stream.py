@@ -0,0 +1,454 @@
+"""
+Streams the avatar's pose over WebSocket, so one headless translation node
+(speech recognition, gloss conversion and the animation timeline) can drive
+any number of thin renderers.
+
+Each client picks what it receives through the URL query string:
+
+    ws://host:8765/?mode=frames&fps=30   binary joint frames, decimated to 30 fps
+    ws://host:8765/?mode=events          only signing events; the client runs
+                                         its own animation timeline from the gloss
+
+Both modes get JSON text messages for signing events: signing_started,
+pose, signing_stopped (the gloss was signed to the end) and
+signing_cancelled (signing was interrupted; events-mode clients stop their
+own animation). A binary frame is a
+FRAME_HEADER followed by 7 float32 (pos xyz, quat wxyz) for every joint set in
+the header's bit mask, in JOINT_NAMES order. Only joints that changed since
+the last frame sent to that client are included.
+
+Slow clients are never queued up: frames are coalesced to the latest state,
+and a client whose event queue overflows is disconnected.
+
+Usage:
+    python pose_stream.py serve [--host 0.0.0.0] [--port 8765] [--fps 60] [--no-speech]
+    python pose_stream.py client ws://host:8765 [--mode frames|events] [--fps 30]
+"""
+import argparse
+import asyncio
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from direct.task import Task
+from panda3d.core import ClockObject, ConfigVariableInt, LQuaternionf, LVecBase3f
+
+from pose_compiler import JOINT_NAMES
+
+BASE_PATH = os.path.abspath(os.path.dirname(__file__))
+
+stream_port_config = ConfigVariableInt(
+    "signsynth-stream-port", 8765,
+    "Port of the pose stream server.")
+stream_event_queue_config = ConfigVariableInt(
+    "signsynth-stream-event-queue", 64,
+    "Events a stream client may fall behind by before it is disconnected.")
+
+FRAME_MAGIC = b"SSPF"
+# magic, frame number, server frame time (s), bit mask of the joints that follow
+FRAME_HEADER = struct.Struct("<4sIdI")
+JOINT_VALUES = 7
+assert len(JOINT_NAMES) <= 32
+
+
+def encode_frame(number, frame_time, state, previous=None, tolerance=1e-5):
+    """
+    Pack the rows of `state` (one per joint) that differ from `previous` into a
+    binary frame. Returns None when nothing changed.
+    """
+    if previous is None:
+        changed = np.ones(len(state), dtype=bool)
+    else:
+        changed = np.any(np.abs(state - previous) > tolerance, axis=1)
+        if not changed.any():
+            return None
+    mask = sum(1 << int(i) for i in np.flatnonzero(changed))
+    header = FRAME_HEADER.pack(FRAME_MAGIC, number & 0xFFFFFFFF, frame_time, mask)
+    return header + state[changed].astype("<f4").tobytes()
+
+
+def decode_frame(data):
+    """Returns (frame number, frame time, joint indices, (n, 7) float32 values)."""
+    magic, number, frame_time, mask = FRAME_HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC:
+        raise ValueError("not a pose frame")
+    indices = [i for i in range(len(JOINT_NAMES)) if mask & (1 << i)]
+    values = np.frombuffer(data, dtype="<f4", offset=FRAME_HEADER.size).reshape(-1, JOINT_VALUES)
+    if len(values) != len(indices):
+        raise ValueError("pose frame length does not match its joint mask")
+    return number, frame_time, indices, values
+
+
+def read_rig_state(joints):
+    """Current (pos, quat) of every joint as a (len(JOINT_NAMES), 7) float32 array."""
+    return np.array([tuple(joints[name].getPos()) + tuple(joints[name].getQuat()) for name in JOINT_NAMES],
+                    dtype=np.float32)
+
+
+class StreamClient:
+    """Per-connection state on the server side."""
+
+    def __init__(self, connection, mode, fps, event_queue_size):
+        self.connection = connection
+        self.mode = mode
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.wake = asyncio.Event()
+        self.events = asyncio.Queue(maxsize=event_queue_size)
+        self.sent_state = None
+        self.last_number = None
+        self.next_frame_at = 0.0
+        self.frames_sent = 0
+        self.frames_coalesced = 0
+        self.bytes_sent = 0
+
+
+class PoseStreamServer:
+    """
+    Publishes the app's rig state once per frame (only when it changed) and its
+    signing events to every connected client. The WebSocket side runs on its
+    own asyncio thread; the render loop only hands it a copy of the state.
+    """
+
+    def __init__(self, app, host="0.0.0.0", port=None, max_fps=60):
+        self.app = app
+        self.host = host
+        self.port = stream_port_config.getValue() if port is None else port
+        self.max_fps = max_fps
+        self.event_queue_size = stream_event_queue_config.getValue()
+        self.clients = set()
+        self.latest = None
+        self.published_state = None
+        self.frame_number = 0
+        self.loop = None
+        self.server = None
+        self.ready = threading.Event()
+        self.disconnected_slow = 0
+
+    def start(self):
+        threading.Thread(target=self._run_loop, name="PoseStream", daemon=True).start()
+        self.ready.wait()
+        if self.server is None:
+            raise OSError(f"could not listen on {self.host}:{self.port}")
+
+        self.app.accept("signsynth-signing-started", self.on_signing_started)
+        self.app.accept("signsynth-pose", lambda pose: self.send_event({"type": "pose", "pose": pose}))
+        self.app.accept("signsynth-signing-stopped", lambda: self.send_event({"type": "signing_stopped"}))
+        self.app.accept("signsynth-signing-cancelled", lambda: self.send_event({"type": "signing_cancelled"}))
+        # After the interval manager has moved the joints, before the frame is rendered.
+        self.app.taskMgr.add(self.frame_task, "PoseStreamTask", sort=45)
+        print(f"Pose stream listening on ws://{self.host}:{self.port}")
+        return self
+
+    def _run_loop(self):
+        from websockets.asyncio.server import serve
+
+        async def listen():
+            return await serve(self.handler, self.host, self.port)
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(listen())
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            print(f"Pose stream could not start: {e}")
+            return
+        finally:
+            self.ready.set()
+        self.loop.run_forever()
+
+    def stop(self):
+        self.app.taskMgr.remove("PoseStreamTask")
+        for event in ("signsynth-signing-started", "signsynth-pose", "signsynth-signing-stopped",
+                      "signsynth-signing-cancelled"):
+            self.app.ignore(event)
+        if self.loop and self.server:
+            self.loop.call_soon_threadsafe(self.server.close)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def on_signing_started(self, gloss):
+        self.send_event({
+            "type": "signing_started", "gloss": gloss, "sign_delay": self.app.sign_delay,
+            "transition_time": self.app.transition_time, "coarticulation": self.app.coarticulation,
+        })
+
+    def frame_task(self, task):
+        if not self.clients:
+            return Task.cont
+        state = read_rig_state(self.app.joints)
+        if self.published_state is None or not np.array_equal(state, self.published_state):
+            self.published_state = state
+            self.frame_number += 1
+            frame = (self.frame_number, ClockObject.getGlobalClock().getFrameTime(), state)
+            self.loop.call_soon_threadsafe(self._publish, frame)
+        return Task.cont
+
+    def send_event(self, event):
+        """Queue a JSON event for every client. Safe to call from any thread."""
+        if self.loop is not None and self.clients:
+            event["t"] = ClockObject.getGlobalClock().getFrameTime()
+            self.loop.call_soon_threadsafe(self._broadcast_event, json.dumps(event))
+
+    # -- asyncio thread --
+
+    def _publish(self, frame):
+        self.latest = frame
+        for client in self.clients:
+            if client.mode == "frames":
+                client.wake.set()
+
+    def _broadcast_event(self, message):
+        for client in list(self.clients):
+            try:
+                client.events.put_nowait(message)
+            except asyncio.QueueFull:
+                self.disconnected_slow += 1
+                self.clients.discard(client)
+                self.loop.create_task(client.connection.close(1013, "client too slow"))
+                continue
+            client.wake.set()
+
+    def hello(self, client):
+        return json.dumps({
+            "type": "hello", "mode": client.mode, "joints": JOINT_NAMES,
+            "fps": 1.0 / client.interval if client.interval else self.max_fps,
+            "sign_delay": self.app.sign_delay, "transition_time": self.app.transition_time,
+        })
+
+    async def handler(self, connection):
+        query = parse_qs(urlsplit(connection.request.path).query)
+        mode = query.get("mode", ["frames"])[0]
+        if mode not in ("frames", "events"):
+            await connection.close(1008, f"unknown mode {mode!r}")
+            return
+        try:
+            fps = min(float(query.get("fps", [self.max_fps])[0]), self.max_fps)
+        except ValueError:
+            fps = self.max_fps
+
+        client = StreamClient(connection, mode, fps, self.event_queue_size)
+        await connection.send(self.hello(client))
+        self.clients.add(client)
+        client.wake.set()
+        peer = connection.remote_address
+        print(f"Pose stream client connected: {peer} ({mode}, {fps:g} fps)")
+
+        sender = asyncio.ensure_future(self._send_loop(client))
+        receiver = asyncio.ensure_future(connection.wait_closed())
+        try:
+            await asyncio.wait((sender, receiver), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sender.cancel()
+            receiver.cancel()
+            self.clients.discard(client)
+            print(f"Pose stream client disconnected: {peer} ({client.frames_sent} frames, "
+                  f"{client.frames_coalesced} coalesced, {client.bytes_sent / 1024:.0f} KiB)")
+
+    async def _send_loop(self, client):
+        loop = asyncio.get_running_loop()
+        connection = client.connection
+        while True:
+            await client.wake.wait()
+            client.wake.clear()
+
+            while not client.events.empty():
+                await connection.send(client.events.get_nowait())
+
+            if client.mode != "frames" or self.latest is None or self.latest[0] == client.last_number:
+                continue
+            delay = client.next_frame_at - loop.time()
+            if delay > 0:
+                # Decimation: frames published while we wait are coalesced into the latest one.
+                await asyncio.sleep(delay)
+            number, frame_time, state = self.latest
+            if client.last_number is not None:
+                client.frames_coalesced += max(0, number - client.last_number - 1)
+            client.last_number = number
+            client.next_frame_at = loop.time() + client.interval
+
+            payload = encode_frame(number, frame_time, state, client.sent_state)
+            if payload is None:
+                continue
+            # send() waits while the socket's write buffer is full; the next frame
+            # sent afterwards is simply the latest one.
+            await connection.send(payload)
+            client.sent_state = state
+            client.frames_sent += 1
+            client.bytes_sent += len(payload)
+
+
+class PoseStreamClient:
+    """
+    Thin renderer side: receives the stream on a background thread and applies
+    it to the local rig once per frame. In "frames" mode joints are set
+    directly; in "events" mode the local animator plays each gloss it is sent.
+    """
+
+    def __init__(self, app, url, mode="frames", fps=None, reconnect_delay=2.0):
+        self.app = app
+        self.mode = mode
+        parts = urlsplit(url)
+        query = {"mode": mode}
+        if fps:
+            query["fps"] = f"{fps:g}"
+        self.url = parts._replace(path=parts.path or "/",
+                                  query="&".join(f"{k}={v}" for k, v in query.items())).geturl()
+        self.reconnect_delay = reconnect_delay
+        self.events = queue.Queue()
+        self.lock = threading.Lock()
+        self.state = np.zeros((len(JOINT_NAMES), JOINT_VALUES), dtype=np.float32)
+        self.dirty = set()
+        self.frames_received = 0
+        self.running = False
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=lambda: asyncio.run(self._receive_forever()),
+                         name="PoseStreamClient", daemon=True).start()
+        self.app.taskMgr.add(self.apply_task, "PoseStreamClientTask", sort=45)
+        return self
+
+    def stop(self):
+        self.running = False
+        self.app.taskMgr.remove("PoseStreamClientTask")
+
+    async def _receive_forever(self):
+        from websockets.asyncio.client import connect
+        from websockets.exceptions import WebSocketException
+
+        while self.running:
+            try:
+                async with connect(self.url, max_queue=64) as connection:
+                    self.events.put({"type": "connected"})
+                    async for message in connection:
+                        if isinstance(message, bytes):
+                            self._receive_frame(message)
+                        else:
+                            self.events.put(json.loads(message))
+            except (OSError, WebSocketException) as e:
+                self.events.put({"type": "disconnected", "reason": str(e)})
+            await asyncio.sleep(self.reconnect_delay)
+
+    def _receive_frame(self, data):
+        try:
+            _, _, indices, values = decode_frame(data)
+        except (ValueError, struct.error) as e:
+            print(f"Ignoring bad pose frame: {e}")
+            return
+        with self.lock:
+            self.state[indices] = values
+            self.dirty.update(indices)
+            self.frames_received += 1
+
+    def apply_task(self, task):
+        app = self.app
+        while not self.events.empty():
+            self.handle_event(self.events.get_nowait())
+
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            rows = {i: self.state[i].tolist() for i in dirty}
+        if rows:
+            app.idle_throttle.wake()
+            for i, row in rows.items():
+                app.joints[JOINT_NAMES[i]].setPosQuat(LVecBase3f(*row[:3]), LQuaternionf(*row[3:]))
+        return Task.cont
+
+    def handle_event(self, event):
+        app = self.app
+        kind = event.get("type")
+        app.idle_throttle.wake()
+        if kind == "connected":
+            app.show_popup(f"Connected to {self.url}")
+        elif kind == "disconnected":
+            app.gloss_text_node.setText("Stream disconnected, retrying...")
+        elif kind == "hello":
+            app.set_sign_delay(event["sign_delay"])
+            app.transition_time = event["transition_time"]
+        elif kind == "signing_started":
+            if self.mode == "events":
+                app.set_sign_delay(event["sign_delay"])
+                app.transition_time = event["transition_time"]
+                app.coarticulation = event["coarticulation"]
+                app.start_animation(event["gloss"])
+            else:
+                app.gloss_text_node.setText(f"Signing: {event['gloss']}")
+        elif kind == "pose" and self.mode == "frames":
+            app.recognized_text_node.setText(event["pose"].upper())
+        elif kind == "signing_stopped" and self.mode == "frames":
+            app.gloss_text_node.setText("Animation Complete")
+        elif kind == "signing_cancelled":
+            if self.mode == "events":
+                app.stopAnimation()
+                # Ease back to rest; a signing_started that follows takes over from wherever this is.
+                app.playTransition("default")
+            app.gloss_text_node.setText("Signing stopped")
+
+
+def configure_panda(window):
+    from panda3d.core import Filename, loadPrcFileData
+    loadPrcFileData("", f"model-path {Filename.fromOsSpecific(BASE_PATH).getFullpath()}")
+    loadPrcFileData("", "window-type none")
+    if not window:
+        loadPrcFileData("", "audio-library-name null")
+
+
+def serve(args):
+    configure_panda(window=False)
+    from control_api import ControlApi, control_port_config, control_ws_port_config
+    from sign_language_app import SignLanguageApp
+
+    app = SignLanguageApp(version="pose-stream", start_speech=not args.no_speech)
+    clock = ClockObject.getGlobalClock()
+    clock.setMode(ClockObject.MLimited)
+    clock.setFrameRate(args.fps)
+    try:
+        PoseStreamServer(app, args.host, args.port, max_fps=args.fps).start()
+        if control_port_config.getValue() or control_ws_port_config.getValue():
+            ControlApi(app).start()
+    except OSError as e:
+        print(e)
+        return 1
+    app.run()
+    return 0
+
+
+def client(args):
+    configure_panda(window=True)
+    from sign_language_app import SignLanguageApp
+
+    app = SignLanguageApp(version=f"stream client: {args.url}", start_speech=False)
+    app.speech_toggle_button.hide()
+    app.gloss_text_node.setText(f"Connecting to {args.url}...")
+    PoseStreamClient(app, args.url, mode=args.mode, fps=args.fps).start()
+    app.open_app_window()
+    app.run()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream the signing avatar over WebSocket.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = sub.add_parser("serve", help="Run recognition and animation headless and stream the pose.")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, help="Default: signsynth-stream-port.")
+    serve_parser.add_argument("--fps", type=float, default=60, help="Animation and maximum stream frame rate.")
+    serve_parser.add_argument("--no-speech", action="store_true", help="Don't start speech recognition.")
+
+    client_parser = sub.add_parser("client", help="Render a pose stream.")
+    client_parser.add_argument("url", help="Server URL, e.g. ws://192.168.1.20:8765")
+    client_parser.add_argument("--mode", choices=("frames", "events"), default="frames")
+    client_parser.add_argument("--fps", type=float, help="Ask the server to decimate frames to this rate.")
+
+    args = parser.parse_args(argv)
+    return serve(args) if args.command == "serve" else client(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Offline model preparation: flattens the static character and skybox models,
+keeps only the animated arm joints as separate nodes, and writes optimized
+.bam files into an "optimized" folder next to each source model.
+
+Usage:
+    python prepare_models.py [--report report.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+from panda3d.core import (Filename, Loader, LoaderOptions, MaterialAttrib, MaterialPool, ModelNode, NodePath,
+                          loadPrcFileData)
+
+from pose_compiler import FINGER_SEGMENTS
+
+BASE_PATH = os.path.abspath(os.path.dirname(__file__))
+
+# Node names of the finger joints inside RArm.bam / LArm.bam (t1, t2, i1, ... p3).
+FINGER_JOINT_NODES = tuple(f"{finger[0]}{i}" for finger, segments in FINGER_SEGMENTS
+                           for i in range(1, segments + 1))
+
+STATIC_MODELS = ("character/body.bam", "skybox/skybox.bam")
+ARM_MODELS = ("character/RArm.bam", "character/LArm.bam")
+
+
+def optimized_path(relative_path):
+    """Relative path of the optimized copy of a model, e.g. character/optimized/RArm.bam."""
+    folder, name = os.path.split(relative_path)
+    return os.path.join(folder, "optimized", name)
+
+
+def preferred_model_path(base_path, relative_path, check_stale=True):
+    """
+    Path to load for a model: its optimized copy if there is one, unless the
+    source .bam has been modified since the copy was written (then the source
+    is loaded and a warning printed until prepare_models.py is run again).
+    """
+    optimized = optimized_path(relative_path)
+    optimized_file = os.path.join(base_path, optimized)
+    if not os.path.exists(optimized_file):
+        return relative_path
+    source_file = os.path.join(base_path, relative_path)
+    if check_stale and os.path.exists(source_file) and os.path.getmtime(source_file) > os.path.getmtime(optimized_file):
+        print(f"{relative_path} is newer than {optimized.replace(os.sep, '/')}; loading the source model "
+              f"(run prepare_models.py to update the optimized copy)")
+        return relative_path
+    return optimized.replace(os.sep, "/")
+
+
+def scene_stats(model):
+    """Count draw calls (geoms), GeomNodes and total nodes under a model."""
+    geom_nodes = model.findAllMatches("**/+GeomNode")
+    return {
+        "draw_calls": sum(np.node().getNumGeoms() for np in geom_nodes),
+        "geom_nodes": geom_nodes.getNumPaths(),
+        "nodes": model.findAllMatches("**").getNumPaths(),
+    }
+
+
+def unify_materials(model):
+    """Replace equivalent Material objects with one shared instance so their geoms can be merged."""
+    for np in model.findAllMatches("**/+GeomNode"):
+        node = np.node()
+        for i in range(node.getNumGeoms()):
+            state = node.getGeomState(i)
+            attrib = state.getAttrib(MaterialAttrib)
+            if attrib and attrib.getMaterial():
+                shared = MaterialPool.getMaterial(attrib.getMaterial())
+                node.setGeomState(i, state.setAttrib(MaterialAttrib.make(shared)))
+
+
+def preserve_joint(joint):
+    """Swap a joint node for a ModelNode that keeps its local transform through flattening."""
+    if isinstance(joint.node(), ModelNode):
+        joint.node().setPreserveTransform(ModelNode.PTLocal)
+        return joint
+
+    holder_node = ModelNode(joint.getName())
+    holder_node.setPreserveTransform(ModelNode.PTLocal)
+    holder = joint.getParent().attachNewNode(holder_node, joint.getSort())
+    holder.setTransform(joint.getTransform())
+    holder.setState(joint.getState())
+    joint.getChildren().reparentTo(holder)
+    joint.removeNode()
+    return holder
+
+
+def prepare_static(model):
+    model.clearModelNodes()
+    unify_materials(model)
+    model.flattenStrong()
+
+
+def prepare_arm(model):
+    model.clearModelNodes()
+    missing = []
+    for name in FINGER_JOINT_NODES:
+        joint = model.find(f"**/{name}")
+        if joint.isEmpty():
+            missing.append(name)
+            continue
+        preserve_joint(joint)
+    unify_materials(model)
+    model.flattenStrong()
+    return missing
+
+
+def load_model(loader, relative_path):
+    options = LoaderOptions(LoaderOptions.LFReportErrors | LoaderOptions.LFNoCache)
+    node = loader.loadSync(Filename.fromOsSpecific(os.path.join(BASE_PATH, relative_path)), options)
+    return NodePath(node) if node else None
+
+
+def prepare_all():
+    loadPrcFileData("", f"model-path {Filename.fromOsSpecific(BASE_PATH).getFullpath()}")
+    loader = Loader.getGlobalPtr()
+    report = {}
+
+    for relative_path in STATIC_MODELS + ARM_MODELS:
+        if not os.path.exists(os.path.join(BASE_PATH, relative_path)):
+            print(f"Skipping {relative_path}: file not found")
+            continue
+
+        model = load_model(loader, relative_path)
+        if model is None:
+            print(f"Skipping {relative_path}: could not load model")
+            continue
+
+        before = scene_stats(model)
+        entry = {"before": before}
+        if relative_path in ARM_MODELS:
+            missing = prepare_arm(model)
+            if missing:
+                print(f"Warning: {relative_path} has no joints named {', '.join(missing)}")
+                entry["missing_joints"] = missing
+        else:
+            prepare_static(model)
+        after = scene_stats(model)
+        entry["after"] = after
+
+        out_path = optimized_path(relative_path)
+        os.makedirs(os.path.join(BASE_PATH, os.path.dirname(out_path)), exist_ok=True)
+        if not model.writeBamFile(Filename.fromOsSpecific(os.path.join(BASE_PATH, out_path))):
+            print(f"Error: could not write {out_path}")
+            continue
+        entry["output"] = out_path.replace(os.sep, "/")
+        report[relative_path] = entry
+
+        print(f"{relative_path}: draw calls {before['draw_calls']} -> {after['draw_calls']}, "
+              f"nodes {before['nodes']} -> {after['nodes']}  ({out_path})")
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flatten SignSynth models into optimized .bam files.")
+    parser.add_argument("--report", help="Write the before/after draw call report to this JSON file.")
+    args = parser.parse_args(argv)
+
+    report = prepare_all()
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+import heapq
+import json
+import time
+from collections import deque
+
+from direct.gui.OnscreenText import OnscreenText
+from direct.interval.IntervalManager import ivalMgr
+from direct.task import Task
+from panda3d.core import ConfigVariableBool, ConfigVariableInt, PStatCollector, TextNode
+
+profiler_config = ConfigVariableBool(
+    "signsynth-profiler", False,
+    "Start with the frame profiler running (F4 toggles its overlay).")
+slow_frames_config = ConfigVariableInt(
+    "signsynth-profiler-slow-frames", 20,
+    "How many of the slowest frames the profiler keeps for the F5 dump.")
+
+# Upper bounds (ms) of the frame-time histogram buckets; the last bucket is open-ended.
+HISTOGRAM_BUCKETS = (8.3, 16.7, 33.3, 50.0, 100.0)
+
+interval_pcollector = PStatCollector("SignSynth:Active intervals")
+speech_queue_pcollector = PStatCollector("SignSynth:Speech queue depth")
+
+
+class FrameProfiler:
+    """
+    Times every taskMgr task per frame by wrapping its function. Each task
+    is reported to PStats as "App:Tasks:<name>", and the active interval
+    count and speech queue depth as levels. Keeps a rolling window of frame
+    times and the slowest frames with their per-task breakdown.
+    """
+
+    def __init__(self, app, window=300, slow_frames=None):
+        self.app = app
+        self.frame_times = deque(maxlen=window)
+        self.task_times = {}
+        self.slow_frames = []
+        self.keep_slowest = slow_frames or slow_frames_config.getValue()
+        self.collectors = {}
+        self.frame = None
+        self.frame_number = 0
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.app.taskMgr.add(self.frame_task, "ProfilerFrameTask", sort=-100)
+
+    def stop(self):
+        self.app.taskMgr.remove("ProfilerFrameTask")
+        self.running = False
+        self.frame = None
+
+    def _collector(self, name):
+        collector = self.collectors.get(name)
+        if collector is None:
+            collector = self.collectors[name] = PStatCollector(f"App:Tasks:{name}")
+        return collector
+
+    def _instrument(self, task):
+        func = task.getFunction()
+        if func is None or getattr(func, "profiled", False):
+            return
+        name = task.getName()
+        collector = self._collector(name)
+
+        def profiled(*args, **kwargs):
+            if not self.running:
+                return func(*args, **kwargs)
+            collector.start()
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                collector.stop()
+                if self.frame is not None:
+                    tasks = self.frame["tasks"]
+                    tasks[name] = tasks.get(name, 0.0) + elapsed
+
+        profiled.profiled = True
+        task.setFunction(profiled)
+
+    def _finish_frame(self, now):
+        frame = self.frame
+        frame_time = now - frame["start"]
+        self.frame_times.append(frame_time)
+        for name, elapsed in frame["tasks"].items():
+            times = self.task_times.get(name)
+            if times is None:
+                times = self.task_times[name] = deque(maxlen=self.frame_times.maxlen)
+            times.append(elapsed)
+
+        entry = (frame_time, frame["number"], frame)
+        if len(self.slow_frames) < self.keep_slowest:
+            heapq.heappush(self.slow_frames, entry)
+        elif frame_time > self.slow_frames[0][0]:
+            heapq.heapreplace(self.slow_frames, entry)
+
+    def frame_task(self, task):
+        now = time.perf_counter()
+        if self.frame is not None:
+            self._finish_frame(now)
+
+        for t in self.app.taskMgr.getTasks() + self.app.taskMgr.getDoLaters():
+            if t.getName() != "ProfilerFrameTask":
+                self._instrument(t)
+
+        intervals = ivalMgr.getNumIntervals()
+        queue_depth = self.speech_queue_depth()
+        interval_pcollector.setLevel(intervals)
+        speech_queue_pcollector.setLevel(queue_depth)
+
+        self.frame_number += 1
+        self.frame = {"number": self.frame_number, "start": now, "tasks": {},
+                      "intervals": intervals, "speech_queue": queue_depth}
+        return Task.cont
+
+    def speech_queue_depth(self):
+        processor = getattr(self.app, "speech_processor", None)
+        audio_queue = getattr(processor, "audio_queue", None)
+        return audio_queue.qsize() if audio_queue is not None else 0
+
+    def fps(self):
+        total = sum(self.frame_times)
+        return len(self.frame_times) / total if total else 0.0
+
+    def histogram(self):
+        """Frame counts per bucket of HISTOGRAM_BUCKETS, plus one for slower frames."""
+        counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        for frame_time in self.frame_times:
+            ms = frame_time * 1000
+            index = next((i for i, bound in enumerate(HISTOGRAM_BUCKETS) if ms <= bound), len(HISTOGRAM_BUCKETS))
+            counts[index] += 1
+        return counts
+
+    def task_averages(self):
+        """{task name: average ms per frame over the window}, counting frames where it did not run as 0."""
+        frames = len(self.frame_times) or 1
+        return {name: sum(times) * 1000 / frames for name, times in self.task_times.items()}
+
+    def slowest_frames(self):
+        frames = []
+        for frame_time, number, frame in sorted(self.slow_frames, reverse=True):
+            task_total = sum(frame["tasks"].values())
+            frames.append({
+                "frame": number,
+                "frame_ms": round(frame_time * 1000, 3),
+                "tasks_ms": {name: round(t * 1000, 3)
+                             for name, t in sorted(frame["tasks"].items(), key=lambda item: -item[1])},
+                "other_ms": round((frame_time - task_total) * 1000, 3),
+                "intervals": frame["intervals"],
+                "speech_queue": frame["speech_queue"],
+            })
+        return frames
+
+    def dump(self, path):
+        """Write the slowest frames with their task breakdown to `path` as JSON."""
+        report = {
+            "fps": round(self.fps(), 2),
+            "frames_measured": self.frame_number,
+            "histogram_ms": {f"<={bound}": count for bound, count in zip(HISTOGRAM_BUCKETS, self.histogram())},
+            "task_average_ms": {name: round(ms, 3) for name, ms in self.task_averages().items()},
+            "slowest_frames": self.slowest_frames(),
+        }
+        report["histogram_ms"][f">{HISTOGRAM_BUCKETS[-1]}"] = self.histogram()[-1]
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        return path
+
+
+class ProfilerOverlay:
+    """On-screen FPS, frame-time histogram, interval count, speech queue depth and the busiest tasks."""
+
+    def __init__(self, app, profiler, update_interval=0.25, top_tasks=6):
+        self.app = app
+        self.profiler = profiler
+        self.update_interval = update_interval
+        self.top_tasks = top_tasks
+        self.text = None
+
+    @property
+    def visible(self):
+        return self.text is not None and not self.text.isHidden()
+
+    def toggle(self):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def show(self):
+        self.profiler.start()
+        if self.text is None:
+            self.text = OnscreenText(
+                parent=self.app.a2dTopRight, pos=(-0.05, -0.08), scale=0.04, fg=(1, 0.85, 0.4, 1),
+                bg=(0, 0, 0, 0.6), align=TextNode.ARight, mayChange=True
+            )
+        self.text.show()
+        self.update()
+        self.app.taskMgr.doMethodLater(self.update_interval, self.update_task, "ProfilerOverlayTask")
+
+    def hide(self):
+        self.app.taskMgr.remove("ProfilerOverlayTask")
+        if self.text is not None:
+            self.text.hide()
+
+    def update(self):
+        p = self.profiler
+        times = p.frame_times
+        lines = [f"{p.fps():5.1f} fps   frame avg {1000 * sum(times) / max(1, len(times)):5.1f} ms   "
+                 f"max {1000 * max(times, default=0):5.1f} ms"]
+
+        counts = p.histogram()
+        peak = max(counts) or 1
+        labels = [f"<={bound:g}" for bound in HISTOGRAM_BUCKETS] + [f">{HISTOGRAM_BUCKETS[-1]:g}"]
+        for label, count in zip(labels, counts):
+            lines.append(f"{label:>7} ms {'|' * int(round(20 * count / peak)):<20} {count:4d}")
+
+        lines.append(f"intervals {ivalMgr.getNumIntervals()}   speech queue {p.speech_queue_depth()}")
+        averages = sorted(p.task_averages().items(), key=lambda item: -item[1])[:self.top_tasks]
+        for name, ms in averages:
+            lines.append(f"{name:<24} {ms:6.2f} ms")
+        lines.append("F5: dump slowest frames")
+        self.text.setText("\n".join(lines))
+
+    def update_task(self, task):
+        self.update()
+        return Task.again
@@ -0,0 +1,169 @@
+from collections import deque, namedtuple
+
+from direct.task import Task
+from panda3d.core import (AntialiasAttrib, ClockObject, ConfigVariableBool, ConfigVariableDouble,
+                          ConfigVariableString, loadPrcFileData)
+
+QualityTier = namedtuple("QualityTier", "name shadows shadow_map_size auto_shader skybox msaa")
+
+# Ordered from cheapest to most expensive. "high" matches the original look of the app.
+QUALITY_TIERS = (
+    QualityTier("low", shadows=False, shadow_map_size=0, auto_shader=False, skybox=False, msaa=0),
+    QualityTier("medium", shadows=False, shadow_map_size=0, auto_shader=True, skybox=True, msaa=0),
+    QualityTier("high", shadows=True, shadow_map_size=512, auto_shader=True, skybox=True, msaa=0),
+    QualityTier("ultra", shadows=True, shadow_map_size=2048, auto_shader=True, skybox=True, msaa=4),
+)
+
+quality_tier_config = ConfigVariableString(
+    "signsynth-quality-tier", "auto",
+    "Render quality tier: auto, low, medium, high or ultra.")
+target_fps_config = ConfigVariableDouble(
+    "signsynth-target-fps", 30.0,
+    "Frame rate the automatic quality controller tries to hold.")
+auto_msaa_config = ConfigVariableBool(
+    "signsynth-auto-msaa", False,
+    "In automatic quality mode, open a multisample window so the ultra tier can use MSAA.")
+
+
+def get_tier(name):
+    for tier in QUALITY_TIERS:
+        if tier.name == name:
+            return tier
+    return None
+
+
+class QualityController:
+    """
+    Applies render quality tiers to the scene and, unless a tier is forced via
+    the signsynth-quality-tier config variable, watches the rolling frame time
+    and steps between tiers to hold the target frame rate.
+    """
+
+    def __init__(self, app, light_np, skybox=None, start_tier="high",
+                 window_size=90, evaluate_every=2.0, cooldown=4.0):
+        self.app = app
+        self.light_np = light_np
+        self.skybox = skybox
+        self.target_fps = target_fps_config.getValue()
+        self.frame_times = deque(maxlen=window_size)
+        self.evaluate_every = evaluate_every
+        self.cooldown = cooldown
+        self.last_evaluation = 0.0
+        self.last_change = 0.0
+        self.headroom_streak = 0
+        self.tier_changes = 0
+
+        forced = quality_tier_config.getValue().strip().lower()
+        self.forced_tier = get_tier(forced)
+        if forced != "auto" and not self.forced_tier:
+            print(f"Unknown quality tier '{forced}', using automatic quality.")
+
+        tier = self.forced_tier or get_tier(start_tier)
+        self.tier_index = QUALITY_TIERS.index(tier)
+        self.tier = None
+        # Samples of the window's framebuffer; tiers only enable MSAA when it has them.
+        self.multisamples = 0
+
+    def request_framebuffer(self):
+        """
+        Must run before the window opens: requests a multisample framebuffer if
+        MSAA will be used. A multisample back buffer costs memory and a resolve
+        every frame whatever the tier, so in automatic mode it is only requested
+        with signsynth-auto-msaa; otherwise "ultra" runs without MSAA.
+        """
+        if self.forced_tier:
+            samples = self.forced_tier.msaa
+        elif auto_msaa_config.getValue():
+            samples = max(tier.msaa for tier in QUALITY_TIERS)
+        else:
+            samples = 0
+        self.multisamples = samples
+        if samples:
+            loadPrcFileData("", "framebuffer-multisample 1")
+            loadPrcFileData("", f"multisamples {samples}")
+
+    def start(self):
+        """Apply the initial tier and, in automatic mode, start watching frame times."""
+        self.apply(QUALITY_TIERS[self.tier_index])
+        if not self.forced_tier:
+            self.app.taskMgr.add(self.quality_task, "QualityControlTask", sort=50)
+
+    def stop(self):
+        self.app.taskMgr.remove("QualityControlTask")
+
+    def apply(self, tier):
+        """Push a tier's settings onto the light, the scene and the skybox."""
+        render = self.app.render
+        light = self.light_np.node()
+
+        if tier.shadows and tier.auto_shader:
+            light.setShadowCaster(True, tier.shadow_map_size, tier.shadow_map_size)
+        else:
+            light.setShadowCaster(False)
+
+        if tier.auto_shader:
+            render.setShaderAuto()
+        else:
+            render.setShaderOff()
+
+        if self.skybox is not None and not self.skybox.isEmpty():
+            if tier.skybox:
+                self.skybox.show()
+            else:
+                self.skybox.hide()
+
+        if tier.msaa and self.multisamples:
+            render.setAntialias(AntialiasAttrib.MMultisample)
+        else:
+            render.clearAntialias()
+
+        if self.tier is not None:
+            self.tier_changes += 1
+            print(f"Render quality: {self.tier.name} -> {tier.name}")
+        self.tier = tier
+
+    def step(self, direction):
+        index = self.tier_index + direction
+        if not 0 <= index < len(QUALITY_TIERS):
+            return False
+        self.tier_index = index
+        self.apply(QUALITY_TIERS[index])
+        self.frame_times.clear()
+        self.headroom_streak = 0
+        return True
+
+    def average_frame_time(self):
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+
+    def quality_task(self, task):
+        clock = ClockObject.getGlobalClock()
+        # Frames limited on purpose (e.g. an idle frame cap) say nothing about GPU load.
+        if clock.getMode() == ClockObject.MLimited:
+            return Task.cont
+
+        self.frame_times.append(clock.getDt())
+        now = clock.getRealTime()
+
+        if now - self.last_evaluation < self.evaluate_every or len(self.frame_times) < self.frame_times.maxlen:
+            return Task.cont
+        self.last_evaluation = now
+        if now - self.last_change < self.cooldown:
+            return Task.cont
+
+        budget = 1.0 / self.target_fps
+        average = self.average_frame_time()
+
+        if average > budget * 1.1:
+            if self.step(-1):
+                self.last_change = now
+        elif average < budget * 0.6:
+            # Require sustained headroom before paying for a more expensive tier.
+            self.headroom_streak += 1
+            if self.headroom_streak >= 3 and self.step(1):
+                self.last_change = now
+        else:
+            self.headroom_streak = 0
+
+        return Task.cont
@@ -0,0 +1,242 @@
+"""
+Replays a recorded speech session (see signsynth-record-dir) through the full
+pipeline: VOSK recognition -> gloss -> handle_speech_result -> animation,
+headless, on a simulated clock at 1x or N x real time.
+
+Panda3D's clock runs in non-real-time mode, so every frame advances the
+simulation by exactly 1/fps. Recognition and gloss conversion run for real,
+and their measured cost is charged to the simulated clock as if they ran
+live, so a slow decoder shows up as backlog and late utterances.
+
+Usage:
+    python replay.py sessions/session-20250101-120000 [--speed 4] [--fps 60]
+                     [--recorded-results] [--output replay.json]
+"""
+import argparse
+import heapq
+import json
+import os
+import statistics
+import sys
+import time
+
+BASE_PATH = os.path.abspath(os.path.dirname(__file__))
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+class ReplayHarness:
+    """
+    Drives `app` with the audio and results of `session`. With
+    recorded_results, the recognized text and gloss are taken from the
+    recording instead of running VOSK and NLTK again, which isolates the
+    scheduling and animation side.
+    """
+
+    def __init__(self, session, app, speed=1.0, fps=60, recorded_results=False, model=None,
+                 converter=None, tail=30.0):
+        self.session = session
+        self.app = app
+        self.speed = speed
+        self.fps = fps
+        self.recorded_results = recorded_results
+        self.model = model
+        self.converter = converter
+        self.tail = tail
+
+        self.deliveries = []
+        self.decoder_free_at = 0.0
+        self.queue_waits = []
+        self.decode_ratios = []
+        self.max_backlog_blocks = 0
+        self.waiting_blocks = []
+        self.latencies = []
+        self.utterances = 0
+        self.played = 0
+        self.dropped = 0
+        self.no_pose = 0
+        self.pending_first_pose = None
+        self.last_delivery = 0.0
+
+    def _schedule(self, deliver_at, text, gloss, speech_end):
+        self.last_delivery = max(self.last_delivery, deliver_at)
+        heapq.heappush(self.deliveries, (deliver_at, self.utterances, text, gloss, speech_end))
+        self.utterances += 1
+
+    def _schedule_recorded_results(self):
+        for result in self.session.results:
+            if result.get("text"):
+                self._schedule(result["decoded_at"] + result.get("convert_time", 0.0),
+                               result["text"], result.get("gloss", ""), result["t"])
+
+    def _decode_block(self, recognizer, block):
+        """Decode one block as the live recognizer thread would, charging its real cost to the clock."""
+        arrival = block["t"]
+        start = max(arrival, self.decoder_free_at)
+        self.queue_waits.append(start - arrival)
+        self.waiting_blocks = [t for t in self.waiting_blocks if t > arrival] + [start]
+        self.max_backlog_blocks = max(self.max_backlog_blocks, len(self.waiting_blocks))
+
+        started = time.perf_counter()
+        final = recognizer.AcceptWaveform(self.session.block_audio(block))
+        decode_time = time.perf_counter() - started
+        self.decode_ratios.append(decode_time / (block["frames"] / self.session.sample_rate))
+        self.decoder_free_at = start + decode_time
+        if not final:
+            return
+
+        text = json.loads(recognizer.Result()).get("text", "").strip()
+        if not text:
+            return
+        started = time.perf_counter()
+        gloss = self.converter.convert_to_sign_gloss(text)
+        convert_time = time.perf_counter() - started
+        self.decoder_free_at += convert_time
+        self._schedule(self.decoder_free_at, text, gloss, arrival)
+
+    def _deliver(self, now):
+        while self.deliveries and self.deliveries[0][0] <= now:
+            _, _, text, gloss, speech_end = heapq.heappop(self.deliveries)
+            self.app.utterance_started = None
+            self.app.handle_speech_result(text, gloss)
+            if self.app.utterance_started is None:
+                self.dropped += 1
+                continue
+            if self.pending_first_pose is not None:
+                self.no_pose += 1
+            self.pending_first_pose = speech_end
+
+    def _check_first_pose(self, now):
+        if self.pending_first_pose is None:
+            return
+        if self.app.utterance_started is None:
+            self.latencies.append(now - self.pending_first_pose)
+            self.played += 1
+            self.pending_first_pose = None
+        elif not self.app.is_animating:
+            self.no_pose += 1
+            self.pending_first_pose = None
+
+    def run(self):
+        from panda3d.core import ClockObject
+
+        recognizer = None
+        if self.recorded_results:
+            self._schedule_recorded_results()
+        else:
+            from speech_gloss import vosk
+            recognizer = vosk.KaldiRecognizer(self.model, self.session.sample_rate)
+
+        clock = ClockObject.getGlobalClock()
+        previous_mode = clock.getMode()
+        clock.setMode(ClockObject.MNonRealTime)
+        clock.setFrameRate(self.fps)
+
+        blocks = list(self.session.blocks) if recognizer else []
+        end_time = self.session.duration
+        sim_start = clock.getFrameTime()
+        wall_start = time.perf_counter()
+        now = 0.0
+        try:
+            while True:
+                while blocks and blocks[0]["t"] <= now:
+                    self._decode_block(recognizer, blocks.pop(0))
+                self._deliver(now)
+
+                self.app.taskMgr.step()
+                now = clock.getFrameTime() - sim_start
+                self._check_first_pose(now)
+
+                done = not blocks and not self.deliveries and not self.app.is_animating
+                last_event = max(end_time, self.decoder_free_at, self.last_delivery)
+                if (done and now >= end_time) or now > last_event + self.tail:
+                    break
+
+                if self.speed > 0:
+                    ahead = now / self.speed - (time.perf_counter() - wall_start)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        finally:
+            clock.setMode(previous_mode)
+
+        wall = time.perf_counter() - wall_start
+        return self.stats(now, wall)
+
+    def stats(self, sim_time, wall_time):
+        def ms(value):
+            return None if value is None else round(value * 1000, 1)
+
+        return {
+            "session": self.session.base_path,
+            "mode": "recorded-results" if self.recorded_results else "recognize",
+            "sim_seconds": round(sim_time, 3),
+            "wall_seconds": round(wall_time, 3),
+            "effective_speed": round(sim_time / wall_time, 2) if wall_time else None,
+            "utterances": self.utterances,
+            "played": self.played,
+            "dropped": self.dropped,
+            "no_pose": self.no_pose,
+            "latency_ms": {
+                "p50": ms(percentile(self.latencies, 0.5)),
+                "p95": ms(percentile(self.latencies, 0.95)),
+                "max": ms(max(self.latencies) if self.latencies else None),
+            },
+            "backlog": {
+                "max_queue_wait_ms": ms(max(self.queue_waits) if self.queue_waits else None),
+                "mean_queue_wait_ms": ms(statistics.fmean(self.queue_waits) if self.queue_waits else None),
+                "max_blocks_waiting": self.max_backlog_blocks,
+            },
+            "decode_real_time_factor": round(statistics.fmean(self.decode_ratios), 4)
+            if self.decode_ratios else None,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded speech session through the pipeline.")
+    parser.add_argument("session", help="Session base path (or its .wav / .jsonl file).")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Replay speed relative to real time (1 = live pace, 0 = as fast as possible).")
+    parser.add_argument("--fps", type=int, default=60, help="Simulated frame rate.")
+    parser.add_argument("--recorded-results", action="store_true",
+                        help="Use the recorded recognition results instead of running VOSK again.")
+    parser.add_argument("--sign-delay", type=float, help="Override the delay between signs (0.5-2.0 s, like the slider).")
+    parser.add_argument("--output", help="Write the statistics to this JSON file.")
+    args = parser.parse_args(argv)
+
+    from panda3d.core import Filename, loadPrcFileData
+    loadPrcFileData("", f"model-path {Filename.fromOsSpecific(BASE_PATH).getFullpath()}")
+    loadPrcFileData("", "window-type none")
+    loadPrcFileData("", "audio-library-name null")
+
+    from sign_language_app import SignLanguageApp
+    from speech_session import Session
+
+    session = Session(args.session)
+    model = converter = None
+    if not args.recorded_results:
+        from speech_gloss import SpeechGloss, load_vosk_model
+        model = load_vosk_model()
+        # No gloss cache, so the decoder clock is charged the real conversion cost of every utterance.
+        converter = SpeechGloss(model=model, record_dir="", gloss_cache_size=0)
+
+    app = SignLanguageApp(version="replay", start_speech=False)
+    if args.sign_delay is not None:
+        app.set_sign_delay(args.sign_delay)
+
+    harness = ReplayHarness(session, app, speed=args.speed, fps=args.fps,
+                            recorded_results=args.recorded_results, model=model, converter=converter)
+    stats = harness.run()
+    print(json.dumps(stats, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(stats, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Streaming conversion of captured audio to the 16 kHz mono int16 that VOSK
+expects, so input devices can run at their native rate and channel count.
+"""
+from math import ceil, gcd
+
+import numpy as np
+
+TARGET_RATE = 16000
+
+
+def design_polyphase_filter(up, down, taps_per_phase=24, cutoff=0.9, beta=8.0):
+    """
+    Kaiser-windowed sinc low-pass for resampling by up/down, split into `up`
+    phases of `taps_per_phase` taps each (shape (up, taps_per_phase)). The
+    passband ends at `cutoff` times the lower of the two Nyquist frequencies.
+    """
+    length = up * taps_per_phase
+    fc = cutoff * 0.5 / max(up, down)
+    n = np.arange(length) - (length - 1) / 2
+    h = 2 * fc * np.sinc(2 * fc * n) * np.kaiser(length, beta) * up
+    return h.reshape(taps_per_phase, up).T.copy()
+
+
+class StreamingResampler:
+    """
+    Downmixes and resamples consecutive int16 blocks from `in_rate` with
+    `channels` interleaved channels to TARGET_RATE mono. This is a polyphase
+    FIR: each output sample is one dot product with the filter phase for its
+    fractional position, and a whole block is computed in one vectorized
+    step. The filter history and the fractional position carry over between
+    blocks, so block boundaries are seamless.
+    """
+
+    def __init__(self, in_rate, channels=1, out_rate=TARGET_RATE, zero_crossings=16):
+        self.in_rate = int(in_rate)
+        self.channels = channels
+        self.out_rate = out_rate
+        divisor = gcd(self.in_rate, out_rate)
+        self.up, self.down = out_rate // divisor, self.in_rate // divisor
+        self.passthrough = self.up == self.down
+        if not self.passthrough:
+            # When decimating, the filter has to span proportionally more input samples.
+            self.taps = ceil(zero_crossings * max(1.0, self.down / self.up))
+            self.phases = design_polyphase_filter(self.up, self.down, self.taps)
+            # Reversed so that a window of input samples (oldest first) lines up with the taps.
+            self.phases = self.phases[:, ::-1].astype(np.float32)
+            # The next output can fall just before the first new sample, so a full filter length is kept.
+            self.history = np.zeros(self.taps, dtype=np.float32)
+            # Position of the next output sample, in 1/up input samples from the start of the history.
+            self.position = self.taps * self.up
+
+    @property
+    def needed(self):
+        return not self.passthrough or self.channels != 1
+
+    def process(self, data):
+        """Converts one block of interleaved int16 bytes; returns 16 kHz mono int16 bytes."""
+        samples = np.frombuffer(data, dtype="<i2")
+        if self.channels > 1:
+            samples = samples[:len(samples) // self.channels * self.channels]
+            samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        if self.passthrough:
+            return samples.astype("<i2").tobytes() if self.channels > 1 else bytes(data)
+
+        buffer = np.concatenate((self.history, samples.astype(np.float32, copy=False)))
+        last = (len(buffer) - 1) * self.up
+        count = max(0, (last - self.position) // self.down + 1)
+        positions = self.position + self.down * np.arange(count)
+        index, phase = np.divmod(positions, self.up)
+
+        windows = np.lib.stride_tricks.sliding_window_view(buffer, self.taps)[index - (self.taps - 1)]
+        out = np.einsum("ij,ij->i", windows, self.phases[phase])
+
+        consumed = len(buffer) - self.taps
+        self.position += self.down * count - consumed * self.up
+        self.history = buffer[consumed:]
+        return np.clip(np.rint(out), -32768, 32767).astype("<i2").tobytes()
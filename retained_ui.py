@@ -0,0 +1,161 @@
+from direct.gui.DirectGui import DGG
+from direct.gui.OnscreenText import OnscreenText
+from direct.interval.IntervalGlobal import Sequence, LerpFunc, Wait, Func
+from direct.task import Task
+from panda3d.core import TextNode, TransparencyAttrib
+
+
+class RetainedText:
+    """
+    Stands in for an OnscreenText. setText only records the wanted text, and
+    RetainedUI pushes it to the widget once per frame if it differs from what
+    is on screen, since every OnscreenText.setText regenerates the text
+    geometry. Everything else is passed through to the widget.
+    """
+
+    def __init__(self, ui, widget):
+        self.ui = ui
+        self.widget = widget
+        self.shown = widget.getText()
+        self.wanted = self.shown
+
+    def setText(self, text):
+        self.wanted = text
+        if text != self.shown:
+            self.ui.dirty.add(self)
+        else:
+            self.ui.skipped += 1
+
+    def getText(self):
+        return self.wanted
+
+    def flush(self):
+        if self.wanted != self.shown:
+            self.widget.setText(self.wanted)
+            self.shown = self.wanted
+            self.ui.pushed += 1
+
+    def __getattr__(self, name):
+        return getattr(self.widget, name)
+
+
+class Popup:
+    """
+    The status popup: one text node and one fade sequence per duration, reused
+    for every message. A message arriving while the popup is visible replaces
+    the text and restarts the hold without fading in again, and a repeated
+    message is shown with a count instead of flashing.
+    """
+
+    FADE_TIME = 0.25
+
+    def __init__(self, ui, parent, pos=(0, -0.9), scale=0.05):
+        self.ui = ui
+        self.parent = parent
+        self.pos = pos
+        self.scale = scale
+        self.node = None
+        self.text = None
+        self.sequences = {}
+        self.active = None
+        self.message = None
+        self.repeats = 0
+
+    def _create(self):
+        self.node = OnscreenText(
+            text="", pos=self.pos, scale=self.scale, fg=(1, 1, 1, 1), bg=(0, 0, 0, 0),
+            align=TextNode.ACenter, parent=self.parent, mayChange=True
+        )
+        self.node.setTransparency(TransparencyAttrib.MAlpha)
+        self.node.hide()
+        self.text = self.ui.text(self.node)
+
+    def _sequence(self, duration):
+        sequence = self.sequences.get(duration)
+        if sequence is None:
+            sequence = Sequence(
+                LerpFunc(self.node.setAlphaScale, fromData=0, toData=1, duration=self.FADE_TIME),
+                Wait(duration),
+                LerpFunc(self.node.setAlphaScale, fromData=1, toData=0, duration=self.FADE_TIME),
+                Func(self.node.hide),
+                name=f"Popup-{duration}"
+            )
+            self.sequences[duration] = sequence
+        return sequence
+
+    @property
+    def visible(self):
+        return self.active is not None and self.active.isPlaying()
+
+    def show(self, message, duration=1):
+        if self.node is None:
+            self._create()
+        visible = self.visible
+        self.repeats = self.repeats + 1 if visible and message == self.message else 1
+        self.message = message
+        self.text.setText(message if self.repeats == 1 else f"{message} (x{self.repeats})")
+
+        sequence = self._sequence(duration)
+        if self.active is not None and self.active is not sequence:
+            self.active.pause()
+        self.node.show()
+        if visible:
+            self.node.setAlphaScale(1)
+            sequence.start(startT=self.FADE_TIME)
+        else:
+            sequence.start()
+        self.active = sequence
+
+    def hide(self):
+        if self.active is not None:
+            self.active.pause()
+            self.active = None
+        if self.node is not None:
+            self.node.hide()
+
+
+class RetainedUI:
+    """
+    Owns the retained text widgets, the popup and the shared button tooltip,
+    and pushes pending text changes in one task just before the frame is
+    rendered (igLoop runs at sort 50).
+    """
+
+    def __init__(self, app, popup_parent=None):
+        self.app = app
+        self.dirty = set()
+        self.pushed = 0
+        self.skipped = 0
+        self.popup = Popup(self, popup_parent or app.render2d)
+        self.tooltip = None
+        self.app.taskMgr.add(self.flush_task, "RetainedUITask", sort=49)
+
+    def text(self, widget):
+        return RetainedText(self, widget)
+
+    def flush(self):
+        while self.dirty:
+            self.dirty.pop().flush()
+
+    def flush_task(self, task):
+        if self.dirty:
+            self.flush()
+        return Task.cont
+
+    def add_tooltip(self, button, text):
+        """Shows `text` next to `button` while hovered, using one text node shared by every button."""
+        button.bind(DGG.ENTER, lambda event: self._show_tooltip(button, text))
+        button.bind(DGG.EXIT, lambda event: self.tooltip.hide())
+
+    def _show_tooltip(self, button, text):
+        if self.tooltip is None:
+            self.tooltip = self.text(OnscreenText(
+                text="", style=1, fg=(1, 1, 1, 1), bg=(0, 0, 0, 0), scale=0.5, pos=(2, 0),
+                mayChange=True, wordwrap=6, align=TextNode.ACenter
+            ))
+        self.tooltip.reparentTo(button)
+        self.tooltip.setText(text)
+        self.tooltip.show()
+
+    def report(self):
+        return f"UI text updates: {self.pushed} pushed, {self.skipped} unchanged skipped"
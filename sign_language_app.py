@@ -1,40 +1,39 @@
 import os
 import sys
-import json
-import nltk
+import queue
+import tempfile
+import threading
+import webbrowser
 import time
-import win32com.client
 from direct.task import Task
-import sounddevice as sd
 from direct.showbase.ShowBase import ShowBase
-from direct.gui.DirectGui import DGG
 from direct.gui.DirectFrame import DirectFrame
 from direct.gui.DirectButton import DirectButton
 from direct.gui.OnscreenText import OnscreenText
 from direct.gui.DirectLabel import DirectLabel
 from direct.gui.DirectOptionMenu import DirectOptionMenu
 from direct.gui.DirectSlider import DirectSlider
-from direct.interval.IntervalGlobal import Sequence, LerpFunc, Wait, Func
-from direct.interval.LerpInterval import LerpPosInterval, LerpHprInterval
-from panda3d.core import (LVecBase3f, DirectionalLight, AmbientLight, TextNode, WindowProperties, Filename,
-                          TransparencyAttrib)
-
-try:
-    nltk.data.find('tokenizers/punkt_tab')
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('corpora/wordnet')
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-    nltk.data.find('corpora/omw-1.4')
-except LookupError:
-    nltk.download('punkt_tab', quiet=True)
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    nltk.download('wordnet', quiet=True)
-    nltk.download('averaged_perceptron_tagger', quiet=True)
-    nltk.download('omw-1.4', quiet=True)
+from direct.interval.IntervalGlobal import Sequence, LerpFunc, Func
+from direct.interval.LerpInterval import LerpPosInterval
+from direct.interval.IntervalManager import ivalMgr
+from panda3d.core import (LVecBase3f, LQuaternionf, DirectionalLight, AmbientLight, TextNode, WindowProperties,
+                          Filename, TransparencyAttrib, ClockObject)
 
 from speech_gloss import SpeechGloss
+from audio_devices import DeviceCache, DeviceWatcher, DEFAULT_DEVICE
+from pose_compiler import PoseCompiler, PoseBlend, JOINT_NAMES, expand_gloss, load_pose_file
+from render_quality import QualityController
+from retained_ui import RetainedUI
+from idle_throttle import IdleThrottle
+from media_control import MediaController
+from prepare_models import preferred_model_path
+from warmup import LatencyLog
+from tracing import tracer, trace_file_config
+from trace_overlay import TraceOverlay
+from metrics import metrics
+from profiler import FrameProfiler, ProfilerOverlay, profiler_config
+from app_paths import get_user_data_path
+from updater import Downloader, DownloadError, launch_installer, installer_download_path
 
 
 class SignLanguageApp(ShowBase):
@@ -42,18 +41,35 @@ class SignLanguageApp(ShowBase):
     Integrates 3D model, sign pose animation, UI, speech recognition, and media control for sign language display.
     """
 
-    def __init__(self, version):
+    def __init__(self, version, pose_compiler=None, models=None, speech_model=None, start_speech=True):
+        """
+        pose_compiler, models ({relative path: NodePath}) and speech_model may be
+        preloaded by the startup graph; anything missing is loaded here.
+        """
         ShowBase.__init__(self)
         
         self.version = version
+        self.preloaded_models = models or {}
+        self.speech_model = speech_model
 
         self.loadModels()
         self.setupLights()
         self.setupSkybox()
+        self.quality = QualityController(self, self.main_light_np, self.skybox)
+        self.quality.start()
+        self.idle_throttle = IdleThrottle(self)
 
         try:
             self.current_pose = "default"
-            self.gesture_data = self.loadAllPoseData()
+            if pose_compiler is None:
+                pose_compiler = PoseCompiler(self.loadAllPoseData())
+                pose_compiler.compile_all()
+            self.pose_compiler = pose_compiler
+            self.gesture_data = pose_compiler.gesture_data
+            self.rig_state = {}
+            self.rig_pose = None
+            self.current_seq = None
+            self.pending_joints = set()
             self.loadSignPoses(self.current_pose)
             self.expanded_sequence = []
             self.pose_index = 0
@@ -61,23 +77,34 @@ class SignLanguageApp(ShowBase):
         except Exception as e:
             print(f"Could not load pose data: {e}")
 
-        self.media_control_active = False
         self.sign_delay = 1.5
-        self.play_interval = 5
-        self.pause_interval = 5
-        self.last_media_action_time = 0
-        self.media_state = "paused"
+        self.transition_time = 0.15
+        self.coarticulation = False
         self.speech_recognition_active = False
         self.speech_processor = None
         self.is_animating = False
         self.signing_complete = True
+        self.latency = LatencyLog()
+        self.utterance_started = None
+        self.trace_utterance = None
+        self.trace_overlay = TraceOverlay(self, tracer)
+        self.accept("f3", self.trace_overlay.toggle)
+        self.profiler = FrameProfiler(self)
+        self.profiler_overlay = ProfilerOverlay(self, self.profiler)
+        self.accept("f4", self.profiler_overlay.toggle)
+        self.accept("f5", self.dump_slow_frames)
+        if profiler_config.getValue():
+            self.profiler.start()
 
         self.selected_device_index = None
         self.audio_source_mode = "MIC"
         self.available_devices = []
+        self.device_cache = DeviceCache()
+        self.device_watcher = None
 
         self.setup_ui()
-        self.start_speech_recognition()
+        if start_speech:
+            self.start_speech_recognition()
         self.setup_media_control()
 
     def open_app_window(self):
@@ -85,6 +112,7 @@ class SignLanguageApp(ShowBase):
         Manually opens the main Panda3D window and runs all
         window-dependent setup code.
         """
+        self.quality.request_framebuffer()
         if self.openDefaultWindow():
             print("Successfully opened Panda3D window.")
 
@@ -103,28 +131,61 @@ class SignLanguageApp(ShowBase):
             self.disableMouse()
             self.camera.setPos(0, -15, 3.25)
             self.camera.lookAt(0, 0, 0)
+            self.idle_throttle.start()
+            self.start_device_watcher()
         else:
             print("Error: Failed to open Panda3D window.")
 
+    def userExit(self):
+        print(self.idle_throttle.report())
+        print(self.ui.report())
+        if self.device_watcher:
+            self.device_watcher.stop()
+        print(self.latency.report())
+        if tracer.events:
+            print(tracer.report())
+            path = trace_file_config.getValue() or get_user_data_path("trace.json")
+            try:
+                print(f"Trace written to {tracer.write_chrome_trace(path)}")
+            except OSError as e:
+                print(f"Could not write trace: {e}")
+        ShowBase.userExit(self)
+
+    def setup_metrics(self, port=None):
+        """Start the local Prometheus endpoint and the gauges and frame sampling that feed it."""
+        metrics.gauge("animation_backlog_poses", "Poses left to sign in the current utterance.",
+                      lambda: len(self.expanded_sequence) - self.pose_index if self.is_animating else 0)
+        metrics.gauge("speech_queue_depth", "Audio blocks waiting for the recognizer.",
+                      self.profiler.speech_queue_depth)
+        metrics.gauge("active_intervals", "Running Panda3D intervals.", ivalMgr.getNumIntervals)
+        try:
+            metrics.serve(port)
+        except OSError as e:
+            print(f"Could not start metrics endpoint: {e}")
+            return
+        self.taskMgr.add(self.metrics_frame_task, "MetricsFrameTask", sort=-90)
+
+    def metrics_frame_task(self, task):
+        metrics.observe_frame(ClockObject.getGlobalClock().getDt())
+        return Task.cont
+
+    def dump_slow_frames(self):
+        if not self.profiler.running:
+            self.show_popup("Profiler is off (F4 to start)")
+            return
+        try:
+            path = self.profiler.dump(get_user_data_path("slow_frames.json"))
+            print(f"Slowest frames written to {path}")
+            self.show_popup("Slowest frames saved")
+        except OSError as e:
+            print(f"Could not write profiler dump: {e}")
+
     def add_tooltip(self, button, text):
-        tooltip = OnscreenText(
-            text=text,
-            style=1,
-            fg=(1, 1, 1, 1),
-            bg=(0, 0, 0, 0),
-            scale=0.5,
-            pos=(2, 0),
-            mayChange=True,
-            wordwrap=6,
-            align=TextNode.ACenter
-        )
-        tooltip.hide()
-        button.bind(DGG.ENTER, lambda event: tooltip.show())
-        button.bind(DGG.EXIT, lambda event: tooltip.hide())
-        tooltip.reparentTo(button)
+        self.ui.add_tooltip(button, text)
 
     def toggle_tab(self):
         if self.settings_frame.isHidden():
+            self.populate_audio_devices()
             self.settings_frame.show()
         else:
             self.settings_frame.hide()
@@ -137,7 +198,10 @@ class SignLanguageApp(ShowBase):
         TEXT_COLOR = (1, 1, 1, 1)
         ICON_SIZE = 0.085
         BTN_X_POS = 0.55
-        
+
+        # Text changes are pushed to Panda3D once per frame, and only when the text really changed.
+        self.ui = RetainedUI(self)
+
         self.ui_frame = DirectFrame(
             frameColor=FRAME_COLOR,
             frameSize=(-1.3, 1.3, -0.25, 0.25),
@@ -155,20 +219,20 @@ class SignLanguageApp(ShowBase):
             fg=TEXT_COLOR, align=TextNode.ALeft, mayChange=False
         )
 
-        self.recognized_text_node = OnscreenText(
+        self.recognized_text_node = self.ui.text(OnscreenText(
             parent=self.ui_frame, text="...", pos=(-0.65, 0.1), scale=0.06,
             fg=TEXT_COLOR, align=TextNode.ALeft, mayChange=True
-        )
+        ))
 
         self.gloss_text_label = OnscreenText(
             parent=self.ui_frame, text="Signing (Gloss):", pos=(-1.2, -0.1), scale=0.06,
             fg=TEXT_COLOR, align=TextNode.ALeft, mayChange=False
         )
 
-        self.gloss_text_node = OnscreenText(
+        self.gloss_text_node = self.ui.text(OnscreenText(
             parent=self.ui_frame, text="Ready to listen.", pos=(-0.65, -0.1), scale=0.06,
             fg=TEXT_COLOR, align=TextNode.ALeft, wordwrap=20, mayChange=True
-        )
+        ))
 
         def create_icon_button(img_name, z_pos, cmd, tooltip_text):
             btn = DirectButton(
@@ -276,7 +340,8 @@ class SignLanguageApp(ShowBase):
             popupMenu_text_fg=(1, 1, 1, 0)
         )
 
-        self.populate_audio_devices()
+        # Device enumeration is slow on some drivers; the watcher thread probes, the menu shows its cached list.
+        self.audio_devices_loaded = False
 
         self.apply_btn = DirectButton(
             parent=self.settings_frame,
@@ -299,76 +364,270 @@ class SignLanguageApp(ShowBase):
             frameColor=(0, 0, 0, 0)
         )
 
-    def populate_audio_devices(self):
-        """
-        Scans system for devices. On Windows, filters for MME drivers to ensure compatibility with VOSK's 16kHz requirement.
-        """
-        try:
-            devices = sd.query_devices()
-            host_apis = sd.query_hostapis()
-
-            valid_api_index = None
-            if sys.platform == 'win32':
-                for i, api in enumerate(host_apis):
-                    if 'MME' in api['name']:
-                        valid_api_index = i
-                        break
+    def set_sign_delay(self, seconds):
+        """Set the delay between signs through the slider, so the slider and its label stay in sync."""
+        low, high = self.delay_slider['range']
+        self.delay_slider['value'] = min(max(seconds, low), high)
+        self.sign_delay = round(self.delay_slider['value'], 1)
+        self.delay_value_label['text'] = f"{self.sign_delay:.1f}s"
 
-            self.available_devices = []
-            menu_items = []
+    def setup_update_check(self, checker):
+        """Waits for a background UpdateChecker and shows the update prompt once it reports a newer release."""
+        self.update_checker = checker
+        self.taskMgr.doMethodLater(0.5, self.poll_update_check, "UpdateCheckTask")
 
-            for i, dev in enumerate(devices):
+    def poll_update_check(self, task):
+        if not self.update_checker.done.is_set():
+            return task.again
+        info = self.update_checker.result
+        if info and info.available:
+            if info.installer_url:
+                self.show_update_prompt(info)
+            else:
+                print("Update found, but no .exe installer available.")
+        return Task.done
 
-                if dev['max_input_channels'] <= 0:
-                    continue
+    def show_update_prompt(self, info):
+        self.update_info = info
+        self.update_frame = DirectFrame(
+            frameColor=(0.15, 0.15, 0.15, 0.95),
+            frameSize=(-0.7, 0.7, -0.22, 0.22),
+            pos=(0, 0, 0.6),
+            parent=self.aspect2d
+        )
+        self.update_label = DirectLabel(
+            parent=self.update_frame,
+            text=f"A new version ({info.latest_version}) is available!",
+            scale=0.05,
+            pos=(0, 0, 0.08),
+            text_fg=(1, 1, 1, 1),
+            frameColor=(0, 0, 0, 0)
+        )
+        self.update_buttons = [
+            DirectButton(
+                parent=self.update_frame,
+                text="Update and Restart",
+                scale=0.05,
+                pos=(-0.25, 0, -0.1),
+                command=self.start_update_download,
+                text_fg=(0.1, 0.1, 0.18, 1),
+                frameColor=(0, 0.83, 1, 1)
+            ),
+            DirectButton(
+                parent=self.update_frame,
+                text="Later",
+                scale=0.05,
+                pos=(0.3, 0, -0.1),
+                command=self.dismiss_update_prompt,
+                text_fg=(0.63, 0.63, 0.63, 1),
+                frameColor=(0.16, 0.16, 0.24, 1)
+            ),
+        ]
+
+    def dismiss_update_prompt(self):
+        self.taskMgr.remove("UpdateDownloadTask")
+        if getattr(self, "update_frame", None):
+            self.update_frame.destroy()
+            self.update_frame = None
+
+    def start_update_download(self):
+        for btn in self.update_buttons:
+            btn.hide()
+        self.update_label['text'] = "Downloading update..."
+
+        url = self.update_info.installer_url
+        path = installer_download_path(url, tempfile.gettempdir())
+        self.download_queue = queue.Queue()
+
+        def do_download():
+            try:
+                # The installer runs elevated, so never launch anything we could not verify.
+                expected_sha256 = self.update_info.expected_sha256()
+                if not expected_sha256:
+                    raise DownloadError("The release does not publish a SHA-256 for the installer")
+                Downloader(
+                    url, path, expected_sha256,
+                    on_progress=lambda done, total: self.download_queue.put(("progress", done, total))
+                ).run()
+                self.download_queue.put(("done", path))
+            except Exception as e:
+                self.download_queue.put(("error", e))
+
+        threading.Thread(target=do_download, daemon=True).start()
+        self.taskMgr.doMethodLater(0.1, self.check_download_progress, "UpdateDownloadTask")
+
+    def check_download_progress(self, task):
+        """Shows the latest (already rate-limited) progress message; runs on the render thread."""
+        last_progress_msg = None
+        final_msg = None
+        while not self.download_queue.empty():
+            msg = self.download_queue.get_nowait()
+            if msg[0] == "progress":
+                last_progress_msg = msg
+            else:
+                final_msg = msg
+                break
 
-                if valid_api_index is not None:
-                    if dev['hostapi'] != valid_api_index:
-                        continue
+        if last_progress_msg:
+            _, downloaded_size, total_size = last_progress_msg
+            progress_mb = f"{(downloaded_size / (1024 * 1024)):.1f} MB"
+            if total_size > 0:
+                progress_mb += f" / {(total_size / (1024 * 1024)):.1f} MB"
+            self.update_label['text'] = f"Downloading update... {progress_mb}"
 
-                dev_name = dev['name']
-                self.available_devices.append((dev_name, i))
+        if not final_msg:
+            return task.again
 
-                display_name = dev_name[:25] + \
-                    "..." if len(dev_name) > 25 else dev_name
-                menu_items.append(f"{display_name}")
+        if final_msg[0] == "done":
+            self.update_label['text'] = "Update downloaded. Launching installer..."
+            launch_installer(final_msg[1], self.update_info.installer_url)
+            self.userExit()
+        else:
+            print(f"Failed to download or run updater: {final_msg[1]}")
+            self.update_label['text'] = "Download failed. Opening browser instead..."
+            webbrowser.open(self.update_info.installer_url)
+            self.taskMgr.doMethodLater(3, lambda t: self.dismiss_update_prompt(), "UpdatePromptClose")
+        return Task.done
 
-            if not menu_items:
-                menu_items = ["Default Device"]
-                self.available_devices = [(None, None)]
+    def populate_audio_devices(self):
+        """
+        Fills the device menu from the cached device list without probing. The
+        watcher thread probes and refreshes the list, and device_watch_task
+        updates the menu when a new list arrives.
+        """
+        devices = self.device_cache.peek()
+        if devices is None:
+            if self.device_watcher is None:
+                self.start_device_watcher()
+            return
+        self.update_device_menu(devices)
 
-            self.device_menu['items'] = menu_items
-            self.device_menu.set(0)
+    def update_device_menu(self, devices):
+        """
+        Shows `devices` in the device menu, rebuilding it only if the list changed.
+        Device indices change when PortAudio is re-initialized, so the selection
+        follows the selected device by name and host API. If that device is gone,
+        the first device is selected. Returns the device that disappeared, if any.
+        """
+        devices = list(devices) or [DEFAULT_DEVICE]
+        first_load = not self.audio_devices_loaded
+        self.audio_devices_loaded = True
+        if devices == self.available_devices:
+            return None
+
+        selected = None
+        if self.selected_device_index is not None:
+            selected = next((d for d in self.available_devices if d.index == self.selected_device_index), None)
+        self.available_devices = devices
+        self.device_menu['items'] = [d.name[:25] + "..." if len(d.name) > 25 else d.name for d in devices]
+
+        if selected is not None:
+            position = next((i for i, d in enumerate(devices)
+                             if (d.name, d.hostapi) == (selected.name, selected.hostapi)), None)
+            if position is not None:
+                self.selected_device_index = devices[position].index
+                self.device_menu.set(position, fCommand=0)
+                return None
+        self.device_menu.set(0, fCommand=first_load or selected is not None)
+        return selected
+
+    def start_device_watcher(self):
+        """Probes the audio devices off the render thread and watches for devices being plugged in or removed."""
+        self.device_watcher = DeviceWatcher(self.device_cache, pause_audio=self.pause_audio_for_rescan)
+        self.device_watcher.start()
+        self.taskMgr.doMethodLater(0.5, self.device_watch_task, "AudioDeviceWatchTask")
+
+    def pause_audio_for_rescan(self):
+        """
+        Runs on the watcher thread: closes the input stream so PortAudio can be
+        re-initialized. Recognition keeps running and device_watch_task opens the
+        stream again, so a partially spoken utterance survives the rescan.
+        """
+        processor = self.speech_processor
+        if processor and processor.running:
+            return processor.suspend_stream()
+        return False
+
+    def device_watch_task(self, task):
+        while not self.device_watcher.results.empty():
+            kind, payload, resume = self.device_watcher.results.get_nowait()
+            lost = None
+            if kind == "error":
+                print(f"Error querying audio devices: {payload}")
+                if not self.audio_devices_loaded:
+                    self.device_menu['items'] = ["Error loading devices"]
+            else:
+                lost = self.update_device_menu(payload)
+                if lost:
+                    print(f"Audio device disconnected: {lost.name}")
+                    self.show_popup(f"{lost.name} disconnected")
+            if resume:
+                # Same device if it is still there (its index may have changed), else the one now selected.
+                self.reopen_audio_stream(announce=lost is not None)
+        return task.again
 
-        except Exception as e:
-            print(f"Error querying audio devices: {e}")
-            self.device_menu['items'] = ["Error loading devices"]
+    def reopen_audio_stream(self, announce=False):
+        """Opens the input stream again after a rescan, on the selected device, without restarting recognition."""
+        processor = self.speech_processor
+        if not processor or not processor.running:
+            self.speech_recognition_active = False
+            self.start_speech_recognition()
+            return
+        self.watch_device_swap(processor.swap_device(self.selected_device_index), announce)
 
     def on_device_selected(self, selection):
         """Callback when dropdown changes."""
         index_in_list = self.device_menu.selectedIndex
         if 0 <= index_in_list < len(self.available_devices):
-            _, dev_id = self.available_devices[index_in_list]
-            self.selected_device_index = dev_id
+            self.selected_device_index = self.available_devices[index_in_list].index
 
     def restart_speech_service(self):
         """
-        Stops the current speech processor and starts a new one 
-        with the selected device settings.
+        Applies the selected device. While recognition is running, the input
+        stream is swapped in place on a helper thread, so the recognizer keeps
+        going and the render thread never waits.
         """
-        if self.speech_recognition_active:
-            try:
-                if self.speech_processor:
-                    self.speech_processor.stop()
-            except Exception as e:
-                print(f"Error stopping speech: {e}")
+        processor = self.speech_processor
+        if self.speech_recognition_active and processor and processor.running:
+            self.show_popup("Switching audio device...")
+            self.watch_device_swap(processor.swap_device(self.selected_device_index))
+            return
 
-            self.speech_recognition_active = False
-            self.show_popup("Restarting Audio Service...")
+        self.start_speech_recognition()
 
-            time.sleep(0.2)
+    def watch_device_swap(self, future, announce=True):
+        """Polls a swap_device() Future from the render thread; `announce` shows the new device in a popup."""
+        self.device_swap = future
+        self.device_swap_announce = announce
+        self.taskMgr.remove("DeviceSwapTask")
+        self.taskMgr.doMethodLater(0.02, self.check_device_swap, "DeviceSwapTask")
 
-        self.start_speech_recognition()
+    def check_device_swap(self, task):
+        if not self.device_swap.done():
+            return task.again
+        try:
+            opened, crossed = self.device_swap.result()
+        except Exception as e:
+            print(f"Could not switch audio device: {e}")
+            self.show_popup("Error: Could not switch device")
+            return Task.done
+        print(f"Audio device switched: stream running after {opened * 1000:.0f} ms, "
+              f"crossover after {crossed * 1000:.0f} ms")
+        if self.speech_processor.device_index != self.selected_device_index:
+            # swap_device fell back to the default device.
+            self.show_popup(f"Could not open {self.device_label()}; listening on: Default Device")
+        elif self.device_swap_announce:
+            self.show_popup(f"Listening on: {self.device_label()}")
+        return Task.done
+
+    def device_label(self):
+        """Display name of the selected input device."""
+        if self.selected_device_index is None:
+            return "Default Device"
+        for device in self.available_devices:
+            if device.index == self.selected_device_index:
+                return device.name
+        return f"Device {self.selected_device_index}"
 
     def start_speech_recognition(self):
         """
@@ -378,7 +637,8 @@ class SignLanguageApp(ShowBase):
             if not self.speech_processor:
                 self.speech_processor = SpeechGloss(
                     callback=self.handle_speech_result,
-                    device_index=self.selected_device_index
+                    device_index=self.selected_device_index,
+                    model=self.speech_model
                 )
             else:
                 if hasattr(self.speech_processor, 'set_device'):
@@ -387,25 +647,14 @@ class SignLanguageApp(ShowBase):
                 else:
                     self.speech_processor = SpeechGloss(
                         callback=self.handle_speech_result,
-                        device_index=self.selected_device_index
+                        device_index=self.selected_device_index,
+                        model=self.speech_model
                     )
 
             if self.speech_processor.start():
                 self.speech_recognition_active = True
 
-                device_label = "Default Device"
-                if self.selected_device_index is not None:
-                    found_name = None
-                    for name, dev_id in self.available_devices:
-                        if dev_id == self.selected_device_index:
-                            found_name = name
-                            break
-                    if found_name:
-                        device_label = found_name
-                    else:
-                        device_label = f"Device {self.selected_device_index}"
-
-                self.show_popup(f"Listening on: {device_label}")
+                self.show_popup(f"Listening on: {self.device_label()}")
                 self.speech_toggle_button['image'] = "assets/icons/speech-recognition-on.png"
             else:
                 self.show_popup("Error: Speech failed to start")
@@ -431,22 +680,16 @@ class SignLanguageApp(ShowBase):
     def loadModels(self):
         """Load 3D character model, arms, and attach to scene graph."""
         try:
-            body_path = self.get_panda_model_path('character/body.bam')
-            print(f"Loading body from: {body_path}")
-            self.torso = self.loader.loadModel(body_path)
+            self.torso = self.loadPreloadedModel('character/body.bam', "body")
             self.torso.reparentTo(self.render)
             self.torso.setPos(0, 0, -1.5)
             self.torso.setScale(0.7)
             self.torso.setHpr(0, 0, 0)
 
-            rarm_path = self.get_panda_model_path('character/RArm.bam')
-            print(f"Loading right arm from: {rarm_path}")
-            self.rarm = self.loader.loadModel(rarm_path)
+            self.rarm = self.loadPreloadedModel('character/RArm.bam', "right arm")
             self.rarm.reparentTo(self.torso)
 
-            larm_path = self.get_panda_model_path('character/LArm.bam')
-            print(f"Loading left arm from: {larm_path}")
-            self.larm = self.loader.loadModel(larm_path)
+            self.larm = self.loadPreloadedModel('character/LArm.bam', "left arm")
             self.larm.reparentTo(self.torso)
 
             self.setup_arm_details()
@@ -458,6 +701,15 @@ class SignLanguageApp(ShowBase):
             traceback.print_exc()
             raise
 
+    def loadPreloadedModel(self, relative_path, label):
+        """Use the copy loaded asynchronously during startup if there is one, else load it now."""
+        model = self.preloaded_models.get(relative_path)
+        if model is not None and not model.isEmpty():
+            return model
+        path = self.get_panda_model_path(relative_path)
+        print(f"Loading {label} from: {path}")
+        return self.loader.loadModel(path)
+
     def setup_arm_details(self):
         self.rthumb1 = self.rarm.find("**/t1")
         self.rthumb2 = self.rarm.find("**/t2")
@@ -489,26 +741,29 @@ class SignLanguageApp(ShowBase):
         self.lpinky2 = self.larm.find("**/p2")
         self.lpinky3 = self.larm.find("**/p3")
 
+        self.joints = {name: getattr(self, name) for name in JOINT_NAMES}
+
     def setupLights(self):
+        # Shadow casting and the auto-shader are set by the active quality tier.
         mainLight = DirectionalLight('main light')
-        mainLight.setShadowCaster(True)
-        mainLightNodePath = self.render.attachNewNode(mainLight)
-        mainLightNodePath.setHpr(0, -40, 0)
-        self.render.setLight(mainLightNodePath)
+        self.main_light_np = self.render.attachNewNode(mainLight)
+        self.main_light_np.setHpr(0, -40, 0)
+        self.render.setLight(self.main_light_np)
         ambientLight = AmbientLight('ambient light')
         ambientLight.setColor((0.2, 0.2, 0.2, 1))
         ambientLightNodePath = self.render.attachNewNode(ambientLight)
         self.render.setLight(ambientLightNodePath)
-        self.render.setShaderAuto()
 
     def setupSkybox(self):
+        self.skybox = None
         try:
-            skybox = self.loader.loadModel('skybox/skybox.bam')
+            skybox = self.loadPreloadedModel('skybox/skybox.bam', "skybox")
             skybox.setScale(50)
             skybox.setBin('background', 1)
             skybox.setDepthWrite(0)
             skybox.setLightOff()
             skybox.reparentTo(self.render)
+            self.skybox = skybox
         except Exception as e:
             print(f"Could not load skybox: {e}")
 
@@ -520,81 +775,30 @@ class SignLanguageApp(ShowBase):
         return os.path.join(base_path, relative_path)
 
     def get_panda_model_path(self, relative_path):
-        return relative_path
+        """Prefer the flattened copy written by prepare_models.py unless the source model is newer."""
+        return preferred_model_path(self.get_resource_path(""), relative_path,
+                                    check_stale=not getattr(sys, 'frozen', False))
 
     def loadAllPoseData(self):
-        pose_file = self.get_resource_path("sign_poses.json")
-        try:
-            with open(pose_file, "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"Error: Could not find sign_poses.json at {pose_file}")
-            raise
-        except json.JSONDecodeError as e:
-            print(f"Error: Invalid JSON in sign_poses.json: {e}")
-            raise
+        return load_pose_file(self.get_resource_path("sign_poses.json"))
 
     def loadSignPoses(self, name):
-        poses = self.gesture_data.get(name)
-        pose = poses[0] if isinstance(poses, list) else poses
-        if not pose:
+        keyframes = self.pose_compiler.keyframes(name)
+        if not keyframes:
             return
-        l = pose["leftHand"]
-        r = pose["rightHand"]
-
-        self.larm.setPos(LVecBase3f(*l["pos"]))
-        self.larm.setHpr(LVecBase3f(*l["hpr"]))
-        self.rarm.setPos(LVecBase3f(*r["pos"]))
-        self.rarm.setHpr(LVecBase3f(*r["hpr"]))
-
-        def applyFingerPose(finger_parts, data):
-            for part, pose_data in zip(finger_parts, data):
-                part.setPos(*pose_data["pos"])
-                part.setHpr(*pose_data["hpr"])
-
-        if "fingers" in l:
-            f = l["fingers"]
-            if "thumb" in f:
-                applyFingerPose([self.lthumb1, self.lthumb2], f["thumb"])
-            if "index" in f:
-                applyFingerPose([self.lindex1, self.lindex2,
-                                 self.lindex3], f["index"])
-            if "middle" in f:
-                applyFingerPose([self.lmiddle1, self.lmiddle2,
-                                 self.lmiddle3], f["middle"])
-            if "ring" in f:
-                applyFingerPose(
-                    [self.lring1, self.lring2, self.lring3], f["ring"])
-            if "pinky" in f:
-                applyFingerPose([self.lpinky1, self.lpinky2,
-                                 self.lpinky3], f["pinky"])
-
-        if "fingers" in r:
-            f = r["fingers"]
-            if "thumb" in f:
-                applyFingerPose([self.rthumb1, self.rthumb2], f["thumb"])
-            if "index" in f:
-                applyFingerPose([self.rindex1, self.rindex2,
-                                 self.rindex3], f["index"])
-            if "middle" in f:
-                applyFingerPose([self.rmiddle1, self.rmiddle2,
-                                 self.rmiddle3], f["middle"])
-            if "ring" in f:
-                applyFingerPose(
-                    [self.rring1, self.rring2, self.rring3], f["ring"])
-            if "pinky" in f:
-                applyFingerPose([self.rpinky1, self.rpinky2,
-                                 self.rpinky3], f["pinky"])
+        keyframe = keyframes[0]
+
+        for joint, (pos, quat) in keyframe.items():
+            node = self.joints[joint]
+            node.setPosQuat(LVecBase3f(*pos), LQuaternionf(*quat))
+
+        self.rig_state.update(keyframe)
+        self.rig_pose = name
 
     def expandPoseSequence(self, sequence):
-        result = []
-        for word in sequence:
-            if word.lower() in self.gesture_data:
-                result.append(word.lower())
-            else:
-                for letter in word.lower():
-                    if letter in self.gesture_data:
-                        result.append(letter)
+        result, signed, fingerspelled = expand_gloss(sequence, self.gesture_data)
+        metrics.inc("tokens_signed_total", signed)
+        metrics.inc("tokens_fingerspelled_total", fingerspelled)
         return result
 
     def start_animation(self, text):
@@ -605,27 +809,123 @@ class SignLanguageApp(ShowBase):
 
         if not self.expanded_sequence:
             self.gloss_text_node.setText("No valid signs found in text")
-            self.signing_complete = True
+            self.finish_signing()
             return
 
         self.gloss_text_node.setText(f"Signing: {self.current_text}")
         self.pose_index = 0
         self.is_animating = True
         self.signing_complete = False
-        if self.media_control_active and self.media_state == "playing":
-            self.pause_media()
+        self.media.signing_started()
         self.taskMgr.add(self.animateNextPose, "SignAnimation")
+        self.messenger.send("signsynth-signing-started", [self.current_text])
 
     def stopAnimation(self):
         if self.is_animating:
             self.taskMgr.remove("SignAnimation")
             self.is_animating = False
-            if hasattr(self, 'current_left_seq') and self.current_left_seq:
-                self.current_left_seq.finish()
-                self.current_left_seq = None
-            if hasattr(self, 'current_right_seq') and self.current_right_seq:
-                self.current_right_seq.finish()
-                self.current_right_seq = None
+            self.interruptTransition(finish=True)
+            # Signing was cut short (new utterance, Reset, /cancel), as opposed to finishing normally.
+            self.messenger.send("signsynth-signing-cancelled")
+
+    def interruptTransition(self, finish=True):
+        """
+        Ends the running pose transition. Finishing snaps every joint to its target;
+        otherwise the blend is left where it is (coarticulation) and joints that
+        never reached their target are dropped from the tracked rig state.
+        """
+        if self.current_seq:
+            if finish:
+                self.current_seq.finish()
+            else:
+                self.current_seq.pause()
+                for joint in self.pending_joints:
+                    self.rig_state.pop(joint, None)
+                if self.pending_joints:
+                    self.rig_pose = None
+        self.current_seq = None
+        self.pending_joints.clear()
+
+    def makeBlendInterval(self, delta):
+        """
+        Builds one interval that blends every joint of a KeyframeDelta at once,
+        starting from wherever the joints are when the interval begins.
+        """
+        nodes = [self.joints[joint] for joint in delta.joints]
+        blend = {}
+
+        def begin():
+            start_pos = [tuple(node.getPos()) for node in nodes]
+            start_quat = [tuple(node.getQuat()) for node in nodes]
+            blend["pose"] = PoseBlend(delta, start_pos, start_quat)
+
+        def apply(t):
+            if "pose" not in blend:
+                begin()
+            if self.trace_utterance is not None:
+                self.tracePoseApplied()
+            pos, quat = blend["pose"].sample(t)
+            for node, p, q in zip(nodes, pos.tolist(), quat.tolist()):
+                node.setPosQuat(LVecBase3f(*p), LQuaternionf(*q))
+
+        self.pending_joints.update(delta.joints)
+        return Sequence(
+            Func(begin),
+            LerpFunc(apply, fromData=0, toData=1, duration=self.transition_time,
+                     blendType="easeInOut" if self.coarticulation else "noBlend"),
+            Func(self.pending_joints.difference_update, delta.joints)
+        )
+
+    def playTransition(self, pose_name):
+        """Starts blending the rig from its current state through every keyframe of pose_name."""
+        self.interruptTransition(finish=not self.coarticulation)
+
+        deltas, self.rig_state = self.pose_compiler.transition(
+            self.rig_state, pose_name, self.rig_pose)
+        self.rig_pose = pose_name
+
+        steps = [self.makeBlendInterval(delta) for delta in deltas if len(delta)]
+        if steps:
+            self.current_seq = Sequence(*steps)
+            self.current_seq.start()
+
+    def warm_up(self, gloss):
+        """
+        Dry-runs the animator on `gloss` before the window opens, so the first real
+        utterance doesn't pay for first-time interval, numpy and text setup. The
+        rig, texts and pose statistics are restored; the transition cache is kept.
+        """
+        compiler = self.pose_compiler
+        stats = (compiler.transitions, compiler.joints_driven, compiler.cache_hits, compiler.cache_misses)
+        texts = (self.recognized_text_node.getText(), self.gloss_text_node.getText())
+
+        sequence = self.expandPoseSequence(gloss.split())
+        for pose_name in sequence:
+            self.playTransition(pose_name)
+            if self.current_seq:
+                self.current_seq.setT(self.current_seq.getDuration() / 2)
+            self.recognized_text_node.setText(pose_name.upper())
+            self.gloss_text_node.setText(f"Signing: {gloss}")
+            self.ui.flush()
+            self.recognized_text_node.textNode.generate()
+            self.gloss_text_node.textNode.generate()
+
+        self.interruptTransition(finish=True)
+        self.loadSignPoses("default")
+        self.current_pose = "default"
+        self.recognized_text_node.setText(texts[0])
+        self.gloss_text_node.setText(texts[1])
+        self.ui.flush()
+        compiler.transitions, compiler.joints_driven, compiler.cache_hits, compiler.cache_misses = stats
+        return len(sequence)
+
+    def tracePoseApplied(self):
+        """Closes the trace of the current utterance on the first frame one of its poses is applied."""
+        utterance, self.trace_utterance = self.trace_utterance, None
+        now = tracer.now()
+        tracer.instant("pose_applied", utterance, ts=now)
+        tracer.measure("to_first_pose", utterance, "start_animation", now)
+        tracer.measure("end_to_end", utterance, "speech_end", now)
 
     def slideArms(self):
         slide_distance = 0.5
@@ -641,11 +941,7 @@ class SignLanguageApp(ShowBase):
 
     def animateNextPose(self, task):
         if self.pose_index >= len(self.expanded_sequence):
-            if hasattr(self,
-                       'current_left_seq') and self.current_left_seq and self.current_left_seq.isPlaying():
-                return task.again
-            if hasattr(self,
-                       'current_right_seq') and self.current_right_seq and self.current_right_seq.isPlaying():
+            if self.current_seq and self.current_seq.isPlaying():
                 return task.again
 
             self.loadSignPoses("default")
@@ -653,14 +949,12 @@ class SignLanguageApp(ShowBase):
             self.is_animating = False
             self.gloss_text_node.setText("Animation Complete")
             self.current_pose = ""
+            print(f"Animation complete: {self.pose_compiler.stats_report()}")
 
-            self.signing_complete = True
+            self.current_seq = None
 
-            self.current_left_seq = None
-            self.current_right_seq = None
-
-            if self.media_control_active and self.media_state == "paused":
-                self.resume_media()
+            self.finish_signing()
+            self.messenger.send("signsynth-signing-stopped")
             return Task.done
 
         pose_name = self.expanded_sequence[self.pose_index]
@@ -676,65 +970,11 @@ class SignLanguageApp(ShowBase):
             self.pose_index += 1
             return task.again
 
-        left_sequence = []
-        right_sequence = []
-        time = 0.005
-
-        def addFingerLerp(hand_data, finger_map, sequence_list):
-            if "fingers" not in hand_data:
-                return
-            for name, parts in finger_map.items():
-                if name in hand_data["fingers"]:
-                    for part, pose_data in zip(parts, hand_data["fingers"][name]):
-                        sequence_list.append(LerpPosInterval(
-                            part, 0.01, LVecBase3f(*pose_data["pos"])))
-                        sequence_list.append(LerpHprInterval(
-                            part, 0.01, LVecBase3f(*pose_data["hpr"])))
-
-        def addHandAndFingers(pose):
-            l = pose["leftHand"]
-            r = pose["rightHand"]
-
-            left_sequence.extend([
-                LerpPosInterval(self.larm, time, LVecBase3f(*l["pos"])),
-                LerpHprInterval(self.larm, time, LVecBase3f(*l["hpr"]))
-            ])
-            addFingerLerp(l, {
-                "thumb": [self.lthumb1, self.lthumb2],
-                "index": [self.lindex1, self.lindex2, self.lindex3],
-                "middle": [self.lmiddle1, self.lmiddle2, self.lmiddle3],
-                "ring": [self.lring1, self.lring2, self.lring3],
-                "pinky": [self.lpinky1, self.lpinky2, self.lpinky3]
-            }, left_sequence)
-
-            right_sequence.extend([
-                LerpPosInterval(self.rarm, time, LVecBase3f(*r["pos"])),
-                LerpHprInterval(self.rarm, time, LVecBase3f(*r["hpr"]))
-            ])
-            addFingerLerp(r, {
-                "thumb": [self.rthumb1, self.rthumb2],
-                "index": [self.rindex1, self.rindex2, self.rindex3],
-                "middle": [self.rmiddle1, self.rmiddle2, self.rmiddle3],
-                "ring": [self.rring1, self.rring2, self.rring3],
-                "pinky": [self.rpinky1, self.rpinky2, self.rpinky3]
-            }, right_sequence)
-
-        if isinstance(poses, list):
-            for pose in poses:
-                addHandAndFingers(pose)
-        else:
-            addHandAndFingers(poses)
-
-        self.current_left_seq = None
-        self.current_right_seq = None
-
-        if left_sequence:
-            self.current_left_seq = Sequence(*left_sequence)
-            self.current_left_seq.start()
-
-        if right_sequence:
-            self.current_right_seq = Sequence(*right_sequence)
-            self.current_right_seq.start()
+        self.playTransition(pose_name)
+        self.messenger.send("signsynth-pose", [pose_name])
+        if self.utterance_started is not None:
+            self.latency.record(time.perf_counter() - self.utterance_started)
+            self.utterance_started = None
 
         self.gloss_text_node.setText(f"Signing: {self.current_text}")
         self.recognized_text_node.setText(f"{pose_name.upper()}")
@@ -744,107 +984,34 @@ class SignLanguageApp(ShowBase):
         return task.again
 
     def show_popup(self, message, duration=1):
-        if hasattr(self, "active_popup") and self.active_popup:
-            self.active_popup.cleanup()
-            self.active_popup = None
-
-        popup = OnscreenText(
-            text=message,
-            pos=(0, -0.9),
-            scale=0.05,
-            fg=(1, 1, 1, 1),
-            bg=(0, 0, 0, 0),
-            align=TextNode.ACenter,
-            parent=self.render2d
-        )
-        self.active_popup = popup
-
-        def set_alpha(a):
-            if popup.isEmpty():
-                return
-            popup.setColor(1, 1, 1, a)
-            popup['bg'] = (0, 0, 0, 0)
-
-        anim = Sequence(
-            LerpFunc(set_alpha, fromData=0, toData=1, duration=0.25),
-            Wait(duration),
-            LerpFunc(set_alpha, fromData=1, toData=0, duration=0.25),
-            Func(lambda: not popup.isEmpty() and popup.removeNode()),
-            Func(setattr, self, "active_popup", None)
-        )
-
-        popup.cleanup = anim.finish
-        anim.start()
+        self.ui.popup.show(message, duration)
 
     def setup_media_control(self):
-        self.taskMgr.add(self.media_control_task, "MediaControlTask")
+        self.media = MediaController(self)
 
     def toggle_media_control(self):
         try:
-            self.media_control_active = not self.media_control_active
-
-            if self.media_control_active:
+            if not self.media.active:
+                self.media.enable()
                 self.show_popup("Media control starting (switch to media tab)")
                 self.media_toggle_button['image'] = "assets/icons/media-control-on.png"
-                self.last_media_action_time = time.time()
-                self.media_state = "starting"
                 print(
                     "Media control starting - switch to your media tab within 3 seconds!")
             else:
+                self.media.disable()
                 self.show_popup("media control inactive")
                 self.media_toggle_button['image'] = "assets/icons/media-control-off.png"
-                self.media_state = "paused"
                 print("Media control stopped")
 
         except Exception as e:
             print(f"Error toggling media control: {str(e)}")
             self.gloss_text_node.setText(f"Error: {str(e)}")
 
-    def media_control_task(self, task):
-        if not self.media_control_active:
-            return Task.cont
-        if not self.signing_complete:
-            return Task.cont
-
-        current_time = time.time()
-        elapsed = current_time - self.last_media_action_time
-
-        if self.media_state == "starting" and elapsed >= 3:
-            self.last_media_action_time = current_time
-            self.media_state = "playing"
-            self.gloss_text_node.setText("Media playing")
-
-        elif self.media_state == "playing" and elapsed >= self.play_interval:
-            self.pause_media()
-
-        return Task.cont
-
     def pause_media(self):
-        self.simulate_space_press()
-        self.last_media_action_time = time.time()
-        self.media_state = "paused"
-        self.gloss_text_node.setText("Media paused")
+        self.media.pause()
 
     def resume_media(self):
-        self.simulate_space_press()
-        self.last_media_action_time = time.time()
-        self.media_state = "playing"
-        self.gloss_text_node.setText("Media playing")
-
-    def simulate_space_press(self):
-        if sys.platform == 'win32':
-            try:
-                shell = win32com.client.Dispatch("WScript.Shell")
-                shell.SendKeys(" ", 0)
-            except ImportError:
-                print(
-                    "Could not import win32com.client - media control may not work properly")
-        else:
-            try:
-                import pyautogui
-                pyautogui.press('space')
-            except ImportError:
-                print("Could not import pyautogui - media control may not work properly")
+        self.media.resume()
 
     def reset_app(self):
         self.stopAnimation()
@@ -859,10 +1026,31 @@ class SignLanguageApp(ShowBase):
         self.current_pose = "default"
         self.expanded_sequence = []
         self.pose_index = 0
+        self.finish_signing()
+
+    def finish_signing(self):
+        """
+        Marks signing as finished. If it was in progress, media control is told
+        so that it resumes the media or runs a timer that came due meanwhile.
+        """
+        was_signing = not self.signing_complete
         self.signing_complete = True
+        if was_signing:
+            self.media.signing_finished()
 
     def handle_speech_result(self, text, gloss):
-        if text and gloss and not self.is_animating:
-            self.recognized_text_node.setText(text)
-            self.gloss_text_node.setText(gloss)
-            self.start_animation(gloss)
+        received = time.perf_counter()
+        utterance = getattr(self.speech_processor, "utterance_id", None)
+        with tracer.span("handle_speech_result", utterance):
+            self.idle_throttle.wake()
+            if text and gloss and self.is_animating:
+                metrics.inc("utterances_dropped_total")
+            if text and gloss and not self.is_animating:
+                # Latency runs from the start of gloss conversion to the first pose being played.
+                self.utterance_started = received - getattr(self.speech_processor, "last_convert_time", 0.0)
+                self.recognized_text_node.setText(text)
+                self.gloss_text_node.setText(gloss)
+                with tracer.span("start_animation", utterance):
+                    self.start_animation(gloss)
+                if self.is_animating:
+                    self.trace_utterance = utterance
@@ -5,11 +5,78 @@ import sys
 import os
 import threading
 import time
-import sounddevice as sd
-from nltk import pos_tag, WordNetLemmatizer
-from nltk.corpus import stopwords, wordnet
-from nltk.tokenize import word_tokenize
-from vosk import Model, KaldiRecognizer
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from lazy_import import lazy_module
+from metrics import metrics
+from resample import StreamingResampler, TARGET_RATE
+from speech_session import SessionRecorder, record_dir_config
+from tracing import tracer
+
+# Imported on first use so that importing this module stays cheap on the startup path.
+sd = lazy_module("sounddevice")
+nltk = lazy_module("nltk")
+vosk = lazy_module("vosk")
+
+# Seconds per block delivered by the input stream. Short blocks let a device swap cross over
+# within tens of milliseconds of the new stream starting.
+CAPTURE_BLOCK_SECONDS = 0.02
+# Seconds of audio collected from those blocks before each AcceptWaveform call.
+DECODE_BLOCK_SECONDS = 0.5
+
+# Representative sentence used to warm up the gloss converter and the animator during startup.
+WARMUP_UTTERANCE = "hello I don't think we are going to the store to buy milk today"
+
+NLTK_RESOURCES = (
+    ('tokenizers/punkt_tab', 'punkt_tab'),
+    ('tokenizers/punkt', 'punkt'),
+    ('corpora/stopwords', 'stopwords'),
+    ('corpora/wordnet', 'wordnet'),
+    ('taggers/averaged_perceptron_tagger', 'averaged_perceptron_tagger'),
+    ('corpora/omw-1.4', 'omw-1.4'),
+)
+
+_nltk_lock = threading.Lock()
+_nltk_ready = False
+# The tagger, lemmatizer and lazily loaded WordNet corpus aren't safe to use from two threads
+# (recognizer and control API) at once, so one gloss conversion runs at a time.
+_convert_lock = threading.Lock()
+
+
+def ensure_nltk_data():
+    """Checks for the NLTK resources used by the gloss converter once per process, downloading any that are missing."""
+    global _nltk_ready
+    with _nltk_lock:
+        if _nltk_ready:
+            return
+        for path, package in NLTK_RESOURCES:
+            try:
+                nltk.data.find(path)
+            except LookupError:
+                nltk.download(package, quiet=True)
+        _nltk_ready = True
+
+
+def preload_nltk():
+    """Makes sure the NLTK data exists and loads the corpora the gloss converter uses."""
+    ensure_nltk_data()
+    nltk.corpus.wordnet.ensure_loaded()
+    nltk.corpus.stopwords.words('english')
+
+
+def get_model_path():
+    if getattr(sys, 'frozen', False):
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.dirname(__file__)
+    return os.path.join(base_path, "vosk-model-small-en-us-0.15")
+
+
+def load_vosk_model(model_path=None):
+    model_path = model_path or get_model_path()
+    print(f"Loading VOSK model from: {model_path}")
+    return vosk.Model(model_path)
 
 
 class SpeechGloss:
@@ -18,16 +85,18 @@ class SpeechGloss:
     converts it to sign language gloss, and passes results to a callback.
     """
 
-    def __init__(self, callback=None, device_index=None):
-        if getattr(sys, 'frozen', False):
-            base_path = sys._MEIPASS
-        else:
-            base_path = os.path.dirname(__file__)
-
-        model_path = os.path.join(base_path, "vosk-model-small-en-us-0.15")
+    def __init__(self, callback=None, device_index=None, model=None, record_dir=None, gloss_cache_size=256):
+        """
+        record_dir: record every session (audio + results) there; defaults to signsynth-record-dir.
+        gloss_cache_size: phrases kept in the gloss cache; 0 turns the cache off (for measurements).
+        """
+        ensure_nltk_data()
+        model_path = get_model_path()
 
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english')) - {
+        self.lemmatizer = nltk.stem.WordNetLemmatizer()
+        # nltk.pos_tag() reloads the tagger weights on every call; keep one tagger instead.
+        self.tagger = nltk.tag.PerceptronTagger()
+        self.stop_words = set(nltk.corpus.stopwords.words('english')) - {
             'i', 'you', 'we', 'he', 'she', 'they', 'me', 'my', 'your', 'our', 'his', 'her', 'their'
         }
 
@@ -46,21 +115,65 @@ class SpeechGloss:
         }
 
         self.model_path = model_path
+        self.model = model
         self.callback = callback
         self.device_index = device_index
         self.running = False
         self.thread = None
         self.results = queue.Queue()
         self.audio_queue = queue.Queue()
+        self.last_convert_time = 0.0
+        self.utterance_id = tracer.new_utterance()
+        self.record_dir = record_dir if record_dir is not None else (record_dir_config.getValue() or None)
+        self.recorder = None
+        # Shared by the recognizer thread and the control API's gloss worker.
+        self.gloss_cache = OrderedDict()
+        self.gloss_cache_lock = threading.Lock()
+        self.gloss_cache_size = gloss_cache_size
+        # Input stream state; see _open_stream and swap_device.
+        self.stream = None
+        self.stream_serial = 0
+        self.active_stream = None
+        self.pending_stream = None
+        self.crossed_over = threading.Event()
+        self.swap_lock = threading.Lock()
 
     def set_device(self, index):
         """Update the input device index."""
         self.device_index = index
 
+    def warm_up(self, text=WARMUP_UTTERANCE):
+        """Converts one sentence so that the tokenizer, tagger and WordNet data are loaded before real speech."""
+        return self.convert_to_sign_gloss(text)
+
     def convert_to_sign_gloss(self, text):
-        words = [w for w in word_tokenize(
+        """Gloss for `text`. Repeated phrases are served from a small LRU cache."""
+        if not self.gloss_cache_size:
+            with _convert_lock:
+                return self._convert_to_sign_gloss(text)
+        key = " ".join(text.lower().split())
+        with self.gloss_cache_lock:
+            gloss = self.gloss_cache.get(key)
+            if gloss is not None:
+                self.gloss_cache.move_to_end(key)
+        if gloss is not None:
+            metrics.inc("gloss_cache_hits_total")
+            return gloss
+
+        metrics.inc("gloss_cache_misses_total")
+        with _convert_lock:
+            gloss = self._convert_to_sign_gloss(text)
+        with self.gloss_cache_lock:
+            self.gloss_cache[key] = gloss
+            if len(self.gloss_cache) > self.gloss_cache_size:
+                self.gloss_cache.popitem(last=False)
+        return gloss
+
+    def _convert_to_sign_gloss(self, text):
+        words = [w for w in nltk.word_tokenize(
             text.lower()) if w not in string.punctuation]
-        pos_tags = pos_tag(words)
+        pos_tags = self.tagger.tag(words)
+        wordnet = nltk.corpus.wordnet
 
         def get_wordnet_pos(tag):
             if tag.startswith('J'):
@@ -97,6 +210,10 @@ class SpeechGloss:
         """Start continuous speech recognition in a background thread"""
         if self.running:
             return False
+        if self.thread and self.thread.is_alive():
+            # stop() timed out and the old thread is still finishing; two threads would share audio_queue.
+            print("Speech recognition is still stopping")
+            return False
 
         self.running = True
         self.thread = threading.Thread(target=self._listen_continuously)
@@ -111,6 +228,130 @@ class SpeechGloss:
             self.thread.join(timeout=1.0)
         return True
 
+    def swap_device(self, index):
+        """
+        Switches the input to device `index` without stopping recognition. The
+        new stream is opened on a helper thread. The recognizer moves over at the
+        first block the new stream delivers, and then the old stream is closed, so
+        no audio is lost. The recognizer, the model and any partial utterance are
+        kept. Returns a Future that resolves to (seconds until the new stream was
+        running, seconds until the crossover), or raises if the device can't be
+        opened or delivers no audio. If no stream was open, the default device
+        is tried before giving up; device_index tells which one is in use.
+        When recognition isn't running, this only sets the device for the next
+        start(). After suspend_stream(), this opens the input again.
+        """
+        future = Future()
+        if not self.running:
+            self.device_index = index
+            future.set_result((0.0, 0.0))
+            return future
+        threading.Thread(target=self._swap_stream, args=(index, future), name="AudioStreamSwap",
+                         daemon=True).start()
+        return future
+
+    def _swap_stream(self, index, future, timeout=2.0):
+        started = time.perf_counter()
+        with self.swap_lock:
+            # With no stream open (after suspend_stream), a failed device would leave recognition
+            # without input, so fall back to the default device as start() does.
+            candidates = [index] if self.stream is not None or index is None else [index, None]
+            for attempt, device in enumerate(candidates):
+                try:
+                    self.crossed_over.clear()
+                    stream = self._open_stream(device, activate=False)
+                    opened = time.perf_counter() - started
+                    if not self.crossed_over.wait(timeout) or not self.running:
+                        self.pending_stream = None
+                        stream.close()
+                        raise TimeoutError(f"Device {device} delivered no audio")
+                    break
+                except Exception as e:
+                    if attempt == len(candidates) - 1 or not self.running:
+                        future.set_exception(e)
+                        return
+                    print(f"Failed to open device {device} ({e}). Falling back to Default.")
+            old, self.stream = self.stream, stream
+            self.device_index = device
+            if old is not None:
+                old.close()
+        print(f"Switched audio input to device {device}")
+        future.set_result((opened, time.perf_counter() - started))
+
+    def _open_stream(self, device_id, activate=True):
+        """
+        Opens and starts an input stream at the device's native sample rate and
+        channel count (at most 2). Each block is downmixed and resampled to
+        16 kHz mono on the recognizer thread. Only the active stream's blocks are
+        queued. A stream opened with activate=False becomes active when its
+        first block arrives, so a switch always falls on a block boundary.
+        """
+        self.stream_serial += 1
+        serial = self.stream_serial
+        info = sd.query_devices(device_id, 'input')
+        formats = [(int(info['default_samplerate']), max(1, min(2, int(info['max_input_channels']))))]
+        if formats[0] != (TARGET_RATE, 1):
+            formats.append((TARGET_RATE, 1))
+
+        def audio_callback(indata, frames, time_info, status):
+            if self.active_stream != serial:
+                if self.pending_stream != serial:
+                    return
+                self.active_stream, self.pending_stream = serial, None
+                self.crossed_over.set()
+            if status:
+                print(f"Audio Status: {status}", file=sys.stderr)
+                if status.input_overflow:
+                    metrics.inc("audio_overflows_total")
+            captured = tracer.now()
+            tracer.instant("audio_block", self.utterance_id, ts=captured, frames=frames)
+            self.audio_queue.put((captured, bytes(indata), converter))
+
+        # Native format first; plain 16 kHz mono if the driver refuses it.
+        for i, (rate, channels) in enumerate(formats):
+            resampler = StreamingResampler(rate, channels)
+            converter = resampler.process if resampler.needed else None
+            try:
+                stream = sd.RawInputStream(
+                    samplerate=rate, blocksize=int(rate * CAPTURE_BLOCK_SECONDS),
+                    device=device_id, dtype='int16',
+                    channels=channels, callback=audio_callback
+                )
+                break
+            except Exception as e:
+                if i == len(formats) - 1:
+                    raise
+                print(f"Could not open device {device_id} at {rate} Hz x{channels} ({e}); trying 16 kHz mono")
+        print(f"Capturing at {rate} Hz x{channels}" + (" (resampled to 16 kHz mono)" if converter else ""))
+        if activate:
+            self.active_stream = serial
+        else:
+            self.pending_stream = serial
+        try:
+            stream.start()
+        except Exception:
+            self.pending_stream = None
+            stream.close()
+            raise
+        return stream
+
+    def suspend_stream(self):
+        """
+        Closes the input stream but keeps the recognizer thread, the recognizer
+        and any partial utterance; swap_device() opens a stream again. Used
+        while PortAudio is re-initialized. Returns whether a stream was open.
+        """
+        return self._close_stream()
+
+    def _close_stream(self):
+        with self.swap_lock:
+            was_open = self.stream is not None
+            if was_open:
+                self.stream.close()
+                self.stream = None
+            self.active_stream = None
+        return was_open
+
     def _listen_continuously(self):
         """
         Thread target: Opens audio stream with sounddevice and processes via VOSK.
@@ -118,48 +359,84 @@ class SpeechGloss:
         with self.audio_queue.mutex:
             self.audio_queue.queue.clear()
 
-        def audio_callback(indata, frames, time, status):
-            if status:
-                print(f"Audio Status: {status}", file=sys.stderr)
-            self.audio_queue.put(bytes(indata))
+        try:
+            if self.model is None:
+                self.model = load_vosk_model(self.model_path)
+            recognizer = vosk.KaldiRecognizer(self.model, TARGET_RATE)
 
-        def open_stream_safe(device_id):
-            return sd.RawInputStream(
-                samplerate=16000, blocksize=8000,
-                device=device_id, dtype='int16',
-                channels=1, callback=audio_callback
-            )
+            # Under swap_lock, so a swap_device() or suspend_stream() arriving during startup waits for this stream.
+            with self.swap_lock:
+                try:
+                    print(f"Attempting to open device ID: {self.device_index}")
+                    self.stream = self._open_stream(self.device_index)
+                except Exception as e:
+                    print(
+                        f"Failed to open specific device ({e}). Falling back to Default.")
+                    self.stream = self._open_stream(None)
 
-        try:
-            print(f"Loading VOSK model from: {self.model_path}")
-            model = Model(self.model_path)
-            recognizer = KaldiRecognizer(model, 16000)
+            if self.record_dir:
+                self.recorder = SessionRecorder.in_folder(self.record_dir, device=self.device_index)
+            recorder = self.recorder
 
-            try:
-                print(f"Attempting to open device ID: {self.device_index}")
-                stream = open_stream_safe(self.device_index)
-            except Exception as e:
-                print(
-                    f"Failed to open specific device ({e}). Falling back to Default.")
-                stream = open_stream_safe(None)
-
-            with stream:
-                print("Continuous speech recognition started...")
-                while self.running:
-                    try:
-                        data = self.audio_queue.get(timeout=0.5)
-                        if recognizer.AcceptWaveform(data):
-                            result = json.loads(recognizer.Result())
-                            text = result.get("text", "").strip()
-                            if text:
-                                gloss = self.convert_to_sign_gloss(text)
-                                if self.callback:
-                                    self.callback(text, gloss)
-                                else:
-                                    self.results.put((text, gloss))
-                    except queue.Empty:
+            print("Continuous speech recognition started...")
+            last_partial = ""
+            # Capture blocks are short; they are decoded in batches of DECODE_BLOCK_SECONDS.
+            batch = []
+            batch_bytes = 0
+            decode_bytes = int(TARGET_RATE * DECODE_BLOCK_SECONDS) * 2
+            while self.running:
+                try:
+                    captured, data, converter = self.audio_queue.get(timeout=0.5)
+                    if converter:
+                        data = converter(data)
+                    batch.append(data)
+                    batch_bytes += len(data)
+                    if batch_bytes < decode_bytes:
+                        continue
+                    data = b"".join(batch)
+                    batch.clear()
+                    batch_bytes = 0
+                    utterance = self.utterance_id
+                    if recorder:
+                        recorder.add_block(captured, data)
+                    decode_start = tracer.now()
+                    tracer.add_span("queue_wait", captured, decode_start, utterance)
+                    final = recognizer.AcceptWaveform(data)
+                    decode_end = tracer.now()
+                    tracer.add_span("decode", decode_start, decode_end, utterance, final=final)
+                    metrics.observe_decode((decode_end - decode_start) / 1e9, len(data) / 2 / TARGET_RATE)
+
+                    if not final:
+                        if tracer.enabled or recorder:
+                            partial = json.loads(recognizer.PartialResult()).get("partial", "")
+                            if partial and partial != last_partial:
+                                tracer.instant("partial_result", utterance, text=partial)
+                                if recorder:
+                                    recorder.add_result(captured, partial, None, 0.0, partial=True)
+                            last_partial = partial
                         continue
 
+                    last_partial = ""
+                    result = json.loads(recognizer.Result())
+                    text = result.get("text", "").strip()
+                    tracer.instant("final_result", utterance, text=text)
+                    if text:
+                        metrics.inc("utterances_recognized_total")
+                        tracer.instant("speech_end", utterance, ts=captured)
+                        started = time.perf_counter()
+                        with tracer.span("convert_to_sign_gloss", utterance):
+                            gloss = self.convert_to_sign_gloss(text)
+                        self.last_convert_time = time.perf_counter() - started
+                        if recorder:
+                            recorder.add_result(captured, text, gloss, self.last_convert_time)
+                        if self.callback:
+                            self.callback(text, gloss)
+                        else:
+                            self.results.put((text, gloss))
+                        self.utterance_id = tracer.new_utterance()
+                except queue.Empty:
+                    continue
+
             print("Continuous speech recognition stopped.")
 
         except Exception as e:
@@ -168,3 +445,8 @@ class SpeechGloss:
             if self.callback:
                 self.callback(error_msg, "")
             self.running = False
+        finally:
+            self._close_stream()
+            if self.recorder:
+                self.recorder.close()
+                self.recorder = None
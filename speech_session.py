@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+import wave
+from datetime import datetime
+
+from panda3d.core import ConfigVariableString
+
+record_dir_config = ConfigVariableString(
+    "signsynth-record-dir", "",
+    "When set, every speech recognition session is recorded (audio + results) into this folder.")
+
+SAMPLE_RATE = 16000
+
+
+class SessionRecorder:
+    """
+    Records a speech session as "<base>.wav" (16 kHz mono PCM, exactly what the
+    recognizer saw) and "<base>.jsonl" (one line per audio block and per
+    recognition result, with times in seconds since the session started).
+    A block's time is when the audio device delivered it; a result's time is
+    that of the block that completed it.
+    """
+
+    def __init__(self, base_path, block_size=8000, device=None):
+        self.base_path = base_path
+        self.started_ns = None
+        self.frames = 0
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(base_path)), exist_ok=True)
+        self.wav = wave.open(base_path + ".wav", "wb")
+        self.wav.setnchannels(1)
+        self.wav.setsampwidth(2)
+        self.wav.setframerate(SAMPLE_RATE)
+        self.log = open(base_path + ".jsonl", "w")
+        self._write({"type": "session", "sample_rate": SAMPLE_RATE, "block_size": block_size,
+                     "device": device, "created": datetime.now().isoformat(timespec="seconds")})
+
+    @classmethod
+    def in_folder(cls, folder, **kwargs):
+        """A recorder writing to a new timestamped "session-..." file pair inside `folder`."""
+        name = datetime.now().strftime("session-%Y%m%d-%H%M%S")
+        return cls(os.path.join(folder, name), **kwargs)
+
+    def _write(self, entry):
+        self.log.write(json.dumps(entry) + "\n")
+
+    def _seconds(self, ns):
+        if self.started_ns is None:
+            self.started_ns = ns
+        return round((ns - self.started_ns) / 1e9, 6)
+
+    def add_block(self, captured_ns, data):
+        with self.lock:
+            t = self._seconds(captured_ns)
+            frames = len(data) // 2
+            self.wav.writeframes(data)
+            self._write({"type": "block", "t": t, "frame": self.frames, "frames": frames})
+            self.frames += frames
+
+    def add_result(self, captured_ns, text, gloss, convert_time, partial=False):
+        """A recognition result for the block captured at `captured_ns`."""
+        with self.lock:
+            entry = {"type": "partial" if partial else "result", "t": self._seconds(captured_ns),
+                     "decoded_at": self._seconds(time.perf_counter_ns()), "text": text}
+            if not partial:
+                entry.update(gloss=gloss, convert_time=round(convert_time, 6))
+            self._write(entry)
+
+    def close(self):
+        with self.lock:
+            if self.log.closed:
+                return
+            self.wav.close()
+            self.log.close()
+        print(f"Speech session recorded to {self.base_path}.wav / .jsonl")
+
+
+class Session:
+    """A recorded session loaded back for replay."""
+
+    def __init__(self, base_path):
+        if base_path.endswith((".jsonl", ".wav")):
+            base_path = os.path.splitext(base_path)[0]
+        self.base_path = base_path
+        self.header = {}
+        self.blocks = []
+        self.results = []
+        self.partials = []
+
+        with open(base_path + ".jsonl") as f:
+            for line in f:
+                entry = json.loads(line)
+                kind = entry.get("type")
+                if kind == "session":
+                    self.header = entry
+                elif kind == "block":
+                    self.blocks.append(entry)
+                elif kind == "result":
+                    self.results.append(entry)
+                elif kind == "partial":
+                    self.partials.append(entry)
+
+        with wave.open(base_path + ".wav", "rb") as wav:
+            self.sample_rate = wav.getframerate()
+            self.pcm = wav.readframes(wav.getnframes())
+
+    def block_audio(self, block):
+        start = block["frame"] * 2
+        return self.pcm[start:start + block["frames"] * 2]
+
+    @property
+    def duration(self):
+        if not self.blocks:
+            return 0.0
+        return self.blocks[-1]["t"]
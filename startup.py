@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class StartupTask:
+    """A single startup stage. `func` receives the results of finished stages as a dict."""
+
+    def __init__(self, name, func, deps=(), label=None, main_thread=False):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.label = label or name
+        self.main_thread = main_thread
+        self.start = None
+        self.end = None
+        self.thread = None
+
+
+class StartupGraph:
+    """
+    Runs startup stages as a dependency graph. Independent stages run
+    concurrently on a thread pool; stages that must own the main thread
+    (Panda3D, Tk) run inline while the caller's UI keeps being pumped.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.tasks = {}
+        self.results = {}
+        self.errors = {}
+        self.started_at = None
+        self.finished_at = None
+        self.lock = threading.Lock()
+
+    def add(self, name, func, deps=(), label=None, main_thread=False):
+        if name in self.tasks:
+            raise ValueError(f"Startup task '{name}' already exists")
+        self.tasks[name] = StartupTask(name, func, deps, label, main_thread)
+        return self.tasks[name]
+
+    def _run_task(self, task):
+        task.thread = threading.current_thread().name
+        task.start = time.perf_counter()
+        try:
+            with self.lock:
+                results = dict(self.results)
+            value = task.func(results)
+            with self.lock:
+                self.results[task.name] = value
+        except Exception as e:
+            print(f"Startup task '{task.name}' failed: {e}")
+            with self.lock:
+                self.results[task.name] = None
+                self.errors[task.name] = e
+        finally:
+            task.end = time.perf_counter()
+        return task
+
+    def run(self, on_progress=None, pump=None, poll_interval=0.01):
+        """
+        Run every task. `on_progress(task, completed, total)` is called on the
+        calling thread as each task finishes, and `pump()` while waiting.
+        """
+        for task in self.tasks.values():
+            for dep in task.deps:
+                if dep not in self.tasks:
+                    raise ValueError(f"Startup task '{task.name}' depends on unknown task '{dep}'")
+
+        self.started_at = time.perf_counter()
+        pending = dict(self.tasks)
+        running = {}
+        finished = set()
+
+        def complete(task):
+            finished.add(task.name)
+            if on_progress:
+                on_progress(task, len(finished), len(self.tasks))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="startup") as pool:
+            while pending or running:
+                for future in [f for f in running if f.done()]:
+                    complete(running.pop(future))
+
+                ready = [task for task in pending.values() if all(dep in finished for dep in task.deps)]
+                for task in ready:
+                    if not task.main_thread:
+                        del pending[task.name]
+                        running[pool.submit(self._run_task, task)] = task
+
+                main_ready = [task for task in ready if task.main_thread]
+                if main_ready:
+                    task = main_ready[0]
+                    del pending[task.name]
+                    complete(self._run_task(task))
+                    continue
+
+                if pending and not running and not ready:
+                    raise RuntimeError(f"Startup tasks can never run: {', '.join(pending)}")
+                if pump:
+                    pump()
+                time.sleep(poll_interval)
+
+        self.finished_at = time.perf_counter()
+        return self.results
+
+    def timing_report(self):
+        stages = {}
+        for task in self.tasks.values():
+            if task.start is None:
+                continue
+            stages[task.name] = {
+                "start": round(task.start - self.started_at, 4),
+                "end": round(task.end - self.started_at, 4),
+                "duration": round(task.end - task.start, 4),
+                "thread": task.thread,
+                "error": str(self.errors[task.name]) if task.name in self.errors else None,
+            }
+        return {
+            "launched_at": datetime.now().isoformat(timespec="seconds"),
+            "total": round((self.finished_at or time.perf_counter()) - self.started_at, 4),
+            "stages": stages,
+        }
+
+    def write_report(self, path, extra=None):
+        """Print the per-stage timings and append them as one JSON line to `path`."""
+        report = self.timing_report()
+        if extra:
+            report.update(extra)
+
+        print(f"Startup finished in {report['total']:.2f}s")
+        for name, stage in sorted(report["stages"].items(), key=lambda item: item[1]["start"]):
+            status = f" (failed: {stage['error']})" if stage["error"] else ""
+            print(f"  {name:<12} {stage['start']:6.2f}s -> {stage['end']:6.2f}s  "
+                  f"{stage['duration']:6.2f}s  [{stage['thread']}]{status}")
+
+        try:
+            with open(path, "a") as f:
+                f.write(json.dumps(report) + "\n")
+        except OSError as e:
+            print(f"Could not write startup report: {e}")
+        return report
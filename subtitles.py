@@ -0,0 +1,414 @@
+"""
+Signs pre-recorded content from its subtitles. All cues are glossed and
+compiled into a signing schedule before playback starts, so no NLP or
+timeline work happens while the media plays.
+
+Each cue's signs start at the cue's start time (or when the previous cue's
+signs end, if that is later) and are spaced by the sign delay. A cue's slot
+runs until the next cue starts. When its signs don't fit, they are compressed
+down to signsynth-min-sign-delay each; only then does a cue overrun its slot
+and delay the next one.
+
+Usage:
+    python subtitles.py schedule movie.srt [--output movie.schedule.json]
+    python subtitles.py play movie.srt|movie.vtt|movie.schedule.json [--offset 12.5]
+    cue_source | python subtitles.py play --live
+
+In play mode the schedule follows a media clock: space pauses and resumes,
+the left and right arrows seek by 5 seconds. With --live, cues are read from
+stdin as JSON lines ({"start": 1.0, "end": 2.5, "text": "..."}, in seconds on
+the clock that starts with playback) and glossed as soon as they arrive.
+"""
+import argparse
+import bisect
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+from panda3d.core import ConfigVariableDouble
+
+from pose_compiler import expand_gloss, load_pose_file
+
+BASE_PATH = os.path.abspath(os.path.dirname(__file__))
+POSE_FILE = os.path.join(BASE_PATH, "sign_poses.json")
+
+min_sign_delay_config = ConfigVariableDouble(
+    "signsynth-min-sign-delay", 0.35,
+    "Shortest time per sign when a subtitle cue's signs are compressed to fit the cue.")
+
+# HTML-style tags (<i>, <c.yellow>, <00:00:01.000>) and SSA override blocks ({\an8}).
+MARKUP_RE = re.compile(r"<[^>]*>|\{\\[^}]*\}")
+VTT_TIME_RE = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{3})")
+SEEK_STEP = 5.0
+
+
+class Cue:
+    __slots__ = ("index", "start", "end", "text")
+
+    def __init__(self, index, start, end, text):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.text = text
+
+
+def clean_cue_text(text):
+    return " ".join(MARKUP_RE.sub("", text).split())
+
+
+def parse_srt(text):
+    import srt
+
+    return [Cue(s.index, s.start.total_seconds(), s.end.total_seconds(), clean_cue_text(s.content))
+            for s in srt.parse(text)]
+
+
+def _vtt_seconds(stamp):
+    match = VTT_TIME_RE.fullmatch(stamp.strip())
+    if not match:
+        raise ValueError(f"bad WebVTT timestamp {stamp!r}")
+    hours, minutes, seconds, millis = (int(g or 0) for g in match.groups())
+    return hours * 3600 + minutes * 60 + seconds + millis / 1000
+
+
+def parse_vtt(text):
+    cues = []
+    for block in re.split(r"\n[ \t]*\n", text.replace("\r\n", "\n").replace("\r", "\n")):
+        lines = block.strip("\n").split("\n")
+        timing = next((i for i, line in enumerate(lines) if "-->" in line), None)
+        if timing is None or lines[0].startswith(("NOTE", "STYLE", "REGION")):
+            continue
+        start, _, rest = lines[timing].partition("-->")
+        cues.append(Cue(len(cues) + 1, _vtt_seconds(start), _vtt_seconds(rest.split()[0]),
+                        clean_cue_text(" ".join(lines[timing + 1:]))))
+    return cues
+
+
+def load_cues(path):
+    """Cues of an SRT or WebVTT file, in time order, without empty ones."""
+    with open(path, encoding="utf-8-sig") as f:
+        text = f.read()
+    is_vtt = path.lower().endswith(".vtt") or text.lstrip().startswith("WEBVTT")
+    cues = parse_vtt(text) if is_vtt else parse_srt(text)
+    return sorted((cue for cue in cues if cue.text), key=lambda cue: cue.start)
+
+
+def gloss_cues(cues, converter):
+    """[(cue, gloss)] for every cue; repeated lines are converted once."""
+    glosses = {}
+    for cue in cues:
+        if cue.text not in glosses:
+            glosses[cue.text] = converter.convert_to_sign_gloss(cue.text)
+    return [(cue, glosses[cue.text]) for cue in cues]
+
+
+class SigningSchedule:
+    """
+    Glossed cues compiled into pose events (time, pose, seconds per sign,
+    transition time, cue index), sorted by time. Cues can be added one at a
+    time as long as they arrive in time order.
+    """
+
+    def __init__(self, gesture_data, sign_delay=1.5, transition_time=0.15, min_sign_delay=None):
+        self.gesture_data = gesture_data
+        self.sign_delay = sign_delay
+        self.transition_time = transition_time
+        self.min_sign_delay = min(sign_delay, min_sign_delay or min_sign_delay_config.getValue())
+        self.cues = {}
+        self.events = []
+        self.times = []
+        self.end_time = 0.0
+        self.compressed = 0
+        self.overruns = 0
+
+    def add_cue(self, cue, gloss, slot_end=None):
+        """Schedule a cue. Its signs may use the time up to slot_end (the next cue's start) if given."""
+        poses, _, _ = expand_gloss(gloss.split(), self.gesture_data)
+        start = max(cue.start, self.end_time)
+        slot_end = max(cue.end, slot_end or cue.end)
+        per_sign = self.sign_delay
+        if poses and len(poses) * per_sign > slot_end - start:
+            per_sign = max(self.min_sign_delay, (slot_end - start) / len(poses))
+            self.compressed += 1
+        transition = min(self.transition_time, per_sign / 2)
+
+        t = start
+        for pose in poses:
+            self.events.append((round(t, 4), pose, round(per_sign, 4), round(transition, 4), cue.index))
+            self.times.append(round(t, 4))
+            t += per_sign
+        if poses:
+            self.end_time = t
+            if t > slot_end + 1e-6:
+                self.overruns += 1
+        self.cues[cue.index] = {"start": cue.start, "end": cue.end, "text": cue.text, "gloss": gloss,
+                                "signs": len(poses), "sign_time": round(per_sign, 4)}
+
+    def summary(self):
+        return {"cues": len(self.cues), "signs": len(self.events), "compressed_cues": self.compressed,
+                "overrun_cues": self.overruns, "duration": round(self.end_time, 3)}
+
+    def to_json(self):
+        return {
+            "sign_delay": self.sign_delay, "transition_time": self.transition_time,
+            "min_sign_delay": self.min_sign_delay, "summary": self.summary(),
+            "cues": [dict(cue, index=index) for index, cue in self.cues.items()],
+            "events": [dict(zip(("t", "pose", "duration", "transition", "cue"), event)) for event in self.events],
+        }
+
+    @classmethod
+    def from_json(cls, data, gesture_data):
+        schedule = cls(gesture_data, data["sign_delay"], data["transition_time"], data["min_sign_delay"])
+        schedule.cues = {cue.pop("index"): cue for cue in data["cues"]}
+        schedule.events = [(e["t"], e["pose"], e["duration"], e["transition"], e["cue"]) for e in data["events"]]
+        schedule.times = [event[0] for event in schedule.events]
+        summary = data.get("summary", {})
+        schedule.end_time = summary.get("duration", schedule.times[-1] if schedule.times else 0.0)
+        schedule.compressed = summary.get("compressed_cues", 0)
+        schedule.overruns = summary.get("overrun_cues", 0)
+        return schedule
+
+
+class MediaClock:
+    """Media time in seconds. Runs at real time while playing; can be paused and seeked."""
+
+    def __init__(self, start=0.0):
+        self.offset = start
+        self.started = None
+
+    @property
+    def playing(self):
+        return self.started is not None
+
+    def time(self):
+        if self.started is None:
+            return self.offset
+        return self.offset + time.perf_counter() - self.started
+
+    def play(self):
+        if self.started is None:
+            self.started = time.perf_counter()
+
+    def pause(self):
+        if self.started is not None:
+            self.offset = self.time()
+            self.started = None
+
+    def toggle(self):
+        if self.playing:
+            self.pause()
+        else:
+            self.play()
+
+    def seek(self, seconds):
+        self.offset = max(0.0, seconds)
+        if self.started is not None:
+            self.started = time.perf_counter()
+
+
+class SchedulePlayer:
+    """
+    Plays a SigningSchedule on the app in step with a MediaClock. Each frame
+    it plays the latest event that is due; after a seek it jumps straight to
+    the sign that should be showing.
+    """
+
+    def __init__(self, app, schedule, clock, rest_after=1.0):
+        self.app = app
+        self.schedule = schedule
+        self.clock = clock
+        self.rest_after = rest_after
+        self.next_index = 0
+        self.last_time = None
+        self.current = None
+        self.current_cue = None
+        self.live_cues = queue.Queue()
+        self.played = 0
+        self.skipped = 0
+
+    def start(self):
+        app = self.app
+        app.stopAnimation()
+        app.accept("space", self.clock.toggle)
+        app.accept("arrow_left", lambda: self.clock.seek(self.clock.time() - SEEK_STEP))
+        app.accept("arrow_right", lambda: self.clock.seek(self.clock.time() + SEEK_STEP))
+        app.taskMgr.add(self.play_task, "SubtitleScheduleTask", sort=-70)
+        self.clock.play()
+        return self
+
+    def stop(self):
+        self.app.taskMgr.remove("SubtitleScheduleTask")
+        for key in ("space", "arrow_left", "arrow_right"):
+            self.app.ignore(key)
+
+    def seek(self, now):
+        self.next_index = bisect.bisect_right(self.schedule.times, now)
+        self.current = None
+        if self.next_index:
+            event = self.schedule.events[self.next_index - 1]
+            if now < event[0] + event[2] + self.rest_after:
+                self.next_index -= 1
+
+    def play_task(self, task):
+        while not self.live_cues.empty():
+            self.schedule.add_cue(*self.live_cues.get_nowait())
+
+        now = self.clock.time()
+        if self.last_time is not None and (now < self.last_time or now - self.last_time > SEEK_STEP / 2):
+            self.seek(now)
+        self.last_time = now
+
+        events = self.schedule.events
+        due = None
+        while self.next_index < len(events) and events[self.next_index][0] <= now:
+            if due is not None:
+                self.skipped += 1
+            due = events[self.next_index]
+            self.next_index += 1
+
+        if due is not None:
+            self.play_event(due)
+        elif self.current is not None and now >= self.current[0] + self.current[2] + self.rest_after:
+            self.rest()
+        return task.cont
+
+    def play_event(self, event):
+        _, pose, _, transition, cue_index = event
+        app = self.app
+        if app.signing_complete:
+            app.media.signing_started()
+        app.signing_complete = False
+        app.idle_throttle.wake()
+        if app.current_pose == pose and len(pose) == 1 and self.current is not None:
+            app.slideArms()
+        else:
+            base_transition, app.transition_time = app.transition_time, transition
+            app.playTransition(pose)
+            app.transition_time = base_transition
+        app.current_pose = pose
+        app.recognized_text_node.setText(pose.upper())
+        if cue_index != self.current_cue:
+            cue = self.schedule.cues[cue_index]
+            app.gloss_text_node.setText(f"{cue['text']}\n{cue['gloss']}")
+            self.current_cue = cue_index
+        self.current = event
+        self.played += 1
+
+    def rest(self):
+        app = self.app
+        app.playTransition("default")
+        app.current_pose = "default"
+        app.recognized_text_node.setText("...")
+        app.finish_signing()
+        self.current = None
+
+    def feed_live(self, lines, converter):
+        """Reads JSON cue lines on a background thread, glosses each and hands it to the player."""
+        def run():
+            for index, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    cue = Cue(entry.get("index", index), float(entry["start"]), float(entry["end"]),
+                              clean_cue_text(entry["text"]))
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"Ignoring bad cue line {index}: {e}")
+                    continue
+                if cue.text:
+                    self.live_cues.put((cue, converter.convert_to_sign_gloss(cue.text)))
+
+        threading.Thread(target=run, name="SubtitleFeed", daemon=True).start()
+
+    def report(self):
+        return (f"Subtitle playback: {self.played} signs played, {self.skipped} skipped after hitches or seeks; "
+                f"schedule {self.schedule.summary()}")
+
+
+def build_schedule(path, sign_delay, converter=None):
+    """Load a compiled schedule, or gloss and compile a subtitle file. Prints how long compiling took."""
+    gesture_data = load_pose_file(POSE_FILE)
+    if path.endswith(".json"):
+        with open(path) as f:
+            return SigningSchedule.from_json(json.load(f), gesture_data)
+
+    started = time.perf_counter()
+    cues = load_cues(path)
+    if converter is None:
+        from speech_gloss import SpeechGloss
+        converter = SpeechGloss(record_dir="")
+    glossed = gloss_cues(cues, converter)
+    schedule = SigningSchedule(gesture_data, sign_delay)
+    for i, (cue, gloss) in enumerate(glossed):
+        schedule.add_cue(cue, gloss, glossed[i + 1][0].start if i + 1 < len(glossed) else None)
+    print(f"Compiled {len(cues)} cues into {len(schedule.events)} signs "
+          f"in {time.perf_counter() - started:.2f}s: {schedule.summary()}")
+    return schedule
+
+
+def schedule_command(args):
+    schedule = build_schedule(args.subtitles, args.sign_delay)
+    output = args.output or os.path.splitext(args.subtitles)[0] + ".schedule.json"
+    with open(output, "w") as f:
+        json.dump(schedule.to_json(), f, indent=1)
+    print(f"Schedule written to {output}")
+    return 0
+
+
+def play_command(args):
+    from panda3d.core import Filename, loadPrcFileData
+    loadPrcFileData("", f"model-path {Filename.fromOsSpecific(BASE_PATH).getFullpath()}")
+    loadPrcFileData("", "window-type none")
+
+    converter = None
+    if args.live:
+        from speech_gloss import SpeechGloss
+        converter = SpeechGloss(record_dir="")
+        schedule = SigningSchedule(load_pose_file(POSE_FILE), args.sign_delay)
+    else:
+        schedule = build_schedule(args.subtitles, args.sign_delay)
+
+    from sign_language_app import SignLanguageApp
+    app = SignLanguageApp(version="subtitles", start_speech=False)
+    app.speech_toggle_button.hide()
+    player = SchedulePlayer(app, schedule, MediaClock(args.offset))
+    if args.live:
+        player.feed_live(sys.stdin, converter)
+    app.open_app_window()
+    player.start()
+    try:
+        app.run()
+    finally:
+        print(player.report())
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sign subtitles on a precompiled schedule.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    schedule_parser = sub.add_parser("schedule", help="Gloss a subtitle file and write its signing schedule.")
+    schedule_parser.add_argument("subtitles", help="SRT or WebVTT file.")
+    schedule_parser.add_argument("--output", help="Default: <subtitles>.schedule.json")
+
+    play_parser = sub.add_parser("play", help="Play subtitles (or a compiled schedule) in sync with a media clock.")
+    play_parser.add_argument("subtitles", nargs="?", help="SRT, WebVTT or .schedule.json file.")
+    play_parser.add_argument("--live", action="store_true", help="Read JSON cue lines from stdin instead.")
+    play_parser.add_argument("--offset", type=float, default=0.0, help="Media time to start at (seconds).")
+
+    for p in (schedule_parser, play_parser):
+        p.add_argument("--sign-delay", type=float, default=1.5, help="Seconds per sign when the cue has room.")
+
+    args = parser.parse_args(argv)
+    if args.command == "play" and not args.live and not args.subtitles:
+        parser.error("play needs a subtitle file or --live")
+    return schedule_command(args) if args.command == "schedule" else play_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+"""Startup import budget: `import main` must stay fast and must not pull in deferred modules."""
+from import_report import IMPORT_BUDGET_MS, deferred_violations, measure_imports
+
+
+def test_main_imports_within_budget():
+    imports = measure_imports("main", runs=3)
+
+    assert "main" in imports
+    total_ms = imports["main"][1] / 1000.0
+    assert total_ms <= IMPORT_BUDGET_MS, f"import main took {total_ms:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+    assert deferred_violations(imports) == []
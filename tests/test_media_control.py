@@ -0,0 +1,130 @@
+"""MediaController state changes, driven by a fake task manager and the recording backend."""
+import types
+
+from media_control import MediaController, RecordingMediaBackend
+
+
+class FakeTaskMgr:
+    """Keeps doMethodLater timers and runs the ones that come due as `advance` moves the clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.timers = {}
+
+    def doMethodLater(self, delay, func, name):
+        self.timers[name] = (self.now + delay, func)
+
+    def remove(self, name):
+        self.timers.pop(name, None)
+
+    def advance(self, seconds):
+        end = self.now + seconds
+        while True:
+            due = [(when, name) for name, (when, _) in self.timers.items() if when <= end]
+            if not due:
+                break
+            when, name = min(due)
+            self.now = when
+            _, func = self.timers.pop(name)
+            func(types.SimpleNamespace(done="done"))
+        self.now = end
+
+
+def make_controller():
+    status = []
+    app = types.SimpleNamespace(taskMgr=FakeTaskMgr(), signing_complete=True,
+                                gloss_text_node=types.SimpleNamespace(setText=status.append))
+    backend = RecordingMediaBackend()
+    return MediaController(app, backend, start_delay=3.0, play_interval=5.0), app, backend, status
+
+
+def start_signing(app, media):
+    app.signing_complete = False
+    media.signing_started()
+
+
+def finish_signing(app, media):
+    # Same order as SignLanguageApp.finish_signing.
+    app.signing_complete = True
+    media.signing_finished()
+
+
+def test_play_window_is_paused_when_it_ends():
+    media, app, backend, status = make_controller()
+    media.enable()
+    app.taskMgr.advance(2.9)
+    assert media.state == "starting"
+
+    app.taskMgr.advance(0.2)
+    assert media.state == "playing"
+    assert backend.presses == []
+    assert status[-1] == "Media playing"
+
+    app.taskMgr.advance(5.0)
+    assert media.state == "paused"
+    assert len(backend.presses) == 1
+    assert status[-1] == "Media paused"
+    assert app.taskMgr.timers == {}
+
+
+def test_signing_pauses_and_resumes_media():
+    media, app, backend, _ = make_controller()
+    media.enable()
+    app.taskMgr.advance(4.0)
+
+    start_signing(app, media)
+    assert media.state == "paused"
+    assert len(backend.presses) == 1
+    app.taskMgr.advance(60.0)
+    assert len(backend.presses) == 1
+
+    finish_signing(app, media)
+    assert media.state == "playing"
+    assert len(backend.presses) == 2
+    app.taskMgr.advance(5.0)
+    assert media.state == "paused"
+    assert len(backend.presses) == 3
+
+
+def test_timer_due_while_signing_fires_when_signing_ends():
+    media, app, backend, _ = make_controller()
+    media.enable()
+    start_signing(app, media)
+    app.taskMgr.advance(10.0)
+    assert media.state == "starting"
+    assert media.timer_due
+
+    finish_signing(app, media)
+    assert media.state == "playing"
+    assert not media.timer_due
+    assert backend.presses == []
+
+
+def test_reset_while_signing_lets_media_continue():
+    from sign_language_app import SignLanguageApp
+
+    media, app, backend, _ = make_controller()
+    app.media = media
+    media.enable()
+    start_signing(app, media)
+    app.taskMgr.advance(10.0)
+
+    SignLanguageApp.finish_signing(app)
+    assert app.signing_complete
+    assert media.state == "playing"
+    # Finishing again without signing in between changes nothing.
+    SignLanguageApp.finish_signing(app)
+    assert media.state == "playing"
+    assert backend.presses == []
+
+
+def test_disable_stops_timers():
+    media, app, backend, _ = make_controller()
+    media.enable()
+    app.taskMgr.advance(4.0)
+    media.disable()
+    app.taskMgr.advance(60.0)
+    assert backend.presses == []
+    assert not media.active
+    finish_signing(app, media)
+    assert backend.presses == []
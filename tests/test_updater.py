@@ -0,0 +1,295 @@
+"""Update checks and installer downloads against a local stand-in for GitHub."""
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from updater import Downloader, DownloadError, UpdateChecker, UpdateInfo
+
+REPO = "owner/SignSynth"
+RELEASE_PATH = f"/repos/{REPO}/releases/latest"
+RELEASE = {
+    "tag_name": "v2.1.0",
+    "assets": [{"name": "SignSynth-Setup.exe", "browser_download_url": "http://example.invalid/setup.exe"}],
+}
+
+
+class LocalServer:
+    """
+    Serves `routes` ({path: handler(request)}) on a free localhost port. Every
+    request is recorded as (method, path, headers).
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests.append(("GET", self.path, dict(self.headers)))
+                handler = server.routes.get(self.path)
+                if handler is None:
+                    self.send_error(404)
+                    return
+                handler(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def send(request, status, body=b"", headers=()):
+    request.send_response(status)
+    for name, value in headers:
+        request.send_header(name, value)
+    request.send_header("Content-Length", str(len(body)))
+    request.end_headers()
+    request.wfile.write(body)
+
+
+def release_handler(etag='"v1"'):
+    """Answers with RELEASE and `etag`, or 304 when the client already has that ETag."""
+    def handle(request):
+        if request.headers.get("If-None-Match") == etag:
+            send(request, 304, headers=[("ETag", etag)])
+        else:
+            send(request, 200, json.dumps(RELEASE).encode(), [("Content-Type", "application/json"), ("ETag", etag)])
+    return handle
+
+
+def make_checker(server_url, tmp_path, ttl=3600):
+    return UpdateChecker(REPO, "2.0.0", str(tmp_path / "update_cache.json"), ttl=ttl, timeout=2, api_url=server_url)
+
+
+def test_fresh_fetch_writes_cache(tmp_path):
+    with LocalServer({RELEASE_PATH: release_handler()}) as server:
+        info = make_checker(server.url, tmp_path).fetch()
+
+    assert not info.from_cache
+    assert info.latest_version == "v2.1.0"
+    assert info.available
+    assert info.installer_url == "http://example.invalid/setup.exe"
+    assert len(server.requests) == 1
+    cache = json.loads((tmp_path / "update_cache.json").read_text())
+    assert cache["etag"] == '"v1"'
+    assert cache["release"] == RELEASE
+
+
+def test_cache_within_ttl_makes_no_request(tmp_path):
+    with LocalServer({RELEASE_PATH: release_handler()}) as server:
+        make_checker(server.url, tmp_path).fetch()
+        info = make_checker(server.url, tmp_path).fetch()
+
+    assert info.from_cache
+    assert info.latest_version == "v2.1.0"
+    assert len(server.requests) == 1
+
+
+def test_expired_cache_revalidates_with_etag(tmp_path):
+    with LocalServer({RELEASE_PATH: release_handler()}) as server:
+        make_checker(server.url, tmp_path).fetch()
+        fetched_at = json.loads((tmp_path / "update_cache.json").read_text())["fetched_at"]
+        info = make_checker(server.url, tmp_path, ttl=0).fetch()
+
+    assert info.from_cache
+    assert info.latest_version == "v2.1.0"
+    assert len(server.requests) == 2
+    assert server.requests[1][2].get("If-None-Match") == '"v1"'
+    assert json.loads((tmp_path / "update_cache.json").read_text())["fetched_at"] >= fetched_at
+
+
+def test_server_error_falls_back_to_cache(tmp_path):
+    routes = {RELEASE_PATH: release_handler()}
+    with LocalServer(routes) as server:
+        make_checker(server.url, tmp_path).fetch()
+        routes[RELEASE_PATH] = lambda request: send(request, 503, b"unavailable")
+        info = make_checker(server.url, tmp_path, ttl=0).fetch()
+
+    assert info.from_cache
+    assert info.latest_version == "v2.1.0"
+    assert len(server.requests) == 2
+
+
+def test_offline_falls_back_to_cache(tmp_path):
+    with LocalServer({RELEASE_PATH: release_handler()}) as server:
+        make_checker(server.url, tmp_path).fetch()
+        url = server.url
+    # The server is shut down, so the connection is refused.
+    info = make_checker(url, tmp_path, ttl=0).fetch()
+
+    assert info.from_cache
+    assert info.latest_version == "v2.1.0"
+
+
+def test_server_error_without_cache_is_reported(tmp_path):
+    with LocalServer({RELEASE_PATH: lambda request: send(request, 500)}) as server:
+        checker = make_checker(server.url, tmp_path)
+        checker.start().done.wait(5)
+
+    assert checker.result is None
+    assert checker.error.startswith("Could not check for updates")
+
+
+PAYLOAD = bytes(range(256)) * 512  # 128 KiB
+PAYLOAD_SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+INSTALLER_PATH = "/SignSynth-Setup.exe"
+
+
+def requested_offset(request):
+    """Start offset of a "bytes=N-" Range header, or None."""
+    value = request.headers.get("Range", "")
+    return int(value[len("bytes="):-1]) if value.startswith("bytes=") and value.endswith("-") else None
+
+
+def send_body(request, body, pieces=1, delay=0.0, stop_after=None):
+    """Writes `body` in `pieces` writes `delay` seconds apart; stops and drops the connection after `stop_after` bytes."""
+    step = max(1, -(-len(body) // pieces))
+    sent = 0
+    for start in range(0, len(body), step):
+        piece = body[start:start + step]
+        if stop_after is not None and sent + len(piece) > stop_after:
+            request.wfile.write(piece[:stop_after - sent])
+            request.wfile.flush()
+            request.close_connection = True
+            request.connection.shutdown(socket.SHUT_RDWR)
+            return
+        request.wfile.write(piece)
+        request.wfile.flush()
+        sent += len(piece)
+        time.sleep(delay)
+
+
+def installer_handler(honour_range=True, drop_first_at=None, pieces=1, delay=0.0):
+    """
+    Serves PAYLOAD. The first response is cut off after `drop_first_at` bytes.
+    With honour_range, a Range request gets 206 and the rest of the file;
+    otherwise the whole file is sent again with 200.
+    """
+    calls = []
+
+    def handle(request):
+        calls.append(request.headers.get("Range"))
+        offset = requested_offset(request) if honour_range else None
+        body = PAYLOAD[offset:] if offset else PAYLOAD
+        request.send_response(206 if offset else 200)
+        if offset:
+            request.send_header("Content-Range", f"bytes {offset}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        send_body(request, body, pieces, delay, drop_first_at if len(calls) == 1 else None)
+
+    handle.calls = calls
+    return handle
+
+
+def make_downloader(server_url, tmp_path, expected_sha256=PAYLOAD_SHA256, **kwargs):
+    kwargs.setdefault("retry_delay", 0)
+    kwargs.setdefault("timeout", 5)
+    return Downloader(server_url + INSTALLER_PATH, str(tmp_path / "SignSynth-Setup.exe"), expected_sha256, **kwargs)
+
+
+def test_throttled_download_rate_limits_progress(tmp_path):
+    progress = []
+    handler = installer_handler(pieces=32, delay=0.01)
+    with LocalServer({INSTALLER_PATH: handler}) as server:
+        downloader = make_downloader(server.url, tmp_path, on_progress=lambda done, total: progress.append((done, total)),
+                                     progress_interval=0.05, min_chunk=4096)
+        path = downloader.run()
+
+    assert open(path, "rb").read() == PAYLOAD
+    assert not os.path.exists(path + ".part")
+    assert downloader.resumes == 0
+    # Many more reads than reports, and the last report is the finished download.
+    assert 1 < len(progress) < 32
+    assert progress[-1] == (len(PAYLOAD), len(PAYLOAD))
+
+
+def test_disconnect_resumes_with_range(tmp_path):
+    handler = installer_handler(drop_first_at=50000, pieces=16)
+    with LocalServer({INSTALLER_PATH: handler}) as server:
+        downloader = make_downloader(server.url, tmp_path)
+        path = downloader.run()
+
+    assert open(path, "rb").read() == PAYLOAD
+    assert downloader.resumes == 1
+    assert handler.calls[0] is None
+    resumed_from = int(handler.calls[1][len("bytes="):-1])
+    assert 0 < resumed_from <= 50000
+
+
+def test_server_ignoring_range_restarts_download(tmp_path):
+    handler = installer_handler(honour_range=False, drop_first_at=50000, pieces=16)
+    with LocalServer({INSTALLER_PATH: handler}) as server:
+        downloader = make_downloader(server.url, tmp_path)
+        path = downloader.run()
+
+    assert handler.calls[1] is not None
+    assert open(path, "rb").read() == PAYLOAD
+    assert downloader.total == len(PAYLOAD)
+
+
+def test_checksum_mismatch_raises_and_keeps_nothing(tmp_path):
+    with LocalServer({INSTALLER_PATH: installer_handler()}) as server:
+        downloader = make_downloader(server.url, tmp_path, expected_sha256="0" * 64)
+        with pytest.raises(DownloadError, match="Checksum mismatch"):
+            downloader.run()
+
+    assert not os.path.exists(downloader.path)
+    assert not os.path.exists(downloader.part_path)
+
+
+def test_checksum_mismatch_does_not_launch_installer(tmp_path, monkeypatch):
+    import sign_language_app
+
+    launched, opened, scheduled = [], [], []
+    monkeypatch.setattr(sign_language_app, "launch_installer", lambda *args: launched.append(args))
+    monkeypatch.setattr(sign_language_app.webbrowser, "open", opened.append)
+    monkeypatch.setattr(sign_language_app.tempfile, "gettempdir", lambda: str(tmp_path))
+
+    with LocalServer({INSTALLER_PATH: installer_handler()}) as server:
+        release = {"tag_name": "v2.1.0", "assets": [{
+            "name": "SignSynth-Setup.exe", "browser_download_url": server.url + INSTALLER_PATH,
+            "digest": "sha256:" + "0" * 64}]}
+        app = types.SimpleNamespace(
+            update_info=UpdateInfo("2.0.0", release),
+            update_buttons=[types.SimpleNamespace(hide=lambda: None)],
+            update_label={},
+            taskMgr=types.SimpleNamespace(doMethodLater=lambda *args: scheduled.append(args)),
+            userExit=lambda: launched.append("exit"),
+        )
+        app.check_download_progress = lambda task: sign_language_app.SignLanguageApp.check_download_progress(app, task)
+
+        sign_language_app.SignLanguageApp.start_update_download(app)
+        task = types.SimpleNamespace(again="again")
+        deadline = time.monotonic() + 10
+        while app.check_download_progress(task) == "again" and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+    assert launched == []
+    assert opened == [app.update_info.installer_url]
+    assert app.update_label["text"].startswith("Download failed")
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,65 @@
+from direct.gui.OnscreenText import OnscreenText
+from direct.task import Task
+from panda3d.core import TextNode
+
+# Stages in pipeline order; anything else the tracer records is listed after these.
+STAGE_ORDER = (
+    "queue_wait",
+    "decode",
+    "convert_to_sign_gloss",
+    "handle_speech_result",
+    "start_animation",
+    "to_first_pose",
+    "end_to_end",
+)
+
+
+class TraceOverlay:
+    """On-screen table of live p50/p95 latency per tracing stage. Showing it turns tracing on."""
+
+    def __init__(self, app, tracer, update_interval=0.5):
+        self.app = app
+        self.tracer = tracer
+        self.update_interval = update_interval
+        self.text = None
+
+    @property
+    def visible(self):
+        return self.text is not None and not self.text.isHidden()
+
+    def toggle(self):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def show(self):
+        self.tracer.enabled = True
+        if self.text is None:
+            self.text = OnscreenText(
+                parent=self.app.a2dTopLeft, pos=(0.05, -0.08), scale=0.04, fg=(0.6, 1, 0.6, 1),
+                bg=(0, 0, 0, 0.6), align=TextNode.ALeft, mayChange=True
+            )
+        self.text.show()
+        self.update()
+        self.app.taskMgr.doMethodLater(self.update_interval, self.update_task, "TraceOverlayTask")
+
+    def hide(self):
+        self.app.taskMgr.remove("TraceOverlayTask")
+        if self.text is not None:
+            self.text.hide()
+
+    def update(self):
+        stats = self.tracer.stage_percentiles()
+        stages = [s for s in STAGE_ORDER if s in stats] + sorted(s for s in stats if s not in STAGE_ORDER)
+        lines = ["Latency (ms)            p50      p95     n"]
+        for stage in stages:
+            p50, p95, count = stats[stage]
+            lines.append(f"{stage:<22} {p50 * 1000:7.1f}  {p95 * 1000:7.1f}  {count:4d}")
+        if not stages:
+            lines.append("waiting for speech...")
+        self.text.setText("\n".join(lines))
+
+    def update_task(self, task):
+        self.update()
+        return Task.again
@@ -0,0 +1,142 @@
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from panda3d.core import ConfigVariableBool, ConfigVariableString
+
+trace_config = ConfigVariableBool(
+    "signsynth-trace", False,
+    "Record latency tracing spans from the start (F3 also turns tracing on).")
+trace_file_config = ConfigVariableString(
+    "signsynth-trace-file", "",
+    "Where to write the Chrome trace JSON on exit (default: trace.json in the user data folder).")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Tracer:
+    """
+    Collects spans and instant events with monotonic timestamps, tagged with the
+    utterance they belong to, from any thread. Keeps a rolling window of
+    durations per stage for live p50/p95, and exports Chrome trace JSON
+    (chrome://tracing, Perfetto). Does nothing while disabled.
+    """
+
+    def __init__(self, max_events=100000, window=200, max_utterances=256):
+        self.enabled = trace_config.getValue()
+        self.window = window
+        self.max_utterances = max_utterances
+        self.events = deque(maxlen=max_events)
+        self.stage_times = {}
+        self.marks = {}
+        self.thread_names = {}
+        self.lock = threading.Lock()
+        self.epoch = time.perf_counter_ns()
+        self.utterance_ids = itertools.count(1)
+
+    def now(self):
+        return time.perf_counter_ns()
+
+    def new_utterance(self):
+        return next(self.utterance_ids)
+
+    def _record(self, event, utterance, mark_name, mark_ts):
+        thread = threading.current_thread()
+        event["tid"] = thread.ident
+        with self.lock:
+            self.thread_names.setdefault(thread.ident, thread.name)
+            self.events.append(event)
+            if utterance is not None:
+                marks = self.marks.get(utterance)
+                if marks is None:
+                    marks = self.marks[utterance] = {}
+                    if len(self.marks) > self.max_utterances:
+                        del self.marks[next(iter(self.marks))]
+                marks[mark_name] = mark_ts
+
+    def _add_stage(self, stage, seconds):
+        with self.lock:
+            times = self.stage_times.get(stage)
+            if times is None:
+                times = self.stage_times[stage] = deque(maxlen=self.window)
+            times.append(seconds)
+
+    def add_span(self, name, start_ns, end_ns, utterance=None, **args):
+        """Record a finished span; its duration also feeds the stage statistics under `name`."""
+        if not self.enabled:
+            return
+        if utterance is not None:
+            args["utterance"] = utterance
+        self._record({"name": name, "ph": "X", "ts": (start_ns - self.epoch) / 1000.0,
+                      "dur": (end_ns - start_ns) / 1000.0, "args": args}, utterance, name, end_ns)
+        self._add_stage(name, (end_ns - start_ns) / 1e9)
+
+    @contextmanager
+    def span(self, name, utterance=None, **args):
+        if not self.enabled:
+            yield
+            return
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, self.now(), utterance, **args)
+
+    def instant(self, name, utterance=None, ts=None, **args):
+        """Record a point in time. The last instant of each name is kept as a mark for its utterance."""
+        if not self.enabled:
+            return
+        ts = self.now() if ts is None else ts
+        if utterance is not None:
+            args["utterance"] = utterance
+        self._record({"name": name, "ph": "i", "s": "t", "ts": (ts - self.epoch) / 1000.0, "args": args},
+                     utterance, name, ts)
+
+    def measure(self, stage, utterance, from_mark, end_ns=None):
+        """Add the time from an utterance's `from_mark` until `end_ns` (now) to the stage statistics."""
+        if not self.enabled or utterance is None:
+            return None
+        with self.lock:
+            start = self.marks.get(utterance, {}).get(from_mark)
+        if start is None:
+            return None
+        seconds = ((self.now() if end_ns is None else end_ns) - start) / 1e9
+        self._add_stage(stage, seconds)
+        return seconds
+
+    def stage_percentiles(self):
+        """{stage: (p50 seconds, p95 seconds, samples)} over the rolling window."""
+        with self.lock:
+            snapshot = {stage: sorted(times) for stage, times in self.stage_times.items()}
+        return {stage: (percentile(times, 0.5), percentile(times, 0.95), len(times))
+                for stage, times in snapshot.items()}
+
+    def chrome_trace(self):
+        with self.lock:
+            events = [dict(event, pid=1) for event in self.events]
+            names = dict(self.thread_names)
+        metadata = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                    for tid, name in names.items()]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    def report(self):
+        lines = [f"{'stage':<22} {'p50 ms':>8} {'p95 ms':>8} {'n':>5}"]
+        for stage, (p50, p95, count) in sorted(self.stage_percentiles().items()):
+            lines.append(f"{stage:<22} {p50 * 1000:8.1f} {p95 * 1000:8.1f} {count:5d}")
+        return "\n".join(lines)
+
+
+tracer = Tracer()
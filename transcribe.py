@@ -0,0 +1,273 @@
+"""
+Transcribes a long WAV recording on all cores. A fast energy pass finds the
+pauses, and the file is cut in the middle of them into segments of about
+--segment seconds. Each segment is read with --overlap seconds of padding on
+both sides. Worker processes decode the segments concurrently, and each worker
+loads its own VOSK model from the same model directory. Results are stitched
+back in order, with timestamps relative to the start of the file. A word
+belongs to the segment whose cut interval contains its start time, so a word
+recognized in both sides of an overlap is kept once.
+
+Output is JSONL, one utterance per line, in the cue format that
+`subtitles.py play --live` accepts:
+
+    {"start": 12.34, "end": 15.02, "text": "...", "gloss": "..."}
+
+Usage:
+    python transcribe.py lecture.wav --output lecture.jsonl [--workers 8] [--segment 30]
+    python transcribe.py lecture.wav --plan          # show the segments and exit
+    python transcribe.py lecture.wav --workers 1     # serial baseline
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import wave
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+FRAME_SECONDS = 0.02
+
+# read_start/read_end include the overlap; start/end is the interval whose words this segment keeps.
+Segment = namedtuple("Segment", "index path read_start read_end start end")
+
+# Set in each worker process by _init_worker.
+_model = None
+_converter = None
+
+
+def wav_info(path):
+    """(sample rate, channels, frames) of a 16-bit PCM WAV file."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: needs 16-bit PCM audio")
+        return wav.getframerate(), wav.getnchannels(), wav.getnframes()
+
+
+def read_samples(wav, start, count, channels):
+    """int16 mono samples for frames [start, start + count) of an open wave file."""
+    wav.setpos(start)
+    samples = np.frombuffer(wav.readframes(count), dtype="<i2")
+    if channels > 1:
+        samples = samples[:len(samples) // channels * channels].reshape(-1, channels).mean(axis=1).astype("<i2")
+    return samples
+
+
+def frame_energies(path, frame_seconds=FRAME_SECONDS, block_seconds=10.0):
+    """Energy in dB of each frame_seconds frame, read block by block so long files are never fully in memory."""
+    rate, channels, total = wav_info(path)
+    frame = max(1, int(rate * frame_seconds))
+    block = frame * max(1, int(block_seconds / frame_seconds))
+    energies = []
+    with wave.open(path, "rb") as wav:
+        for start in range(0, total, block):
+            samples = read_samples(wav, start, min(block, total - start), channels).astype(np.float32)
+            usable = len(samples) // frame * frame
+            if usable:
+                power = np.mean(np.square(samples[:usable].reshape(-1, frame)), axis=1)
+                energies.append(10 * np.log10(power + 1.0))
+    return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+
+
+def find_silences(energies, threshold):
+    """Start and end (exclusive) frame indices of the runs of frames below threshold."""
+    quiet = np.concatenate(([0], (energies < threshold).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(quiet))
+    return edges[0::2], edges[1::2]
+
+
+def find_cuts(energies, frame_seconds=FRAME_SECONDS, segment=30.0, min_silence=0.3, silence_db=10.0):
+    """
+    Cut times in seconds, starting with 0 and ending with the end of the last
+    frame. Frames more than silence_db above the noise floor (10th percentile)
+    count as sound. Each cut goes in the middle of the longest pause of at
+    least min_silence that lies between 0.5 and 1.5 segment lengths after the
+    previous cut. If there is no such pause, the cut goes at the quietest frame.
+    """
+    total = len(energies)
+    if not total:
+        return [0.0, 0.0]
+    starts, ends = find_silences(energies, np.percentile(energies, 10) + silence_db)
+    lengths = ends - starts
+    long_enough = lengths >= max(1, int(min_silence / frame_seconds))
+    centers, lengths = (starts + ends)[long_enough] // 2, lengths[long_enough]
+
+    span = segment / frame_seconds
+    cuts = [0]
+    while total - cuts[-1] > 1.5 * span:
+        low, high = int(cuts[-1] + 0.5 * span), int(cuts[-1] + 1.5 * span)
+        i, j = np.searchsorted(centers, [low, high])
+        if j > i:
+            cut = centers[i + np.argmax(lengths[i:j])]
+        else:
+            cut = low + np.argmin(energies[low:high])
+        cuts.append(int(cut))
+    cuts.append(total)
+    return [cut * frame_seconds for cut in cuts]
+
+
+def plan_segments(path, segment=30.0, overlap=0.5, min_silence=0.3, silence_db=10.0):
+    rate, _, total = wav_info(path)
+    duration = total / rate
+    cuts = find_cuts(frame_energies(path), FRAME_SECONDS, segment, min_silence, silence_db)
+    cuts[-1] = duration
+    return [Segment(index, path, max(0.0, start - overlap), min(duration, end + overlap), start, end)
+            for index, (start, end) in enumerate(zip(cuts, cuts[1:]))]
+
+
+def _load_model(model_path):
+    global _model
+    from speech_gloss import get_model_path, vosk
+    vosk.SetLogLevel(-1)
+    _model = vosk.Model(model_path or get_model_path())
+
+
+def _load_converter():
+    global _converter
+    from speech_gloss import SpeechGloss
+    _converter = SpeechGloss(model=_model, record_dir="")
+    _converter.convert_to_sign_gloss("hello")
+
+
+def _init_worker(model_path, gloss):
+    _load_model(model_path)
+    if gloss:
+        _load_converter()
+
+
+def decode_segment(segment):
+    """Utterances whose first word starts in the segment's interval, plus (audio seconds, decode seconds)."""
+    from speech_gloss import vosk
+
+    started = time.perf_counter()
+    with wave.open(segment.path, "rb") as wav:
+        rate, channels = wav.getframerate(), wav.getnchannels()
+        first = int(segment.read_start * rate)
+        samples = read_samples(wav, first, int(segment.read_end * rate) - first, channels)
+
+    recognizer = vosk.KaldiRecognizer(_model, rate)
+    recognizer.SetWords(True)
+    data = samples.tobytes()
+    block = rate  # 0.5 s of 16-bit audio, like the live recognizer
+    results = []
+    for offset in range(0, len(data), block):
+        if recognizer.AcceptWaveform(data[offset:offset + block]):
+            results.append(json.loads(recognizer.Result()))
+    results.append(json.loads(recognizer.FinalResult()))
+
+    offset = first / rate
+    utterances = []
+    for result in results:
+        words = [word for word in result.get("result", ())
+                 if segment.start <= word["start"] + offset < segment.end]
+        if not words:
+            continue
+        utterance = {
+            "start": round(words[0]["start"] + offset, 3),
+            "end": round(words[-1]["end"] + offset, 3),
+            "text": " ".join(word["word"] for word in words),
+        }
+        if _converter:
+            utterance["gloss"] = _converter.convert_to_sign_gloss(utterance["text"])
+        utterances.append(utterance)
+    return utterances, len(samples) / rate, time.perf_counter() - started
+
+
+def transcribe(segments, workers, model_path=None, gloss=True):
+    """Yields (segment, utterances, audio seconds, decode seconds) for each segment, in order."""
+    global _model, _converter
+    workers = max(1, min(workers, len(segments)))
+    if workers == 1:
+        if _model is None:
+            _init_worker(model_path, gloss)
+        for segment in segments:
+            yield (segment,) + decode_segment(segment)
+        return
+
+    # Each worker loads its own copy; don't keep one in this process as well.
+    _model = _converter = None
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path, gloss)) as pool:
+        for segment, result in zip(segments, pool.map(decode_segment, segments)):
+            yield (segment,) + result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel transcription of a long WAV file, split at pauses.")
+    parser.add_argument("input", help="16-bit PCM WAV file.")
+    parser.add_argument("--output", help="JSONL output file (default: stdout).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--segment", type=float, default=30.0, help="Target segment length in seconds.")
+    parser.add_argument("--overlap", type=float, default=0.5, help="Seconds of padding decoded on each side of a cut.")
+    parser.add_argument("--min-silence", type=float, default=0.3, help="Shortest pause (seconds) to cut at.")
+    parser.add_argument("--silence-db", type=float, default=10.0,
+                        help="How far above the noise floor (dB) a frame still counts as silence.")
+    parser.add_argument("--model", help="VOSK model directory (default: the bundled model).")
+    parser.add_argument("--no-gloss", action="store_true", help="Only transcribe; skip gloss conversion.")
+    parser.add_argument("--plan", action="store_true", help="Print the segments and exit.")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        segments = plan_segments(args.input, args.segment, args.overlap, args.min_silence, args.silence_db)
+    except (OSError, EOFError, wave.Error, ValueError) as e:
+        print(f"Cannot read {args.input}: {e}", file=sys.stderr)
+        return 1
+    split_time = time.perf_counter() - started
+    if args.plan:
+        for segment in segments:
+            print(f"{segment.index:4d}  {segment.start:9.2f} - {segment.end:9.2f}  ({segment.end - segment.start:.1f}s)")
+        return 0
+
+    # Load everything once here, so a bad model or missing NLTK data is one error line rather than
+    # a traceback from every worker.
+    from speech_gloss import get_model_path
+    model_path = args.model or get_model_path()
+    try:
+        _load_model(model_path)
+    except Exception as e:
+        print(f"Cannot load model {model_path}: {e}", file=sys.stderr)
+        return 1
+    if not args.no_gloss:
+        try:
+            _load_converter()
+        except Exception as e:
+            print(f"Cannot load the gloss converter: {e} (use --no-gloss to only transcribe)", file=sys.stderr)
+            return 1
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    audio = decode = 0.0
+    utterances = 0
+    try:
+        for segment, results, audio_seconds, decode_seconds in transcribe(
+                segments, args.workers, model_path, not args.no_gloss):
+            for utterance in results:
+                output.write(json.dumps(utterance) + "\n")
+            output.flush()
+            utterances += len(results)
+            audio += audio_seconds
+            decode += decode_seconds
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        return 130
+    except BrokenProcessPool as e:
+        print(f"A worker process failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    wall = time.perf_counter() - started
+    duration = segments[-1].end if segments else 0.0
+    print(f"{duration:.1f}s of audio in {len(segments)} segments (split in {split_time:.2f}s), "
+          f"{utterances} utterances", file=sys.stderr)
+    print(f"{wall:.2f}s wall, {duration / wall if wall else 0:.1f}x real time "
+          f"({decode:.2f}s decoding, {audio - duration:.1f}s of overlap)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
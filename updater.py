@@ -0,0 +1,308 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import webbrowser
+
+from panda3d.core import ConfigVariableString
+
+from lazy_import import lazy_module
+
+requests = lazy_module("requests")
+urllib3 = lazy_module("urllib3")
+
+GITHUB_API = "https://api.github.com"
+
+update_api_config = ConfigVariableString(
+    "signsynth-update-api", GITHUB_API,
+    "Base URL of the GitHub-compatible API used for update checks.")
+
+
+def version_tuple(v):
+    try:
+        return tuple(map(int, v.lstrip('v').split('.')))
+    except (ValueError, AttributeError):
+        return (0, 0, 0)
+
+
+class UpdateInfo:
+    """The latest release as seen by UpdateChecker."""
+
+    def __init__(self, current_version, release, from_cache=False):
+        self.current_version = current_version
+        self.release = release
+        self.from_cache = from_cache
+        self.latest_version = release.get("tag_name", "")
+        self.installer_url = None
+        self.installer_sha256 = None
+        self.checksum_url = None
+
+        assets = release.get("assets", [])
+        for asset in assets:
+            if asset.get("name", "").endswith(".exe"):
+                self.installer_url = asset.get("browser_download_url")
+                digest = asset.get("digest") or ""
+                if digest.startswith("sha256:"):
+                    self.installer_sha256 = digest[len("sha256:"):].lower()
+                checksum_name = asset["name"] + ".sha256"
+                for other in assets:
+                    if other.get("name") == checksum_name:
+                        self.checksum_url = other.get("browser_download_url")
+                break
+
+    @property
+    def available(self):
+        return version_tuple(self.latest_version) > version_tuple(self.current_version)
+
+    def expected_sha256(self, timeout=10):
+        """
+        SHA-256 of the installer from the release metadata: the asset digest, or
+        else a published "<installer>.sha256" asset. Returns None if neither exists.
+        """
+        if not self.installer_sha256 and self.checksum_url:
+            response = requests.get(self.checksum_url, timeout=timeout)
+            response.raise_for_status()
+            fields = response.text.split()
+            if fields and len(fields[0]) == 64:
+                self.installer_sha256 = fields[0].lower()
+        return self.installer_sha256
+
+
+class UpdateChecker:
+    """
+    Checks GitHub for the latest release on a background thread.
+
+    The last release response is cached on disk together with its ETag. Within
+    `ttl` seconds the cache is used without touching the network; after that a
+    conditional request is made, and a 304 simply refreshes the cache. When the
+    network is unavailable a stale cached release is still reported.
+    """
+
+    def __init__(self, repo, current_version, cache_path, ttl=6 * 3600, timeout=5, api_url=None):
+        self.repo = repo
+        self.current_version = current_version
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.timeout = timeout
+        self.api_url = (api_url or update_api_config.getValue()).rstrip("/")
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        self.thread = None
+
+    @property
+    def release_url(self):
+        return f"{self.api_url}/repos/{self.repo}/releases/latest"
+
+    def read_cache(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cache.get("url") != self.release_url or "release" not in cache:
+            return None
+        return cache
+
+    def write_cache(self, release, etag):
+        cache = {"url": self.release_url, "fetched_at": time.time(), "etag": etag, "release": release}
+        try:
+            with open(self.cache_path, "w") as f:
+                json.dump(cache, f)
+        except OSError as e:
+            print(f"Could not write update cache: {e}")
+
+    def fetch(self):
+        """Returns UpdateInfo for the latest release, using the disk cache where possible."""
+        cache = self.read_cache()
+        if cache and time.time() - cache.get("fetched_at", 0) < self.ttl:
+            return UpdateInfo(self.current_version, cache["release"], from_cache=True)
+
+        headers = {"Accept": "application/vnd.github+json"}
+        if cache and cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+
+        try:
+            response = requests.get(self.release_url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and cache:
+                self.write_cache(cache["release"], cache.get("etag"))
+                return UpdateInfo(self.current_version, cache["release"], from_cache=True)
+            response.raise_for_status()
+            release = response.json()
+        except (requests.exceptions.RequestException, ValueError):
+            if cache:
+                print("Update check failed, using cached release information")
+                return UpdateInfo(self.current_version, cache["release"], from_cache=True)
+            raise
+
+        self.write_cache(release, response.headers.get("ETag"))
+        return UpdateInfo(self.current_version, release)
+
+    def _run(self):
+        try:
+            self.result = self.fetch()
+            if self.result.available:
+                print(f"Update found: {self.result.latest_version} (current: {self.current_version})")
+            else:
+                print(f"App is up-to-date (version {self.current_version})")
+        except requests.exceptions.Timeout:
+            self.error = "Update check timed out"
+            print(self.error)
+        except Exception as e:
+            self.error = f"Could not check for updates: {e}"
+            print(self.error)
+        finally:
+            self.done.set()
+
+    def start(self):
+        """Start the check in the background; poll `done` / `result` from the UI thread."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="UpdateCheck", daemon=True)
+            self.thread.start()
+        return self
+
+
+class DownloadError(Exception):
+    pass
+
+
+class Downloader:
+    """
+    Downloads a file into "<path>.part", resuming with an HTTP Range request
+    after a dropped connection or an earlier interrupted run. The read size
+    adapts to throughput, progress callbacks are rate-limited, and the file is
+    only moved to `path` once its SHA-256 matches `expected_sha256`.
+    """
+
+    def __init__(self, url, path, expected_sha256=None, on_progress=None, progress_interval=0.25,
+                 min_chunk=16 * 1024, max_chunk=1024 * 1024, target_read_time=0.1,
+                 max_retries=5, retry_delay=1.0, timeout=30):
+        self.url = url
+        self.path = path
+        self.part_path = path + ".part"
+        self.expected_sha256 = expected_sha256.lower() if expected_sha256 else None
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.target_read_time = target_read_time
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+
+        self.chunk_size = min_chunk
+        self.downloaded = 0
+        self.total = 0
+        self.resumes = 0
+        self.last_progress = 0.0
+
+    def _report(self, force=False):
+        now = time.monotonic()
+        if self.on_progress and (force or now - self.last_progress >= self.progress_interval):
+            self.last_progress = now
+            self.on_progress(self.downloaded, self.total)
+
+    def _adapt_chunk(self, elapsed, got):
+        # Aim for reads of about target_read_time: fast links get big reads, slow links stay responsive.
+        if got < self.chunk_size:
+            return
+        if elapsed < self.target_read_time / 2:
+            self.chunk_size = min(self.chunk_size * 2, self.max_chunk)
+        elif elapsed > self.target_read_time * 2:
+            self.chunk_size = max(self.chunk_size // 2, self.min_chunk)
+
+    def _hash_existing(self, digest):
+        with open(self.part_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+
+    def _fetch(self, digest):
+        """One connection's worth of downloading. Returns True once the whole file is on disk."""
+        offset = os.path.getsize(self.part_path) if os.path.exists(self.part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        with requests.get(self.url, headers=headers, stream=True, timeout=self.timeout) as r:
+            if offset and r.status_code == 416:
+                # Nothing left to fetch; the partial file is already complete.
+                self.downloaded = self.total = offset
+                self._hash_existing(digest)
+                return True
+            r.raise_for_status()
+
+            if offset and r.status_code == 206:
+                mode = "ab"
+                self._hash_existing(digest)
+                self.downloaded = offset
+                content_range = r.headers.get("content-range", "")
+                if "/" in content_range and content_range.rsplit("/", 1)[1].isdigit():
+                    self.total = int(content_range.rsplit("/", 1)[1])
+                else:
+                    self.total = offset + int(r.headers.get("content-length", 0))
+            else:
+                # Server ignored the range (or this is a fresh download): start over.
+                mode = "wb"
+                self.downloaded = 0
+                self.total = int(r.headers.get("content-length", 0))
+
+            with open(self.part_path, mode) as f:
+                while True:
+                    started = time.monotonic()
+                    chunk = r.raw.read(self.chunk_size, decode_content=True)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    digest.update(chunk)
+                    self.downloaded += len(chunk)
+                    self._adapt_chunk(time.monotonic() - started, len(chunk))
+                    self._report()
+
+        if self.total and self.downloaded < self.total:
+            raise DownloadError(f"Connection closed after {self.downloaded} of {self.total} bytes")
+        return True
+
+    def run(self):
+        """Download, verify and return the final path. Raises DownloadError on failure."""
+        attempt = 0
+        while True:
+            digest = hashlib.sha256()
+            try:
+                self._fetch(digest)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout, urllib3.exceptions.HTTPError, DownloadError) as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise DownloadError(f"Download failed after {self.max_retries} retries: {e}") from e
+                self.resumes += 1
+                print(f"Download interrupted ({e}), resuming from {self.downloaded} bytes")
+                time.sleep(self.retry_delay * attempt)
+
+        self._report(force=True)
+
+        actual = digest.hexdigest()
+        if self.expected_sha256 and actual != self.expected_sha256:
+            os.remove(self.part_path)
+            raise DownloadError(f"Checksum mismatch: expected {self.expected_sha256}, got {actual}")
+
+        os.replace(self.part_path, self.path)
+        return self.path
+
+
+def launch_installer(installer_path, fallback_url):
+    """Starts the downloaded installer (elevated on Windows); opens the browser if that fails."""
+    if sys.platform == 'win32':
+        import ctypes
+        try:
+            ctypes.windll.shell32.ShellExecuteW(None, "runas", installer_path, '/SILENT', None, 1)
+        except Exception as e:
+            print(f"Failed to launch installer as admin: {e}")
+            webbrowser.open(fallback_url)
+    else:
+        subprocess.Popen([installer_path])
+
+
+def installer_download_path(installer_url, temp_dir):
+    return os.path.join(temp_dir, os.path.basename(installer_url))
@@ -0,0 +1,98 @@
+"""
+First-utterance latency: measures the time from recognized text to the first
+sign pose starting, for the first and the Nth utterance, with and without the
+startup warm-up. Runs headless with the same code paths as the app.
+
+Usage:
+    python warmup.py [--utterances 100] [--no-warmup]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BASE_PATH = os.path.abspath(os.path.dirname(__file__))
+
+SAMPLE_UTTERANCES = (
+    "where are you going",
+    "I want to learn to talk with my hands",
+    "we had milk at home but she went to the store",
+    "who taught you those skills",
+    "they are coached every day to build new habits",
+    "what do you think about this",
+)
+
+
+class LatencyLog:
+    """Utterance latencies in seconds, in the order they happened."""
+
+    def __init__(self):
+        self.samples = []
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def nth(self, n):
+        """Latency of the nth utterance (1-based), or None if there were fewer."""
+        return self.samples[n - 1] if len(self.samples) >= n else None
+
+    def report(self, nth=100):
+        if not self.samples:
+            return "Utterance latency: no utterances"
+        parts = [f"first {self.samples[0] * 1000:.1f} ms"]
+        if self.nth(nth) is not None:
+            parts.append(f"{nth}th {self.nth(nth) * 1000:.1f} ms")
+        parts.append(f"median {statistics.median(self.samples) * 1000:.1f} ms")
+        return f"Utterance latency: {', '.join(parts)} over {len(self.samples)} utterances"
+
+
+def run_utterance(app, converter, text):
+    """Feeds one recognized sentence through the app and steps frames until its first pose has started."""
+    started = time.perf_counter()
+    gloss = converter.convert_to_sign_gloss(text)
+    converter.last_convert_time = time.perf_counter() - started
+
+    app.handle_speech_result(text, gloss)
+    while app.utterance_started is not None and app.is_animating:
+        app.taskMgr.step()
+    app.utterance_started = None
+    app.stopAnimation()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure first vs Nth utterance latency.")
+    parser.add_argument("--utterances", type=int, default=100)
+    parser.add_argument("--no-warmup", action="store_true", help="Skip the startup warm-up (cold first utterance).")
+    args = parser.parse_args(argv)
+
+    from panda3d.core import Filename, loadPrcFileData
+    loadPrcFileData("", f"model-path {Filename.fromOsSpecific(BASE_PATH).getFullpath()}")
+    loadPrcFileData("", "window-type none")
+    loadPrcFileData("", "audio-library-name null")
+
+    from sign_language_app import SignLanguageApp
+    from speech_gloss import SpeechGloss, WARMUP_UTTERANCE
+
+    # No gloss cache: SAMPLE_UTTERANCES repeat, and the Nth utterance should pay for a real conversion.
+    converter = SpeechGloss(record_dir="", gloss_cache_size=0)
+    app = SignLanguageApp(version="warmup", start_speech=False)
+    app.speech_processor = converter
+
+    if not args.no_warmup:
+        started = time.perf_counter()
+        app.warm_up(converter.warm_up(WARMUP_UTTERANCE))
+        print(f"Warm-up took {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    for i in range(args.utterances):
+        run_utterance(app, converter, SAMPLE_UTTERANCES[i % len(SAMPLE_UTTERANCES)])
+
+    print(app.latency.report(nth=args.utterances))
+    first, last = app.latency.nth(1), app.latency.nth(args.utterances)
+    if first is not None and last:
+        print(f"First / {args.utterances}th ratio: {first / last:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())